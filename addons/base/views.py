@@ -16,7 +16,6 @@ import jwt
 import waffle
 from django.db import transaction
 from django.contrib.contenttypes.models import ContentType
-from elasticsearch import exceptions as es_exceptions
 
 from api.base.settings.defaults import SLOAN_ID_COOKIE_NAME
 from api.caching.tasks import update_storage_usage_with_size
@@ -24,7 +23,8 @@ from api.caching.tasks import update_storage_usage_with_size
 from addons.base.models import BaseStorageAddon
 from addons.osfstorage.models import OsfStorageFile
 from addons.osfstorage.models import OsfStorageFileNode
-from addons.osfstorage.utils import update_analytics
+from addons.osfstorage.tasks import record_file_access_task
+from addons.osfstorage.utils import track_analytics
 
 from framework import sentry
 from framework.auth import Auth
@@ -32,7 +32,7 @@ from framework.auth import cas
 from framework.auth import oauth_scopes
 from framework.auth.decorators import collect_auth, must_be_logged_in, must_be_signed
 from framework.exceptions import HTTPError
-from framework.sentry import log_exception
+from framework.postcommit_tasks.handlers import enqueue_postcommit_task
 from framework.routing import json_renderer, proxy_url
 from framework.transactions.handlers import no_auto_transaction
 from website import mails
@@ -43,7 +43,7 @@ from osf import features
 from osf.models import (BaseFileNode, TrashedFileNode, BaseFileVersionsThrough,
                         OSFUser, AbstractNode, Preprint,
                         NodeLog, DraftRegistration,
-                        Guid, FileVersionUserMetadata, FileVersion)
+                        Guid, FileVersion)
 from osf.metrics import PreprintView, PreprintDownload
 from osf.utils import permissions
 from website.profile.utils import get_profile_image_url
@@ -251,26 +251,27 @@ def get_metric_class_for_action(action, from_mfr):
     return metric_class
 
 
-@collect_auth
-def get_auth(auth, **kwargs):
+def authenticate_waterbutler_request(auth, encrypted_payload):
+    """Authenticate a request from WaterButler, by bearer token, payload cookie or session.
+
+    Sets ``auth.user`` if it isn't already set.
+
+    :return tuple: the CAS response for a bearer token, if one was sent, and the payload's data
+    :raises cas.CasError: if the bearer token can't be checked
+    """
     cas_resp = None
     # Central Authentication Server OAuth Bearer Token
     authorization = request.headers.get('Authorization')
     if authorization and authorization.startswith('Bearer '):
         client = cas.get_client()
-        try:
-            access_token = cas.parse_auth_header(authorization)
-            cas_resp = client.profile(access_token)
-        except cas.CasError as err:
-            sentry.log_exception()
-            # NOTE: We assume that the request is an AJAX request
-            return json_renderer(err)
+        access_token = cas.parse_auth_header(authorization)
+        cas_resp = client.profile(access_token)
         if cas_resp.authenticated and not getattr(auth, 'user'):
             auth.user = OSFUser.load(cas_resp.user)
 
     try:
         data = jwt.decode(
-            jwe.decrypt(request.args.get('payload', '').encode('utf-8'), WATERBUTLER_JWE_KEY),
+            jwe.decrypt(encrypted_payload.encode('utf-8'), WATERBUTLER_JWE_KEY),
             settings.WATERBUTLER_JWT_SECRET,
             options={'require_exp': True},
             algorithm=settings.WATERBUTLER_JWT_ALGORITHM
@@ -282,6 +283,19 @@ def get_auth(auth, **kwargs):
     if not auth.user:
         auth.user = OSFUser.from_cookie(data.get('cookie', ''))
 
+    return cas_resp, data
+
+
+def get_waterbutler_payload(auth, data, cas_resp, lookups=None):
+    """Check that ``auth`` may perform one WaterButler operation and return its encrypted payload.
+
+    :param dict data: the operation's nid, provider, action and optional path and version
+    :param dict lookups: nodes, access checks and addons already resolved for earlier operations
+        of the same request, which this adds to
+    """
+    if lookups is None:
+        lookups = {}
+
     try:
         action = data['action']
         node_id = data['nid']
@@ -289,16 +303,29 @@ def get_auth(auth, **kwargs):
     except KeyError:
         raise HTTPError(http_status.HTTP_400_BAD_REQUEST)
 
-    node = AbstractNode.load(node_id) or Preprint.load(node_id)
+    if ('node', node_id) not in lookups:
+        lookups['node', node_id] = AbstractNode.load(node_id) or Preprint.load(node_id)
+    node = lookups['node', node_id]
     if node and node.is_deleted:
         raise HTTPError(http_status.HTTP_410_GONE)
     elif not node:
         raise HTTPError(http_status.HTTP_404_NOT_FOUND)
 
-    check_access(node, auth, action, cas_resp)
+    if ('access', node_id, action) not in lookups:
+        try:
+            check_access(node, auth, action, cas_resp)
+        except HTTPError as err:
+            lookups['access', node_id, action] = err
+        else:
+            lookups['access', node_id, action] = None
+    if lookups['access', node_id, action]:
+        raise lookups['access', node_id, action]
+
     provider_settings = None
     if hasattr(node, 'get_addon'):
-        provider_settings = node.get_addon(provider_name)
+        if ('addon', node_id, provider_name) not in lookups:
+            lookups['addon', node_id, provider_name] = node.get_addon(provider_name)
+        provider_settings = lookups['addon', node_id, provider_name]
         if not provider_settings:
             raise HTTPError(http_status.HTTP_400_BAD_REQUEST)
 
@@ -321,37 +348,44 @@ def get_auth(auth, **kwargs):
                     ).select_related('region').get()
                 except FileVersion.DoesNotExist:
                     raise HTTPError(http_status.HTTP_400_BAD_REQUEST)
-                if auth.user:
-                    # mark fileversion as seen
-                    FileVersionUserMetadata.objects.get_or_create(user=auth.user, file_version=fileversion)
-                if not node.is_contributor_or_group_member(auth.user):
+                # The "seen" marker, counters and metrics are recorded after the response, so
+                # WaterButler isn't kept waiting on their writes
+                visits = []
+                metric = None
+                if ('contributor', node_id) not in lookups:
+                    lookups['contributor', node_id] = node.is_contributor_or_group_member(auth.user)
+                if not lookups['contributor', node_id]:
                     from_mfr = download_is_from_mfr(request, payload=data)
                     # version index is 0 based
                     version_index = version - 1
                     if action == 'render':
-                        update_analytics(node, filenode, version_index, 'view')
+                        visits = track_analytics(node, filenode, version_index, 'view')
                     elif action == 'download' and not from_mfr:
-                        update_analytics(node, filenode, version_index, 'download')
+                        visits = track_analytics(node, filenode, version_index, 'download')
                     if waffle.switch_is_active(features.ELASTICSEARCH_METRICS):
                         if isinstance(node, Preprint):
                             metric_class = get_metric_class_for_action(action, from_mfr=from_mfr)
                             if metric_class:
-                                sloan_flags = {'sloan_id': request.cookies.get(SLOAN_ID_COOKIE_NAME)}
+                                metric = {
+                                    'name': metric_class.__name__,
+                                    'preprint_id': node._id,
+                                    'timestamp': timezone.now().isoformat(),
+                                    'version': fileversion.identifier,
+                                    'path': path,
+                                    'sloan_id': request.cookies.get(SLOAN_ID_COOKIE_NAME),
+                                }
                                 for flag_name in SLOAN_FLAGS:
                                     value = request.cookies.get(f'dwf_{flag_name}_custom_domain') or request.cookies.get(f'dwf_{flag_name}')
                                     if value:
-                                        sloan_flags[flag_name.replace('_display', '')] = strtobool(value)
-
-                                try:
-                                    metric_class.record_for_preprint(
-                                        preprint=node,
-                                        user=auth.user,
-                                        version=fileversion.identifier if fileversion else None,
-                                        path=path,
-                                        **sloan_flags
-                                    )
-                                except es_exceptions.ConnectionError:
-                                    log_exception()
+                                        metric[flag_name.replace('_display', '')] = strtobool(value)
+                if auth.user or visits or metric:
+                    enqueue_postcommit_task(
+                        record_file_access_task,
+                        (fileversion.id, ),
+                        {'user_id': getattr(auth.user, '_id', None), 'visits': visits, 'metric': metric},
+                        celery=True,
+                        once_per_request=False,
+                    )
         if fileversion and provider_settings:
             region = fileversion.region
             credentials = region.waterbutler_credentials
@@ -361,8 +395,13 @@ def get_auth(auth, **kwargs):
             )
     # If they haven't been set by version region, use the NodeSettings or Preprint directly
     if not (credentials and waterbutler_settings):
-        credentials = node.serialize_waterbutler_credentials(provider_name)
-        waterbutler_settings = node.serialize_waterbutler_settings(provider_name)
+        if ('credentials', node_id, provider_name) not in lookups:
+            lookups['credentials', node_id, provider_name] = (
+                node.serialize_waterbutler_credentials(provider_name),
+                node.serialize_waterbutler_settings(provider_name),
+            )
+        credentials, waterbutler_settings = lookups['credentials', node_id, provider_name]
+        credentials = dict(credentials)
 
     if isinstance(credentials.get('token'), bytes):
         credentials['token'] = credentials.get('token').decode()
@@ -382,6 +421,52 @@ def get_auth(auth, **kwargs):
     }, settings.WATERBUTLER_JWT_SECRET, algorithm=settings.WATERBUTLER_JWT_ALGORITHM), WATERBUTLER_JWE_KEY).decode()}
 
 
+@collect_auth
+def get_auth(auth, **kwargs):
+    try:
+        cas_resp, data = authenticate_waterbutler_request(auth, request.args.get('payload', ''))
+    except cas.CasError as err:
+        sentry.log_exception()
+        # NOTE: We assume that the request is an AJAX request
+        return json_renderer(err)
+    return get_waterbutler_payload(auth, data, cas_resp)
+
+
+@collect_auth
+def get_auth_batch(auth, **kwargs):
+    """Authorize several WaterButler operations, e.g. the files of a zip download or of a folder
+    being moved, with one request.
+
+    The payload's data has a list of ``operations``, each with the fields ``get_auth`` reads from
+    its payload; fields shared by every operation, like ``cookie`` and ``metrics``, can be set
+    once next to the list. Nodes, access checks and addons are resolved once per node for the batch.
+
+    :return dict: ``payloads``, holding a ``payload`` or the ``status`` of the error for each
+        operation, in order
+    """
+    try:
+        cas_resp, data = authenticate_waterbutler_request(auth, (request.get_json(silent=True) or {}).get('payload', ''))
+    except cas.CasError as err:
+        sentry.log_exception()
+        # NOTE: We assume that the request is an AJAX request
+        return json_renderer(err)
+
+    operations = data.pop('operations', None)
+    if not isinstance(operations, list) or len(operations) > settings.WATERBUTLER_AUTH_BATCH_SIZE:
+        raise HTTPError(http_status.HTTP_400_BAD_REQUEST)
+    if not all(isinstance(operation, dict) for operation in operations):
+        raise HTTPError(http_status.HTTP_400_BAD_REQUEST)
+
+    lookups = {}
+    payloads = []
+    for operation in operations:
+        try:
+            payloads.append(get_waterbutler_payload(auth, dict(data, **operation), cas_resp, lookups))
+        except HTTPError as err:
+            payloads.append({'status': err.code})
+    return {'payloads': payloads}
+
+
 LOG_ACTION_MAP = {
     'move': NodeLog.FILE_MOVED,
     'copy': NodeLog.FILE_COPIED,
@@ -9,7 +9,10 @@ from django.db.models.signals import post_save
 from django.contrib.contenttypes.models import ContentType
 from psycopg2._psycopg import AsIs
 
+import waffle
+
 from addons.base.models import BaseNodeSettings, BaseStorageAddon, BaseUserSettings
+from osf import features
 from osf.utils.fields import EncryptedJSONField
 from osf.utils.datetime_aware_jsonfield import DateTimeAwareJSONField
 from osf.exceptions import InvalidTagError, NodeStateError, TagNotFoundError
@@ -42,8 +45,29 @@ class OsfStorageFolderManager(BaseFileNodeManager):
 class OsfStorageFileNode(BaseFileNode):
     _provider = 'osfstorage'
 
+    # Materialized path, maintained on save so reads don't need a recursive query.
+    # NULL for nodes that have not been saved or backfilled since it was introduced.
+    stored_materialized_path = models.TextField(blank=True, null=True)
+
+    SUBTREE_PATH_UPDATE_SQL = """
+        WITH RECURSIVE subtree(id) AS (
+            SELECT id FROM %(table)s WHERE parent_id = %(id)s
+          UNION ALL
+            SELECT T.id FROM %(table)s AS T JOIN subtree AS S ON T.parent_id = S.id
+        )
+        UPDATE %(table)s
+        SET stored_materialized_path = %(new_path)s || substr(stored_materialized_path, %(old_length)s + 1)
+        WHERE id IN (SELECT id FROM subtree)
+        AND left(stored_materialized_path, %(old_length)s) = %(old_path)s;
+    """
+
     @property
     def materialized_path(self):
+        if self.stored_materialized_path is not None:
+            return self.stored_materialized_path
+        return self._compute_materialized_path()
+
+    def _compute_materialized_path(self):
         sql = """
             WITH RECURSIVE materialized_path_cte(parent_id, GEN_PATH) AS (
               SELECT
@@ -225,10 +249,30 @@ class OsfStorageFileNode(BaseFileNode):
             if save:
                 self.save()
 
+    def _build_materialized_path(self):
+        parent_path = self.parent.materialized_path if self.parent_id else ''
+        return parent_path + self.name + ('' if self.is_file else '/')
+
     def save(self):
         self._path = ''
         self._materialized_path = ''
-        return super(OsfStorageFileNode, self).save()
+        old_path = self.stored_materialized_path
+        if old_path is None and self.pk and not self.is_file:
+            # Not backfilled yet; rows below may still have stored paths that need moving
+            old_path = self._compute_materialized_path()
+        self.stored_materialized_path = self._build_materialized_path()
+        ret = super(OsfStorageFileNode, self).save()
+        if not self.is_file and old_path is not None and old_path != self.stored_materialized_path:
+            # Renamed or moved; keep the stored paths of everything below in step
+            with connection.cursor() as cursor:
+                cursor.execute(self.SUBTREE_PATH_UPDATE_SQL, {
+                    'table': AsIs(self._meta.db_table),
+                    'id': self.pk,
+                    'new_path': self.stored_materialized_path,
+                    'old_path': old_path,
+                    'old_length': len(old_path),
+                })
+        return ret
 
 
 class OsfStorageFile(OsfStorageFileNode, File):
@@ -406,6 +450,14 @@ class OsfStorageFolder(OsfStorageFileNode, Folder):
 
     @property
     def is_checked_out(self):
+        if waffle.switch_is_active(features.OSFSTORAGE_STORED_PATHS) and self.stored_materialized_path is not None:
+            # Served by the partial index on checked out osfstorage nodes
+            return OsfStorageFileNode.objects.filter(
+                target_object_id=self.target_object_id,
+                target_content_type_id=self.target_content_type_id,
+                checkout__isnull=False,
+                stored_materialized_path__startswith=self.stored_materialized_path,
+            ).exists()
         sql = """
             WITH RECURSIVE is_checked_out_cte(id, parent_id, checkout_id) AS (
               SELECT
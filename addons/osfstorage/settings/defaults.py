@@ -37,3 +37,8 @@ MAX_UPLOAD_SIZE = 5 * 1024  # 5 GB
 
 # Max file size permitted by frontend in megabytes for verified users
 HIGH_MAX_UPLOAD_SIZE = 5 * 1024  # 5 GB
+
+# Rows fetched per query when streaming a folder listing from the get_children hook
+CHILDREN_PAGE_SIZE = 1000
+# Largest page the get_children hook will return when paginating
+MAX_CHILDREN_PAGE_SIZE = 10000
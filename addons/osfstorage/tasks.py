@@ -0,0 +1,54 @@
+"""
+Bookkeeping for OSFstorage file accesses, deferred out of WaterButler's auth callback.
+"""
+from dateutil.parser import parse as parse_date
+from django.apps import apps
+from django.db import DatabaseError
+from elasticsearch import exceptions as es_exceptions
+
+from framework.analytics import apply_visit
+from framework.celery_tasks import app
+from osf import metrics
+
+
+@app.task(bind=True, max_retries=5, default_retry_delay=60)
+def record_file_access_task(self, file_version_id, user_id=None, visits=None, metric=None):
+    """Record an access to a file version that ``get_auth`` has already authorized.
+
+    A database or Elasticsearch error retries the task with only the visits that weren't counted
+    yet, so none is counted twice.
+
+    :param int file_version_id: pk of the accessed FileVersion
+    :param str user_id: guid of the user to mark the version as seen by, if any
+    :param list visits: visits from ``framework.analytics.track_visit`` to count
+    :param dict metric: name of the preprint metric class to record, with the preprint's guid, the
+        time of the access and the metric's fields
+    """
+    FileVersion = apps.get_model('osf.FileVersion')
+    FileVersionUserMetadata = apps.get_model('osf.FileVersionUserMetadata')
+    OSFUser = apps.get_model('osf.OSFUser')
+    Preprint = apps.get_model('osf.Preprint')
+
+    visits = list(visits or [])
+    try:
+        file_version = FileVersion.objects.get(id=file_version_id)
+        user = OSFUser.load(user_id) if user_id else None
+        if user:
+            # mark fileversion as seen
+            FileVersionUserMetadata.objects.get_or_create(user=user, file_version=file_version)
+
+        while visits:
+            apply_visit(visits[0])
+            visits.pop(0)
+
+        if metric:
+            fields = dict(metric)
+            metric_class = getattr(metrics, fields.pop('name'))
+            metric_class.record_for_preprint(
+                preprint=Preprint.load(fields.pop('preprint_id')),
+                user=user,
+                timestamp=parse_date(fields.pop('timestamp')),
+                **fields
+            )
+    except (DatabaseError, es_exceptions.ConnectionError) as exc:
+        raise self.retry(exc=exc, kwargs={'user_id': user_id, 'visits': visits, 'metric': metric})
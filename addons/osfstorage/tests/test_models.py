@@ -7,6 +7,7 @@ import pytest
 import pytz
 from django.utils import timezone
 from nose.tools import *  # noqa
+from waffle.testutils import override_switch
 
 from framework.auth import Auth
 from addons.osfstorage.models import OsfStorageFile, OsfStorageFileNode, OsfStorageFolder
@@ -22,7 +23,7 @@ from addons.osfstorage.listeners import delete_files_task
 
 import datetime
 
-from osf import models
+from osf import features, models
 from addons.osfstorage import utils
 from addons.osfstorage import settings
 from website.files.exceptions import FileNodeCheckedOutError, FileNodeIsPrimaryFile
@@ -309,6 +310,37 @@ class TestOsfstorageFileNode(StorageTestCase):
         child = self.node_settings.get_root().append_folder('Cloud').append_file('Carp')
         assert_equals('/Cloud/Carp', child.materialized_path)
 
+    def test_stored_materialized_path_matches_computed(self):
+        child = self.node_settings.get_root().append_folder('Cloud').append_file('Carp')
+        child.reload()
+        assert_equals('/Cloud/Carp', child.stored_materialized_path)
+        assert_equals(child._compute_materialized_path(), child.stored_materialized_path)
+
+    def test_stored_materialized_path_updated_on_folder_rename(self):
+        folder = self.node_settings.get_root().append_folder('Cloud')
+        child = folder.append_folder('Nested').append_file('Carp')
+        folder.move_under(self.node_settings.get_root(), name='Sky')
+        child.reload()
+        assert_equals('/Sky/Nested/Carp', child.materialized_path)
+        assert_equals(child._compute_materialized_path(), child.materialized_path)
+
+    def test_stored_materialized_path_updated_on_move(self):
+        child = self.node_settings.get_root().append_folder('Cloud').append_file('Carp')
+        destination = self.node_settings.get_root().append_folder('Sea')
+        child.move_under(destination)
+        child.reload()
+        assert_equals('/Sea/Carp', child.materialized_path)
+
+    def test_stored_materialized_path_not_backfilled(self):
+        folder = self.node_settings.get_root().append_folder('Cloud')
+        child = folder.append_file('Carp')
+        OsfStorageFileNode.objects.filter(id=folder.id).update(stored_materialized_path=None)
+        folder.reload()
+        assert_equals('/Cloud/', folder.materialized_path)
+        folder.move_under(self.node_settings.get_root(), name='Sky')
+        child.reload()
+        assert_equals('/Sky/Carp', child.materialized_path)
+
     def test_copy(self):
         to_copy = self.node_settings.get_root().append_file('Carp')
         copy_to = self.node_settings.get_root().append_folder('Cloud')
@@ -987,6 +1019,18 @@ class TestOsfStorageCheckout(StorageTestCase):
         with assert_raises(FileNodeCheckedOutError):
             folder.delete()
 
+    def test_folder_is_checked_out_with_stored_paths(self):
+        folder = self.root_node.append_folder('folder')
+        nested = folder.append_folder('nested')
+        other = self.root_node.append_folder('other')
+        self.file.move_under(nested)
+        self.file.check_in_or_out(self.user, self.user, save=True)
+        for active in (False, True):
+            with override_switch(features.OSFSTORAGE_STORED_PATHS, active=active):
+                assert_true(folder.is_checked_out)
+                assert_true(nested.is_checked_out)
+                assert_false(other.is_checked_out)
+
     def test_move_checked_out_file(self):
         self.file.check_in_or_out(self.user, self.user, save=True)
         self.file.reload()
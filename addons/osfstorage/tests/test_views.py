@@ -1,6 +1,7 @@
 # encoding: utf-8
 from __future__ import unicode_literals
 
+import base64
 import json
 import mock
 import datetime
@@ -138,6 +139,60 @@ class TestGetMetadataHook(HookTestCase):
         assert_equal(res_date_created, expected_date_created)
         assert_equal(res_data, expected_data)
 
+    def test_children_metadata_paginated(self):
+        folder = self.node_settings.get_root().append_folder('folder')
+        for name in ['c', 'a', 'b']:
+            folder.append_file(name)
+        res = self.send_hook(
+            'osfstorage_get_children',
+            {'fid': folder._id, 'user_id': self.user._id, 'page_size': 2},
+            {},
+            self.node
+        )
+        assert_equal([child['name'] for child in res.json['data']], ['a', 'b'])
+        assert_true(res.json['next'])
+
+        res = self.send_hook(
+            'osfstorage_get_children',
+            {'fid': folder._id, 'user_id': self.user._id, 'page_size': 2, 'cursor': res.json['next']},
+            {},
+            self.node
+        )
+        assert_equal([child['name'] for child in res.json['data']], ['c'])
+        assert_is_none(res.json['next'])
+
+    def test_children_metadata_invalid_cursor(self):
+        wrong_shapes = [['x', None], ['x', 'y'], [1, 2], {'name': 'x', 'id': 1}, 'x']
+        cursors = ['nope'] + [
+            base64.urlsafe_b64encode(json.dumps(shape).encode('utf-8')).decode('ascii')
+            for shape in wrong_shapes
+        ]
+        for cursor in cursors:
+            res = self.send_hook(
+                'osfstorage_get_children',
+                {'fid': self.node_settings.get_root()._id, 'page_size': 2, 'cursor': cursor},
+                {},
+                self.node,
+                expect_errors=True,
+            )
+            assert_equal(res.status_code, 400)
+
+    def test_children_metadata_ndjson_minimal(self):
+        record = recursively_create_file(self.node_settings, 'folder/file.txt')
+        record.add_version(factories.FileVersionFactory())
+        record.parent.append_file('other.txt')
+        res = self.send_hook(
+            'osfstorage_get_children',
+            {'fid': record.parent._id, 'format': 'ndjson', 'minimal': 'true', 'page_size': 1},
+            {},
+            self.node
+        )
+        assert_equal(res.content_type, 'application/x-ndjson')
+        children = [json.loads(line) for line in res.text.splitlines()]
+        assert_equal([child['name'] for child in children], ['file.txt', 'other.txt'])
+        assert_not_in('downloads', children[0])
+        assert_not_in('latestVersionSeen', children[0])
+
     def test_children_metadata_preprint(self):
         preprint = PreprintFactory()
         record = preprint.primary_file
@@ -8,7 +8,7 @@ import functools
 
 from osf.exceptions import ValidationValueError
 from framework.exceptions import HTTPError
-from framework.analytics import update_counter
+from framework.analytics import track_visit, update_counter
 
 from addons.osfstorage import settings
 
@@ -16,13 +16,7 @@ logger = logging.getLogger(__name__)
 LOCATION_KEYS = ['service', settings.WATERBUTLER_RESOURCE, 'object']
 
 
-def update_analytics(node, file, version_idx, action='download'):
-    """
-    :param Node node: Root node to update
-    :param str file_id: The _id field of a filenode
-    :param int version_idx: Zero-based version index
-    :param str action: is this logged as download or a view
-    """
+def get_analytics_node_info(node):
     # Pass in contributors and group members to check that their downloads
     # do not count towards total download count
     contributors = []
@@ -31,15 +25,39 @@ def update_analytics(node, file, version_idx, action='download'):
     elif getattr(node, 'contributors', None):
         contributors = node.contributors
 
-    node_info = {
+    return {
         'contributors': contributors
     }
+
+
+def update_analytics(node, file, version_idx, action='download'):
+    """
+    :param Node node: Root node to update
+    :param str file_id: The _id field of a filenode
+    :param int version_idx: Zero-based version index
+    :param str action: is this logged as download or a view
+    """
+    node_info = get_analytics_node_info(node)
     resource = node.guids.first()
 
     update_counter(resource, file, version=None, action=action, node_info=node_info)
     update_counter(resource, file, version_idx, action, node_info=node_info)
 
 
+def track_analytics(node, file, version_idx, action='download'):
+    """Like ``update_analytics``, but only track the visits in the session.
+
+    :return list: visits to count with ``framework.analytics.apply_visit``
+    """
+    node_info = get_analytics_node_info(node)
+    resource = node.guids.first()
+
+    return [
+        track_visit(resource, file, version=None, action=action, node_info=node_info),
+        track_visit(resource, file, version_idx, action, node_info=node_info),
+    ]
+
+
 def serialize_revision(node, record, version, index, anon=False):
     """Serialize revision for use in revisions table.
 
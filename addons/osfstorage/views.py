@@ -1,6 +1,8 @@
 from __future__ import unicode_literals
 
 from rest_framework import status as http_status
+import base64
+import json
 import logging
 
 from django.core.exceptions import ValidationError
@@ -8,7 +10,7 @@ from django.db import IntegrityError
 from django.db import connection
 from django.db import transaction
 
-from flask import request
+from flask import request, Response
 
 from framework.auth import Auth
 from framework.sessions import get_session
@@ -186,112 +188,195 @@ def osfstorage_get_metadata(file_node, **kwargs):
     return file_node.serialize(version=version, include_full=True)
 
 
+GET_CHILDREN_SQL = """
+    SELECT F.name, F.id, CASE
+        WHEN F.type = 'osf.osfstoragefile' THEN
+            json_build_object(
+                'id', F._id
+                , 'path', '/' || F._id
+                , 'name', F.name
+                , 'kind', 'file'
+                , 'size', LATEST_VERSION.size
+                {download_count_field}
+                , 'version', (SELECT COUNT(*) FROM osf_basefileversionsthrough WHERE osf_basefileversionsthrough.basefilenode_id = F.id)
+                , 'contentType', LATEST_VERSION.content_type
+                , 'modified', LATEST_VERSION.created
+                , 'created', EARLIEST_VERSION.created
+                , 'checkout', CHECKOUT_GUID
+                , 'md5', LATEST_VERSION.metadata ->> 'md5'
+                , 'sha256', LATEST_VERSION.metadata ->> 'sha256'
+                {latest_version_seen_field}
+            )
+        ELSE
+            json_build_object(
+                'id', F._id
+                , 'path', '/' || F._id || '/'
+                , 'name', F.name
+                , 'kind', 'folder'
+            )
+        END
+    FROM osf_basefilenode AS F
+    LEFT JOIN LATERAL (
+        SELECT * FROM osf_fileversion
+        JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
+        WHERE osf_basefileversionsthrough.basefilenode_id = F.id
+        ORDER BY created DESC
+        LIMIT 1
+    ) LATEST_VERSION ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT * FROM osf_fileversion
+        JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
+        WHERE osf_basefileversionsthrough.basefilenode_id = F.id
+        ORDER BY created ASC
+        LIMIT 1
+    ) EARLIEST_VERSION ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT _id from osf_guid
+        WHERE object_id = F.checkout_id
+        AND content_type_id = %(user_content_type_id)s
+        LIMIT 1
+    ) CHECKOUT_GUID ON TRUE
+    {user_laterals}
+    WHERE parent_id = %(parent_id)s
+    AND (NOT F.type IN ('osf.trashedfilenode', 'osf.trashedfile', 'osf.trashedfolder'))
+    {keyset}
+"""
+
+GET_CHILDREN_DOWNLOAD_COUNT_FIELD = ", 'downloads',  COALESCE(DOWNLOAD_COUNT, 0)"
+GET_CHILDREN_LATEST_VERSION_SEEN_FIELD = ", 'latestVersionSeen', SEEN_LATEST_VERSION.case"
+GET_CHILDREN_USER_LATERALS = """
+    LEFT JOIN LATERAL (
+        SELECT P.total AS DOWNLOAD_COUNT FROM osf_pagecounter AS P
+        WHERE P.resource_id = %(resource_id)s
+        AND P.file_id = F.id
+        AND P.action = 'download'
+        AND P.version ISNULL
+        LIMIT 1
+    ) DOWNLOAD_COUNT ON TRUE
+    LEFT JOIN LATERAL (
+      SELECT EXISTS(
+        SELECT (1) FROM osf_fileversionusermetadata
+          INNER JOIN osf_fileversion ON osf_fileversionusermetadata.file_version_id = osf_fileversion.id
+          INNER JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
+          WHERE osf_fileversionusermetadata.user_id = %(user_pk)s
+          AND osf_basefileversionsthrough.basefilenode_id = F.id
+        LIMIT 1
+      )
+    ) SEEN_FILE ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT CASE WHEN SEEN_FILE.exists
+        THEN
+            CASE WHEN EXISTS(
+              SELECT (1) FROM osf_fileversionusermetadata
+              WHERE osf_fileversionusermetadata.file_version_id = LATEST_VERSION.fileversion_id
+              AND osf_fileversionusermetadata.user_id = %(user_pk)s
+              LIMIT 1
+            )
+            THEN
+              json_build_object('user', %(user_id)s, 'seen', TRUE)
+            ELSE
+              json_build_object('user', %(user_id)s, 'seen', FALSE)
+            END
+        ELSE
+          NULL
+        END
+    ) SEEN_LATEST_VERSION ON TRUE
+"""
+GET_CHILDREN_KEYSET = """
+    AND (F.name, F.id) > (%(after_name)s, %(after_id)s)
+    ORDER BY F.name, F.id
+    LIMIT %(page_size)s
+"""
+
+
+def encode_children_cursor(name, pk):
+    return base64.urlsafe_b64encode(json.dumps([name, pk]).encode('utf-8')).decode('ascii')
+
+
+def decode_children_cursor(cursor):
+    try:
+        name, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        if not isinstance(name, str):
+            raise ValueError('Cursor name must be a string')
+        return name, int(pk)
+    except (TypeError, ValueError, UnicodeError):
+        raise HTTPError(http_status.HTTP_400_BAD_REQUEST, data={'message_long': 'Invalid cursor.'})
+
+
+def _get_children_page(file_node, params, minimal=False, page_size=None, after=None):
+    """Fetch ``(name, id, child)`` rows for ``file_node``; one keyset page of
+    ``page_size`` rows sorted by (name, id) after ``after`` if given, or every child otherwise.
+    """
+    sql = GET_CHILDREN_SQL.format(
+        download_count_field='' if minimal else GET_CHILDREN_DOWNLOAD_COUNT_FIELD,
+        latest_version_seen_field='' if minimal else GET_CHILDREN_LATEST_VERSION_SEEN_FIELD,
+        user_laterals='' if minimal else GET_CHILDREN_USER_LATERALS,
+        keyset='' if page_size is None else GET_CHILDREN_KEYSET,
+    )
+    params = dict(params, page_size=page_size, after_name=after[0] if after else '', after_id=after[1] if after else 0)
+    with connection.cursor() as cursor:
+        # Read the documentation on FileVersion's fields before reading this code
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
 @must_be_signed
 @decorators.autoload_filenode(must_be='folder')
 def osfstorage_get_children(file_node, **kwargs):
+    """List the children of a folder.
+
+    By default every child is returned in a single JSON list. Optional query parameters:
+
+    - ``page_size``: return ``{'data': [...], 'next': <cursor or null>}`` with at most this many
+      children, sorted by name; pass ``cursor`` to fetch the page after a previous one.
+    - ``format=ndjson``: stream every child as one JSON object per line, fetching
+      ``page_size`` (default ``osf_storage_settings.CHILDREN_PAGE_SIZE``) rows per query.
+    - ``minimal=true``: omit the per-user ``latestVersionSeen`` and the ``downloads`` count.
+    """
     from django.contrib.contenttypes.models import ContentType
-    user_id = request.args.get('user_id')
-    user_content_type_id = ContentType.objects.get_for_model(OSFUser).id
-    user_pk = OSFUser.objects.filter(guids___id=user_id, guids___id__isnull=False).values_list('pk', flat=True).first()
-    with connection.cursor() as cursor:
-        # Read the documentation on FileVersion's fields before reading this code
-        cursor.execute("""
-            SELECT json_agg(CASE
-                WHEN F.type = 'osf.osfstoragefile' THEN
-                    json_build_object(
-                        'id', F._id
-                        , 'path', '/' || F._id
-                        , 'name', F.name
-                        , 'kind', 'file'
-                        , 'size', LATEST_VERSION.size
-                        , 'downloads',  COALESCE(DOWNLOAD_COUNT, 0)
-                        , 'version', (SELECT COUNT(*) FROM osf_basefileversionsthrough WHERE osf_basefileversionsthrough.basefilenode_id = F.id)
-                        , 'contentType', LATEST_VERSION.content_type
-                        , 'modified', LATEST_VERSION.created
-                        , 'created', EARLIEST_VERSION.created
-                        , 'checkout', CHECKOUT_GUID
-                        , 'md5', LATEST_VERSION.metadata ->> 'md5'
-                        , 'sha256', LATEST_VERSION.metadata ->> 'sha256'
-                        , 'latestVersionSeen', SEEN_LATEST_VERSION.case
-                    )
-                ELSE
-                    json_build_object(
-                        'id', F._id
-                        , 'path', '/' || F._id || '/'
-                        , 'name', F.name
-                        , 'kind', 'folder'
-                    )
-                END
-            )
-            FROM osf_basefilenode AS F
-            LEFT JOIN LATERAL (
-                SELECT * FROM osf_fileversion
-                JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
-                WHERE osf_basefileversionsthrough.basefilenode_id = F.id
-                ORDER BY created DESC
-                LIMIT 1
-            ) LATEST_VERSION ON TRUE
-            LEFT JOIN LATERAL (
-                SELECT * FROM osf_fileversion
-                JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
-                WHERE osf_basefileversionsthrough.basefilenode_id = F.id
-                ORDER BY created ASC
-                LIMIT 1
-            ) EARLIEST_VERSION ON TRUE
-            LEFT JOIN LATERAL (
-                SELECT _id from osf_guid
-                WHERE object_id = F.checkout_id
-                AND content_type_id = %s
-                LIMIT 1
-            ) CHECKOUT_GUID ON TRUE
-            LEFT JOIN LATERAL (
-                SELECT P.total AS DOWNLOAD_COUNT FROM osf_pagecounter AS P
-                WHERE P.resource_id = %s
-                AND P.file_id = F.id
-                AND P.action = 'download'
-                AND P.version ISNULL
-                LIMIT 1
-            ) DOWNLOAD_COUNT ON TRUE
-            LEFT JOIN LATERAL (
-              SELECT EXISTS(
-                SELECT (1) FROM osf_fileversionusermetadata
-                  INNER JOIN osf_fileversion ON osf_fileversionusermetadata.file_version_id = osf_fileversion.id
-                  INNER JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
-                  WHERE osf_fileversionusermetadata.user_id = %s
-                  AND osf_basefileversionsthrough.basefilenode_id = F.id
-                LIMIT 1
-              )
-            ) SEEN_FILE ON TRUE
-            LEFT JOIN LATERAL (
-                SELECT CASE WHEN SEEN_FILE.exists
-                THEN
-                    CASE WHEN EXISTS(
-                      SELECT (1) FROM osf_fileversionusermetadata
-                      WHERE osf_fileversionusermetadata.file_version_id = LATEST_VERSION.fileversion_id
-                      AND osf_fileversionusermetadata.user_id = %s
-                      LIMIT 1
-                    )
-                    THEN
-                      json_build_object('user', %s, 'seen', TRUE)
-                    ELSE
-                      json_build_object('user', %s, 'seen', FALSE)
-                    END
-                ELSE
-                  NULL
-                END
-            ) SEEN_LATEST_VERSION ON TRUE
-            WHERE parent_id = %s
-            AND (NOT F.type IN ('osf.trashedfilenode', 'osf.trashedfile', 'osf.trashedfolder'))
-        """, [
-            user_content_type_id,
-            file_node.target.guids.first().id,
-            user_pk,
-            user_pk,
-            user_id,
-            user_id,
-            file_node.id
-        ])
-        return cursor.fetchone()[0] or []
+    minimal = request.args.get('minimal', '').lower() in ('true', '1')
+    try:
+        page_size = int(request.args['page_size']) if 'page_size' in request.args else None
+    except ValueError:
+        raise HTTPError(http_status.HTTP_400_BAD_REQUEST, data={'message_long': 'page_size must be an integer.'})
+    if page_size is not None:
+        page_size = max(1, min(page_size, osf_storage_settings.MAX_CHILDREN_PAGE_SIZE))
+    after = decode_children_cursor(request.args['cursor']) if request.args.get('cursor') else None
+
+    params = {
+        'user_content_type_id': ContentType.objects.get_for_model(OSFUser).id,
+        'parent_id': file_node.id,
+    }
+    if not minimal:
+        user_id = request.args.get('user_id')
+        params.update({
+            'resource_id': file_node.target.guids.first().id,
+            'user_pk': OSFUser.objects.filter(guids___id=user_id, guids___id__isnull=False).values_list('pk', flat=True).first(),
+            'user_id': user_id,
+        })
+
+    if request.args.get('format') == 'ndjson':
+        page_size = page_size or osf_storage_settings.CHILDREN_PAGE_SIZE
+
+        def generate(after):
+            while True:
+                rows = _get_children_page(file_node, params, minimal=minimal, page_size=page_size, after=after)
+                for name, pk, child in rows:
+                    yield json.dumps(child) + '\n'
+                if len(rows) < page_size:
+                    return
+                after = rows[-1][:2]
+
+        return Response(generate(after), mimetype='application/x-ndjson')
+
+    rows = _get_children_page(file_node, params, minimal=minimal, page_size=page_size, after=after)
+    children = [child for name, pk, child in rows]
+    if page_size is None:
+        return children
+    return {
+        'data': children,
+        'next': encode_children_cursor(*rows[-1][:2]) if len(rows) == page_size else None,
+    }
 
 
 @must_be_signed
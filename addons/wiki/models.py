@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 import datetime
 import functools
+import hashlib
 import logging
 
 import markdown
 import pytz
+import waffle
 from django.db.models.expressions import F
 from django.db.models.aggregates import Max
+from django.conf import settings as django_settings
+from django.core.cache import caches
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from framework.auth.core import Auth
@@ -18,12 +22,14 @@ from bleach.linkifier import LinkifyFilter
 from django.db import models
 from framework.forms.utils import sanitize
 from markdown.extensions import codehilite, fenced_code, wikilinks
-from osf.models import NodeLog, OSFUser, Comment
+from osf import features
+from osf.models import AbstractNode, NodeLog, OSFUser, Comment
 from osf.models.base import BaseModel, GuidMixin, ObjectIDMixin
-from osf.models.spam import SpamStatus
+from osf.models.spam import SpamStatus, enqueue_spam_check
 from osf.utils.fields import NonNaiveDateTimeField
 from osf.utils.requests import get_request_and_user_id, string_type_request_headers
 from osf.exceptions import NodeStateError
+from addons.wiki import settings as wiki_settings
 from addons.wiki import utils as wiki_utils
 from addons.wiki.exceptions import (
     PageCannotRenameError,
@@ -90,6 +96,9 @@ def render_content(content, node):
     return sanitized_content
 
 
+wiki_render_cache = caches[django_settings.WIKI_RENDER_CACHE_NAME]
+
+
 def build_wiki_url(node, label, base, end):
     return '/{pid}/wiki/{wname}/'.format(pid=node._id, wname=label)
 
@@ -130,6 +139,13 @@ class WikiVersion(ObjectIDMixin, BaseModel):
 
     def html(self, node):
         """The cleaned HTML of the page"""
+        return self._get_rendered(node)['html']
+
+    def raw_text(self, node):
+        """ The raw text of the page, suitable for using in a test search"""
+        return self._get_rendered(node)['text']
+
+    def _render_html(self, node):
         html_output = build_html_output(self.content, node=node)
         try:
             cleaner = Cleaner(
@@ -143,10 +159,25 @@ class WikiVersion(ObjectIDMixin, BaseModel):
             logger.warning('Returning unlinkified content.')
             return render_content(self.content, node=node)
 
-    def raw_text(self, node):
-        """ The raw text of the page, suitable for using in a test search"""
+    def _get_rendered(self, node):
+        """Return the cleaned HTML and plain text of the page as rendered for ``node``.
 
-        return sanitize(self.html(node), tags=[], strip=True)
+        Rendering depends only on the content, the node (for wiki links) and the renderer, so the
+        result is cached under a hash of those and computed at most once for any version.
+        """
+        key = 'wiki_render:{}:{}'.format(
+            wiki_settings.WIKI_RENDERER_VERSION,
+            hashlib.sha256(u'{}:{}'.format(node._id, self.content).encode('utf-8')).hexdigest(),
+        )
+        rendered_by_key = self.__dict__.setdefault('_rendered', {})
+        if key not in rendered_by_key:
+            rendered = wiki_render_cache.get(key)
+            if rendered is None:
+                html = self._render_html(node)
+                rendered = {'html': html, 'text': sanitize(html, tags=[], strip=True)}
+                wiki_render_cache.set(key, rendered, None)
+            rendered_by_key[key] = rendered
+        return rendered_by_key[key]
 
     @property
     def rendered_before_update(self):
@@ -194,7 +225,22 @@ class WikiVersion(ObjectIDMixin, BaseModel):
             return False
         if user.spam_status == SpamStatus.HAM:
             return False
+        if waffle.switch_is_active(features.ASYNC_SPAM_CHECKS):
+            enqueue_spam_check(self, user, [], request_headers)
+            return False
+        return self._check_spam_content(user, request_headers)
 
+    def run_spam_check(self, user, saved_fields, request_headers):
+        """Check this version for spam, flagging its node. Called by queued spam checks."""
+        node = self.wiki_page.node
+        state = node.get_spam_check_state()
+        is_spam = self._check_spam_content(user, request_headers)
+        # Save without AbstractNode.save, which would queue a spam check of the node itself
+        node.save_spam_check_result(state, save=super(AbstractNode, node).save)
+        return is_spam
+
+    def _check_spam_content(self, user, request_headers):
+        node = self.wiki_page.node
         content = self._get_spam_content(node)
         if not content:
             return
@@ -13,3 +13,7 @@ SHAREJS_DB_URL = os.environ.get('SHAREJS_DB_URL', 'mongodb://{}:{}/{}'.format(se
 
 # TODO: Change to release date for wiki change
 WIKI_CHANGE_DATE = datetime.datetime.utcfromtimestamp(1423760098).replace(tzinfo=pytz.utc)
+
+# Bump when a change to rendering (markdown extensions, whitelist, linkify) should invalidate
+# cached wiki HTML
+WIKI_RENDERER_VERSION = 1
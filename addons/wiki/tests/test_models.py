@@ -1,10 +1,13 @@
+import mock
 import pytest
 import pytz
 import datetime
 from addons.wiki.exceptions import NameMaximumLengthError
 
-from addons.wiki.models import WikiPage, WikiVersion
+from addons.wiki import settings as wiki_settings
+from addons.wiki.models import WikiPage, WikiVersion, build_html_output, wiki_render_cache
 from addons.wiki.tests.factories import WikiFactory, WikiVersionFactory
+from api.caching.utils import storage_usage_cache
 from osf_tests.factories import NodeFactory, UserFactory, ProjectFactory
 from tests.base import OsfTestCase, fake
 
@@ -103,3 +106,50 @@ class TestWikiPage(OsfTestCase):
         latest_version = wiki.versions.order_by('-created')[0]
         assert latest_version.is_current
         assert wiki.get_version(5) == latest_version
+
+
+class TestWikiVersionRenderCache:
+
+    @pytest.fixture()
+    def project(self):
+        return ProjectFactory()
+
+    @pytest.fixture()
+    def version(self, project):
+        wiki_page = WikiFactory(node=project)
+        return WikiVersionFactory(wiki_page=wiki_page, content='[[wiki2]] **bold**')
+
+    def test_rendered_once(self, project, version):
+        # Saving the version may have rendered it already
+        wiki_render_cache.clear()
+        with mock.patch('addons.wiki.models.build_html_output', wraps=build_html_output) as mock_build:
+            html = version.html(project)
+            text = version.raw_text(project)
+            assert mock_build.call_count == 1
+
+            mock_build.reset_mock()
+            # A fresh instance of the same version reads from the shared cache
+            assert WikiVersion.load(version._id).html(project) == html
+            assert mock_build.call_count == 0
+        assert '/{}/wiki/wiki2/'.format(project._id) in html
+        assert '<strong>bold</strong>' in html
+        assert text == 'wiki2 bold'
+
+    def test_keyed_by_node(self, project, version):
+        other = ProjectFactory()
+        assert '/{}/wiki/wiki2/'.format(other._id) in version.html(other)
+        assert '/{}/wiki/wiki2/'.format(project._id) in version.html(project)
+
+    def test_renderer_version_invalidates(self, project, version):
+        version.html(project)
+        with mock.patch.object(wiki_settings, 'WIKI_RENDERER_VERSION', wiki_settings.WIKI_RENDERER_VERSION + 1):
+            with mock.patch('addons.wiki.models.build_html_output', wraps=build_html_output) as mock_build:
+                WikiVersion.load(version._id).html(project)
+        assert mock_build.call_count == 1
+
+    def test_clearing_leaves_storage_usage_cache(self, project, version):
+        storage_usage_cache.set('wiki-render-test', 10, None)
+        version.html(project)
+        wiki_render_cache.clear()
+        assert storage_usage_cache.get('wiki-render-test') == 10
+        storage_usage_cache.delete('wiki-render-test')
@@ -75,6 +75,8 @@ class AddonList(JSONAPIBaseView, generics.ListAPIView, ListFilterMixin):
     view_name = 'addon-list'
 
     ordering = ()
+    # Addon configs aren't stored in the database
+    allow_python_filtering = True
 
     def get_default_queryset(self):
         return [conf for conf in osf_settings.ADDONS_AVAILABLE_DICT.values() if 'accounts' in conf.configs]
@@ -17,7 +17,8 @@ from api.base.exceptions import (
 from framework.auth import cas
 from framework.auth.core import get_user
 from osf import features
-from osf.models import OSFUser, Session
+from framework.sessions.utils import session_cache
+from osf.models import OSFUser
 from osf.utils.fields import ensure_str
 from website import settings
 
@@ -34,11 +35,7 @@ def get_session_from_cookie(cookie_val):
         session_id = ensure_str(itsdangerous.Signer(settings.SECRET_KEY).unsign(cookie_val))
     except itsdangerous.BadSignature:
         return None
-    try:
-        session = Session.objects.get(_id=session_id)
-        return session
-    except Session.DoesNotExist:
-        return None
+    return session_cache.load(session_id)
 
 
 def check_user(user):
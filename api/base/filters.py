@@ -1,5 +1,6 @@
 import datetime
 import functools
+import logging
 import operator
 import re
 
@@ -22,6 +23,8 @@ from osf.models import Subject, Preprint
 from osf.models.base import GuidMixin
 from functools import cmp_to_key
 
+logger = logging.getLogger(__name__)
+
 def lowercase(lower):
     if hasattr(lower, '__call__'):
         return lower()
@@ -386,7 +389,16 @@ class ListFilterMixin(FilterMixin):
 
     Serializers that want to restrict which fields are used for filtering need to have a variable called
     filterable_fields which is a frozenset of strings representing the field names as they appear in the serialization.
+
+    Fields that don't map directly to a model field, e.g. SerializerMethodFields, can be filtered in the database
+    by declaring a ``filter_expressions`` dict on the serializer, mapping the field name to either a lookup path or
+    a query expression the queryset is annotated with, e.g. ``{'size': Subquery(...)}``.
+
+    Views whose get_default_queryset returns a list are filtered in Python, which loads every object. They must opt
+    in by setting ``allow_python_filtering``.
     """
+    allow_python_filtering = False
+
     FILTERS = {
         'eq': operator.eq,
         'lt': operator.lt,
@@ -418,6 +430,8 @@ class ListFilterMixin(FilterMixin):
         query_parts = []
 
         if filters:
+            if not isinstance(queryset, list):
+                queryset = self.annotate_filter_expressions(queryset, filters)
             for key, field_names in filters.items():
 
                 sub_query_parts = []
@@ -445,6 +459,29 @@ class ListFilterMixin(FilterMixin):
 
         return queryset
 
+    def annotate_filter_expressions(self, queryset, filters):
+        """Point filters on fields listed in the serializer's ``filter_expressions`` at their expressions,
+        annotating ``queryset`` with them where needed.
+        """
+        filter_expressions = getattr(self.serializer_class, 'filter_expressions', {})
+        annotations = {}
+        for field_names in filters.values():
+            for field_name, data in field_names.items():
+                if field_name not in filter_expressions:
+                    continue
+                expression = filter_expressions[field_name]
+                for operation in (data if isinstance(data, list) else [data]):
+                    if operation['source_field_name'] != field_name:
+                        # Already redirected by postprocess_query_param
+                        continue
+                    if isinstance(expression, str):
+                        operation['source_field_name'] = expression
+                    else:
+                        alias = 'filter_{}'.format(field_name)
+                        annotations[alias] = expression
+                        operation['source_field_name'] = alias
+        return queryset.annotate(**annotations) if annotations else queryset
+
     def build_query_from_field(self, field_name, operation):
         query_field_name = operation['source_field_name']
         if operation['op'] == 'ne':
@@ -500,13 +537,19 @@ class ListFilterMixin(FilterMixin):
 
     def get_filtered_queryset(self, field_name, params, default_queryset):
         """filters default queryset based on the serializer field type"""
+        if not self.allow_python_filtering:
+            raise InvalidFilterError(detail='Filtering is not supported on this endpoint.')
+        logger.info('Filtering {} objects on {} in Python for {}'.format(
+            len(default_queryset), field_name, self.__class__.__name__,
+        ))
         field = self.serializer_class._declared_fields[field_name]
         source_field_name = params['source_field_name']
 
         if isinstance(field, ser.SerializerMethodField):
+            serializer_method = self.get_serializer_method(field_name)
             return_val = [
                 item for item in default_queryset
-                if self.FILTERS[params['op']](self.get_serializer_method(field_name)(item), params['value'])
+                if self.FILTERS[params['op']](serializer_method(item), params['value'])
             ]
         elif isinstance(field, ser.CharField):
             if source_field_name in ('_id', 'root'):
@@ -1,8 +1,15 @@
+import base64
+import datetime
+import json
+import uuid
+
 from django.utils import six
 from collections import OrderedDict
 from django.urls import reverse
+from django.core.exceptions import FieldDoesNotExist
 from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
-from django.db.models import QuerySet
+from django.db import connections
+from django.db.models import Q, QuerySet
 
 from rest_framework import pagination
 from rest_framework.exceptions import NotFound
@@ -10,6 +17,7 @@ from rest_framework.response import Response
 from rest_framework.utils.urls import (
     replace_query_param, remove_query_param,
 )
+from api.base.exceptions import InvalidQueryStringError
 from api.base.serializers import is_anonymized
 from api.base.settings import MAX_PAGE_SIZE
 from api.base.utils import absolute_reverse
@@ -28,6 +36,11 @@ class JSONAPIPagination(pagination.PageNumberPagination):
 
     page_size_query_param = 'page[size]'
     max_page_size = MAX_PAGE_SIZE
+    # Passing `page[cursor]` (empty for the first page) switches to keyset pagination
+    cursor_query_param = 'page[cursor]'
+    # `estimate` or `exact`; cursor pages don't include a total unless asked for one
+    total_query_param = 'page[total]'
+    cursor_page = None
 
     def page_number_query(self, url, page_number):
         """
@@ -123,7 +136,12 @@ class JSONAPIPagination(pagination.PageNumberPagination):
         if embedded:
             reversed_url = reverse(view_name, kwargs=kwargs)
 
-        if self.request.version < '2.1':
+        if self.cursor_page is not None:
+            if self.request.version < '2.1':
+                response_dict = self.get_cursor_response_dict_deprecated(data, reversed_url)
+            else:
+                response_dict = self.get_cursor_response_dict(data, reversed_url)
+        elif self.request.version < '2.1':
             response_dict = self.get_response_dict_deprecated(data, reversed_url)
         else:
             response_dict = self.get_response_dict(data, reversed_url)
@@ -164,9 +182,230 @@ class JSONAPIPagination(pagination.PageNumberPagination):
             self.request = request
             return list(self.page)
 
+        elif self.cursor_query_param in request.query_params:
+            return self.paginate_queryset_by_cursor(queryset, request)
+
         else:
             return super(JSONAPIPagination, self).paginate_queryset(queryset, request, view=None)
 
+    def paginate_queryset_by_cursor(self, queryset, request):
+        """
+        Keyset pagination: filters on the values of the view's ordering fields at the edge of
+        the previous page instead of using OFFSET, and never counts the whole list.
+        """
+        if not isinstance(queryset, QuerySet):
+            raise InvalidQueryStringError(
+                detail='Cursor pagination is not supported for this endpoint.',
+                parameter=self.cursor_query_param,
+            )
+        page_size = self.get_page_size(request)
+        ordering = get_keyset_ordering(queryset)
+        position, reverse = self.decode_cursor(request.query_params[self.cursor_query_param], ordering)
+
+        total = None
+        total_type = request.query_params.get(self.total_query_param)
+        if total_type == 'estimate':
+            total = estimate_count(queryset)
+        elif total_type == 'exact':
+            total = queryset.count()
+        elif total_type is not None:
+            raise InvalidQueryStringError(
+                detail='Value must be "estimate" or "exact".',
+                parameter=self.total_query_param,
+            )
+
+        query_ordering = [reverse_ordering(field) for field in ordering] if reverse else ordering
+        queryset = queryset.order_by(*query_ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(queryset.model, query_ordering, position))
+        # One extra row tells us whether there is another page without counting
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        self.cursor_page = {
+            'ordering': ordering,
+            'results': results,
+            'has_next': has_more if not reverse else True,
+            'has_previous': has_more if reverse else position is not None,
+            'per_page': page_size,
+            'total': total,
+        }
+        self.request = request
+        return results
+
+    def decode_cursor(self, cursor, ordering):
+        """Return ``(position, reverse)`` for a cursor, or ``(None, False)`` for the first page."""
+        if not cursor:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(str(cursor)).decode('utf-8'))
+            position, reverse = data['p'], bool(data['r'])
+        except (TypeError, ValueError, KeyError):
+            position = None
+        if not isinstance(position, list) or len(position) != len(ordering):
+            raise InvalidQueryStringError(detail='Invalid cursor.', parameter=self.cursor_query_param)
+        return position, reverse
+
+    def encode_cursor(self, obj, reverse):
+        position = [
+            serialize_keyset_value(get_ordering_value(obj, field))
+            for field in self.cursor_page['ordering']
+        ]
+        data = json.dumps({'p': position, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+    def cursor_query(self, url, cursor):
+        url = remove_query_param(self.request.build_absolute_uri(url), '_')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_cursor_links(self, url):
+        page = self.cursor_page
+        results = page['results']
+        first = self.cursor_query(url, '')
+        prev_link = next_link = None
+        if results and page['has_previous']:
+            prev_link = self.cursor_query(url, self.encode_cursor(results[0], reverse=True))
+        if results and page['has_next']:
+            next_link = self.cursor_query(url, self.encode_cursor(results[-1], reverse=False))
+        return OrderedDict([
+            ('first', first),
+            ('last', None),
+            ('prev', prev_link),
+            ('next', next_link),
+        ])
+
+    def get_cursor_meta(self):
+        meta = OrderedDict()
+        if self.cursor_page['total'] is not None:
+            meta['total'] = self.cursor_page['total']
+        meta['per_page'] = self.cursor_page['per_page']
+        return meta
+
+    def get_cursor_response_dict_deprecated(self, data, url):
+        links = self.get_cursor_links(url)
+        links['meta'] = self.get_cursor_meta()
+        return OrderedDict([
+            ('data', data),
+            ('links', links),
+        ])
+
+    def get_cursor_response_dict(self, data, url):
+        links = OrderedDict([
+            ('self', self.request.build_absolute_uri(url)),
+        ])
+        links.update(self.get_cursor_links(url))
+        return OrderedDict([
+            ('data', data),
+            ('meta', self.get_cursor_meta()),
+            ('links', links),
+        ])
+
+
+def get_keyset_ordering(queryset):
+    """Return the queryset's ordering as field lookups, ending with the primary key as a tiebreaker."""
+    query = queryset.query
+    ordering = list(query.order_by or (query.default_ordering and queryset.model._meta.ordering) or [])
+    pk_name = queryset.model._meta.pk.name
+    unsupported = query.extra_order_by or any(
+        not isinstance(field, six.string_types) or field == '?' or '.' in field
+        for field in ordering
+    )
+    if unsupported:
+        raise InvalidQueryStringError(
+            detail='Cursor pagination is not supported with this ordering.',
+            parameter='page[cursor]',
+        )
+    if not any(field.lstrip('-') in ('pk', pk_name) for field in ordering):
+        ordering.append('pk')
+    return ordering
+
+
+def reverse_ordering(field):
+    return field[1:] if field.startswith('-') else '-{}'.format(field)
+
+
+def get_ordering_value(obj, field):
+    value = obj
+    for attr in field.lstrip('-').split('__'):
+        value = getattr(value, attr) if value is not None else None
+    return value
+
+
+def serialize_keyset_value(value):
+    # isoformat keeps microseconds, which DjangoJSONEncoder drops
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if value is None or isinstance(value, (six.string_types, six.integer_types, float, bool)):
+        return value
+    raise InvalidQueryStringError(
+        detail='Cursor pagination is not supported with this ordering.',
+        parameter='page[cursor]',
+    )
+
+
+def is_nullable(model, lookup):
+    """Whether ``lookup`` can be NULL; annotations and unknown lookups are assumed to be."""
+    if lookup == 'pk':
+        return False
+    for name in lookup.split('__'):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return True
+        if field.null:
+            return True
+        model = field.related_model
+        if model is None:
+            break
+    return False
+
+
+def keyset_filter(model, ordering, position):
+    """
+    Build the filter for rows that sort after ``position`` in ``ordering``:
+    ``(a > x) OR (a = x AND b > y) OR ...``, following Postgres's default NULL
+    placement (last when ascending, first when descending).
+    """
+    clauses = []
+    equal = Q()
+    for field, value in zip(ordering, position):
+        descending = field.startswith('-')
+        lookup = field.lstrip('-')
+        if value is None:
+            after = ~Q(**{'{}__isnull'.format(lookup): True}) if descending else None
+            same = Q(**{'{}__isnull'.format(lookup): True})
+        else:
+            after = Q(**{'{}__{}'.format(lookup, 'lt' if descending else 'gt'): value})
+            if not descending and is_nullable(model, lookup):
+                after |= Q(**{'{}__isnull'.format(lookup): True})
+            same = Q(**{lookup: value})
+        if after is not None:
+            clauses.append(equal & after)
+        equal &= same
+    if not clauses:
+        # Nothing sorts after a NULL in the last ascending field
+        return Q(pk__in=[])
+    result = clauses[0]
+    for clause in clauses[1:]:
+        result |= clause
+    return result
+
+
+def estimate_count(queryset):
+    """Return the planner's row estimate for ``queryset`` instead of running COUNT(*)."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) {}'.format(sql), params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, six.string_types):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
 
 class MaxSizePagination(JSONAPIPagination):
     page_size = 1000
@@ -220,8 +459,12 @@ class NodeContributorPagination(JSONAPIPagination):
         response = super(NodeContributorPagination, self).get_paginated_response(data)
         response_dict = response.data
         kwargs = self.request.parser_context['kwargs'].copy()
-        node = self.get_resource(kwargs)
-        total_bibliographic = node.visible_contributors.count()
+        prefetched = getattr(self.request.parser_context['view'], 'prefetched_contributors', None)
+        if prefetched is not None:
+            total_bibliographic = len([contributor for contributor in prefetched if contributor.visible])
+        else:
+            node = self.get_resource(kwargs)
+            total_bibliographic = node.visible_contributors.count()
         if self.request.version < '2.1':
             response_dict['links']['meta']['total_bibliographic'] = total_bibliographic
         else:
@@ -28,6 +28,11 @@ from api.base.versioning import KEBAB_CASE_VERSION, get_kebab_snake_case_field
 
 from osf.models.validators import SwitchValidator
 
+# A field as JSONAPISerializer.to_representation will handle it for the current request
+FieldPlanEntry = collections.namedtuple(
+    'FieldPlanEntry', ['field', 'nested_field', 'is_relationship', 'embed', 'hide_relationship'],
+)
+
 def get_meta_type(serializer_class, request):
     meta = getattr(serializer_class, 'Meta', None)
     if meta is None:
@@ -1207,6 +1212,11 @@ class JSONAPIListSerializer(ser.ListSerializer):
                 self.child.to_esi_representation(item, envelope=None) for item in data
             ]
         else:
+            # Give embeds a chance to load what they need for the whole page at once
+            for embed in self.context.get('embed', {}).values():
+                prefetch = getattr(embed, 'prefetch', None)
+                if prefetch:
+                    prefetch(data)
             ret = [
                 self.child.to_representation(item, envelope=envelope) for item in data
             ]
@@ -1373,34 +1383,34 @@ class JSONAPISerializer(BaseAPISerializer):
             field = field.field
         return getattr(field, 'child_relation', field)
 
-    # overrides Serializer
-    def to_representation(self, obj, envelope='data'):
-        """Serialize to final representation.
+    def get_field_plan(self):
+        """Return the fields to serialize for the current request, worked out once per serializer.
 
-        :param obj: Object to be serialized.
-        :param envelope: Key for resource object.
+        Which fields survive the sparse fieldset, anonymization and version checks, which are
+        relationships and which are embedded only depend on the request, not on the object, so
+        the plan is cached on the serializer (list serializers share one child across items) and
+        keyed on everything in the request that it depends on.
         """
-        ret = {}
-        request = self.context.get('request')
+        request = self.context['request']
+        embeds = self.context.get('embed', {})
         type_ = get_meta_type(self, request)
         assert type_ is not None, 'Must define Meta.type_ or Meta.get_type()'
-        self.parse_sparse_fields(allow_unsafe=True, context=self.context)
+        is_anonymous = is_anonymized(request)
+        key = (
+            type_,
+            getattr(request, 'version', None),
+            request.query_params.get('fields[{}]'.format(type_)),
+            frozenset(embeds),
+            is_anonymous,
+        )
+        plans = self.__dict__.setdefault('_field_plans', {})
+        if key not in plans:
+            plans[key] = self.build_field_plan(type_, embeds, is_anonymous)
+        return plans[key]
 
-        data = {
-            'id': '',
-            'type': type_,
-            'attributes': {},
-            'relationships': {},
-            'embeds': {},
-            'links': {},
-        }
+    def build_field_plan(self, type_, embeds, is_anonymous):
+        self.parse_sparse_fields(allow_unsafe=True, context=self.context)
 
-        embeds = self.context.get('embed', {})
-        context_envelope = self.context.get('envelope', envelope)
-        if context_envelope == 'None':
-            context_envelope = None
-        enable_esi = self.context.get('enable_esi', False)
-        is_anonymous = is_anonymized(self.context['request'])
         to_be_removed = set()
         if is_anonymous and hasattr(self, 'non_anonymized_fields'):
             # Drop any fields that are not specified in the `non_anonymized_fields` variable.
@@ -1423,8 +1433,52 @@ class JSONAPISerializer(BaseAPISerializer):
                 ),
             )
 
+        plan = []
         for field in fields:
+            # Whether a ShowIfVersion field is shown only depends on the request version
+            if isinstance(field, ShowIfVersion) and field.should_hide(None) and not field.should_be_none(None):
+                continue
             nested_field = self.get_unwrapped_field(field)
+            plan.append(FieldPlanEntry(
+                field=field,
+                nested_field=nested_field,
+                is_relationship=getattr(field, 'json_api_link', False) or getattr(nested_field, 'json_api_link', False),
+                embed=bool(embeds) and (field.field_name in embeds or bool(getattr(field, 'always_embed', None))),
+                hide_relationship=(
+                    is_anonymous and
+                    hasattr(field, 'view_name') and
+                    field.view_name in self.views_to_hide_if_anonymous
+                ),
+            ))
+        return type_, plan
+
+    # overrides Serializer
+    def to_representation(self, obj, envelope='data'):
+        """Serialize to final representation.
+
+        :param obj: Object to be serialized.
+        :param envelope: Key for resource object.
+        """
+        ret = {}
+        type_, field_plan = self.get_field_plan()
+
+        data = {
+            'id': '',
+            'type': type_,
+            'attributes': {},
+            'relationships': {},
+            'embeds': {},
+            'links': {},
+        }
+
+        context_envelope = self.context.get('envelope', envelope)
+        if context_envelope == 'None':
+            context_envelope = None
+        enable_esi = self.context.get('enable_esi', False)
+        is_anonymous = is_anonymized(self.context['request'])
+
+        for entry in field_plan:
+            field = entry.field
             try:
                 if hasattr(field, 'child_relation'):
                     attribute = field.child_relation.get_attribute(obj)
@@ -1435,7 +1489,7 @@ class JSONAPISerializer(BaseAPISerializer):
             if attribute is None:
                 # We skip `to_representation` for `None` values so that
                 # fields do not have to explicitly deal with that case.
-                if isinstance(nested_field, RelationshipField):
+                if isinstance(entry.nested_field, RelationshipField):
                     # if this is a RelationshipField, serialize as a null relationship
                     data['relationships'][field.field_name] = {'data': None}
                 else:
@@ -1455,10 +1509,10 @@ class JSONAPISerializer(BaseAPISerializer):
                             representation = field.to_representation(attribute)
                 except SkipField:
                     continue
-                if getattr(field, 'json_api_link', False) or getattr(nested_field, 'json_api_link', False):
+                if entry.is_relationship:
                     # If embed=field_name is appended to the query string or 'always_embed' flag is True, directly embed the
                     # results in addition to adding a relationship link
-                    if embeds and (field.field_name in embeds or getattr(field, 'always_embed', None)):
+                    if entry.embed:
                         if enable_esi:
                             try:
                                 result = field.to_esi_representation(attribute, envelope=envelope)
@@ -1475,15 +1529,8 @@ class JSONAPISerializer(BaseAPISerializer):
                             data['embeds'][field.field_name] = result
                         else:
                             data['embeds'][field.field_name] = {'error': 'This field is not embeddable.'}
-                    try:
-                        if not (
-                            is_anonymous and
-                            hasattr(field, 'view_name') and
-                                field.view_name in self.views_to_hide_if_anonymous
-                        ):
-                            data['relationships'][field.field_name] = representation
-                    except SkipField:
-                        continue
+                    if not entry.hide_relationship:
+                        data['relationships'][field.field_name] = representation
                 elif field.field_name == 'id':
                     data['id'] = representation
                 elif field.field_name == 'links':
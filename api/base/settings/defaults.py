@@ -183,7 +183,7 @@ REST_FRAMEWORK = {
         'api.base.authentication.drf.OSFCASAuthentication',
     ),
     'DEFAULT_THROTTLE_CLASSES': (
-        'rest_framework.throttling.UserRateThrottle',
+        'api.base.throttling.UserRateThrottle',
         'api.base.throttling.NonCookieAuthThrottle',
         'api.base.throttling.BurstRateThrottle',
     ),
@@ -320,6 +320,19 @@ ELASTICSEARCH_METRICS_DATE_FORMAT = '%Y'
 WAFFLE_CACHE_NAME = 'waffle_cache'
 STORAGE_USAGE_CACHE_NAME = 'storage_usage'
 STORAGE_USAGE_MAX_ENTRIES = 10000000
+# Caches successful CAS bearer-token profile lookups. Should point at a shared backend
+# (e.g. memcached or redis) in production so revocations are seen by every worker.
+CAS_TOKEN_CACHE_NAME = 'cas_token_cache'
+# Rendered wiki HTML and text; entries are content-addressed and never expire, so they get their
+# own table, culled separately from the storage usage cache
+WIKI_RENDER_CACHE_NAME = 'wiki_render'
+WIKI_RENDER_CACHE_MAX_ENTRIES = 1000000
+# Sessions, in front of the database. Should point at a shared backend (e.g. memcached or redis)
+# in production so removed sessions are seen by every worker.
+SESSION_CACHE_NAME = 'session_cache'
+# API throttle state. Should point at a shared backend (e.g. memcached or redis) in production,
+# so rate limits are enforced across every worker rather than per process.
+THROTTLE_CACHE_NAME = 'throttle_cache'
 
 
 CACHES = {
@@ -336,6 +349,22 @@ CACHES = {
     WAFFLE_CACHE_NAME: {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     },
+    CAS_TOKEN_CACHE_NAME: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    SESSION_CACHE_NAME: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    THROTTLE_CACHE_NAME: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    WIKI_RENDER_CACHE_NAME: {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'osf_wiki_render_cache_table',
+        'OPTIONS': {
+            'MAX_ENTRIES': WIKI_RENDER_CACHE_MAX_ENTRIES,
+        },
+    },
 }
 
 SLOAN_ID_COOKIE_NAME = 'sloan_id'
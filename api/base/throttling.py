@@ -1,27 +1,38 @@
-from rest_framework import permissions
-from rest_framework.throttling import UserRateThrottle, AnonRateThrottle, SimpleRateThrottle
+from rest_framework import permissions, throttling
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle
+from django.core.cache import caches
 import logging
+import time
 
 from api.base import settings
 
 logger = logging.getLogger(__name__)
 
 
-class BaseThrottle(SimpleRateThrottle):
+class GCRAThrottle(SimpleRateThrottle):
+    """Rate throttle using the generic cell rate algorithm, a token bucket that needs constant space.
 
-    def get_ident(self, request):
-        if request.META.get('HTTP_X_THROTTLE_TOKEN'):
-            return request.META['HTTP_X_THROTTLE_TOKEN']
-        return super(BaseThrottle, self).get_ident(request)
+    Instead of the time of every request in the last ``duration``, the only state kept per key is
+    its theoretical arrival time: when its bucket would be full again. Every request adds one
+    emission interval (``duration / num_requests``) to it, and is allowed unless that puts it more
+    than ``duration`` in the future. State lives in the ``THROTTLE_CACHE_NAME`` cache, and each
+    key is updated under a lock taken with ``cache.add``, so concurrent requests can't both spend
+    the last token. A request that can't take the lock is checked against the stored state
+    without updating it, so contention can't be used to get past the throttle.
+    """
+    cache_format = 'throttle_gcra_%(scope)s_%(ident)s'
+    lock_attempts = 5
+    lock_delay = 0.005
+    lock_timeout = 1
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE_NAME]
 
     def allow_request(self, request, view):
         """
         Implement the check to see if the request should be throttled.
         """
-        if self.get_ident(request) == settings.BYPASS_THROTTLE_TOKEN:
-            logger.info('Bypass header (X-Throttle-Token) passed')
-            return True
-
         if self.rate is None:
             return True
 
@@ -29,16 +40,57 @@ class BaseThrottle(SimpleRateThrottle):
         if self.key is None:
             return True
 
-        self.history = self.cache.get(self.key, [])
+        lock_key = '{}_lock'.format(self.key)
+        for attempt in range(self.lock_attempts):
+            if self.cache.add(lock_key, True, self.lock_timeout):
+                break
+            time.sleep(self.lock_delay)
+        else:
+            # Another process holds the lock, or died holding it
+            logger.warning('Could not lock throttle state for {}, checking it without an update'.format(self.key))
+            return self.check_arrival(update=False)
+
+        try:
+            return self.check_arrival()
+        finally:
+            self.cache.delete(lock_key)
+
+    def check_arrival(self, update=True):
+        """Return whether the request fits under the rate, adding it to the stored state if ``update``."""
         self.now = self.timer()
+        interval = self.duration / self.num_requests
+        arrival = max(self.cache.get(self.key, self.now), self.now) + interval
+        self.wait_time = arrival - self.now - self.duration
+        if self.wait_time > 0:
+            return self.throttle_failure()
+        if update:
+            self.cache.set(self.key, arrival, arrival - self.now)
+        return True
 
-        # Drop any requests from the history which have now passed the throttle duration
-        while self.history and self.history[-1] <= self.now - self.duration:
-            self.history.pop()
+    def wait(self):
+        """
+        Returns the recommended next request time in seconds.
+        """
+        return self.wait_time
 
-        if len(self.history) >= self.num_requests:
-            return self.throttle_failure()
-        return self.throttle_success()
+
+class BaseThrottle(GCRAThrottle):
+
+    def get_ident(self, request):
+        if request.META.get('HTTP_X_THROTTLE_TOKEN'):
+            return request.META['HTTP_X_THROTTLE_TOKEN']
+        return super(BaseThrottle, self).get_ident(request)
+
+    def allow_request(self, request, view):
+        if self.get_ident(request) == settings.BYPASS_THROTTLE_TOKEN:
+            logger.info('Bypass header (X-Throttle-Token) passed')
+            return True
+
+        return super(BaseThrottle, self).allow_request(request, view)
+
+
+class UserRateThrottle(GCRAThrottle, throttling.UserRateThrottle):
+    pass
 
 
 class NonCookieAuthThrottle(BaseThrottle, AnonRateThrottle):
@@ -83,7 +135,7 @@ class CreateGuidThrottle(BaseThrottle, UserRateThrottle):
         return super(CreateGuidThrottle, self).allow_request(request, view)
 
 
-class RootAnonThrottle(AnonRateThrottle):
+class RootAnonThrottle(GCRAThrottle, AnonRateThrottle):
 
     scope = 'root-anon-throttle'
 
@@ -65,18 +65,14 @@ class JSONAPIBaseView(generics.GenericAPIView):
         if getattr(field, 'field', None):
             field = field.field
 
-        def partial(item):
+        def get_view(item):
+            """Set up the embedded view for ``item``, returning ``(v, view)`` or None if the field doesn't resolve."""
             # resolve must be implemented on the field
             v, view_args, view_kwargs = field.resolve(item, field_name, self.request)
             if not v:
                 return None
 
             request = EmbeddedRequest(self.request)
-
-            if not hasattr(request._request, '_embed_cache'):
-                request._request._embed_cache = {}
-            cache = request._request._embed_cache
-
             request.parents.setdefault(type(item), {})[item._id] = item
 
             view_kwargs.update({
@@ -92,6 +88,41 @@ class JSONAPIBaseView(generics.GenericAPIView):
             view.request = request
             view.request.parser_context['kwargs'] = view_kwargs
             view.format_kwarg = view.get_format_suffix(**view_kwargs)
+            return v, view
+
+        # Views set up by prefetch, keyed by the item they were built for
+        prefetched = {}
+
+        def prefetch(items):
+            """Set up the embedded views for a page of items and let each view class load
+            what they need in bulk via its ``prefetch_embedded`` hook, if it has one.
+            """
+            views_by_class = defaultdict(list)
+            for item in items:
+                try:
+                    resolved = get_view(item)
+                except Exception:
+                    # partial will resolve this item again and handle the error
+                    continue
+                prefetched[(type(item), item.id)] = resolved
+                if resolved:
+                    views_by_class[resolved[0].cls].append(resolved[1])
+
+            for view_class, views in views_by_class.items():
+                if getattr(view_class, 'prefetch_embedded', None):
+                    views[0].prefetch_embedded(views)
+
+        def partial(item):
+            key = (type(item), item.id)
+            resolved = prefetched.pop(key) if key in prefetched else get_view(item)
+            if not resolved:
+                return None
+            v, view = resolved
+            request = view.request
+
+            if not hasattr(request._request, '_embed_cache'):
+                request._request._embed_cache = {}
+            cache = request._request._embed_cache
 
             if not isinstance(view, ListModelMixin):
                 try:
@@ -137,6 +168,7 @@ class JSONAPIBaseView(generics.GenericAPIView):
 
             return ret
 
+        partial.prefetch = prefetch
         return partial
 
     def get_serializer_context(self):
@@ -506,12 +538,38 @@ class BaseContributorDetail(JSONAPIBaseView, generics.RetrieveAPIView):
 class BaseContributorList(JSONAPIBaseView, generics.ListAPIView, ListFilterMixin):
 
     ordering = ('-modified',)
+    # Set by prefetch_embedded when this list is embedded
+    prefetched_contributors = None
 
     def get_default_queryset(self):
         node = self.get_node()
 
+        if self.prefetched_contributors is not None:
+            for contributor in self.prefetched_contributors:
+                contributor.node = node
+            return list(self.prefetched_contributors)
         return node.contributor_set.all().include('user__guids')
 
+    def filter_queryset(self, queryset):
+        if self.prefetched_contributors is not None:
+            # Already in `_order`, which the ordering filter leaves contributor_set querysets in
+            return queryset
+        return super(BaseContributorList, self).filter_queryset(queryset)
+
+    def prefetch_embedded(self, views):
+        """Load the contributors of every embedded list on the page in one query."""
+        node_ids = {view.kwargs[self.node_lookup_url_kwarg] for view in views}
+        contributors = defaultdict(list)
+        queryset = Contributor.objects.filter(
+            node__guids___id__in=node_ids,
+        ).annotate(
+            node_guid=F('node__guids___id'),
+        ).include('user__guids').order_by('node_id', '_order')
+        for contributor in queryset:
+            contributors[contributor.node_guid].append(contributor)
+        for view in views:
+            view.prefetched_contributors = contributors[view.kwargs[self.node_lookup_url_kwarg]]
+
     def get_queryset(self):
         queryset = self.get_queryset_from_request()
         # If bulk request, queryset only contains contributors in request
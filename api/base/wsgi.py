@@ -61,3 +61,6 @@ init_app(set_backends=True, routes=False, attach_request_handlers=False)
 api_settings.load_origins_whitelist()
 
 application = get_wsgi_application()
+
+from api.citations.utils import preload_citation_styles  # noqa
+preload_citation_styles()
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
+import logging
 import os
 import re
+from functools import lru_cache
 from rest_framework import status as http_status
 
 from citeproc import CitationStylesStyle, CitationStylesBibliography
@@ -12,7 +14,15 @@ from citeproc.source.json import CiteProcJSON
 from framework.exceptions import HTTPError
 from framework.auth import utils
 from osf.models.citation import CitationStyle
-from website.settings import CITATION_STYLES_PATH, BASE_PATH, CUSTOM_CITATIONS
+from website.settings import (
+    BASE_PATH,
+    CITATION_STYLE_CACHE_SIZE,
+    CITATION_STYLES_PATH,
+    CITATION_STYLES_TO_PRELOAD,
+    CUSTOM_CITATIONS,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def clean_up_common_errors(cit):
@@ -44,27 +54,56 @@ def process_name(node, user):
     }
 
 
-def render_citation(node, style='apa'):
-    """Given a node, return a citation"""
-    reformat_styles = ['apa', 'chicago-author-date', 'modern-language-association']
-    csl = node.csl
-    data = [csl, ]
-
-    bib_source = CiteProcJSON(data)
+@lru_cache(maxsize=CITATION_STYLE_CACHE_SIZE)
+def get_citation_style(style):
+    """Return the parsed ``CitationStylesStyle`` for ``style``, resolving dependent styles to their parent.
 
+    Parsed styles are kept for the life of the process, so the parent style lookup only happens
+    once per dependent style. Unknown styles raise ValueError and are not cached.
+    """
     custom = CUSTOM_CITATIONS.get(style, False)
     path = os.path.join(BASE_PATH, 'static', custom) if custom else os.path.join(CITATION_STYLES_PATH, style)
 
     try:
-        bib_style = CitationStylesStyle(path, validate=False)
+        return CitationStylesStyle(path, validate=False)
     except ValueError:
         citation_style = CitationStyle.load(style)
         if citation_style is not None and citation_style.has_parent_style:
-            parent_style = citation_style.parent_style
-            parent_path = os.path.join(CITATION_STYLES_PATH, parent_style)
-            bib_style = CitationStylesStyle(parent_path, validate=False)
-        else:
-            raise ValueError('Unable to find a dependent or independent parent style related to {}.csl'.format(style))
+            return get_citation_style(citation_style.parent_style)
+        raise ValueError('Unable to find a dependent or independent parent style related to {}.csl'.format(style))
+
+
+def preload_citation_styles(styles=CITATION_STYLES_TO_PRELOAD):
+    """Parse the most requested styles ahead of the first request"""
+    for style in styles:
+        try:
+            get_citation_style(style)
+        except (IOError, ValueError):
+            logger.exception('Could not preload citation style {}'.format(style))
+
+
+def render_citation(node, style='apa'):
+    """Given a node, return a citation"""
+    return render_citations([node], style=style)[node._id]
+
+
+def render_citations(nodes, style='apa'):
+    """Given nodes or preprints, return a dict of citations keyed by their _id
+
+    The style is parsed once and every item is read from one CSL-JSON source. Each citation
+    is rendered as its own one-entry bibliography so that it matches ``render_citation``.
+    """
+    bib_style = get_citation_style(style)
+    csls = [node.csl for node in nodes]
+    bib_source = CiteProcJSON(csls)
+    return {
+        node._id: _render_citation(node, csl, style, bib_style, bib_source)
+        for node, csl in zip(nodes, csls)
+    }
+
+
+def _render_citation(node, csl, style, bib_style, bib_source):
+    reformat_styles = ['apa', 'chicago-author-date', 'modern-language-association']
 
     bibliography = CitationStylesBibliography(bib_style, bib_source, formatter.plain)
 
@@ -164,6 +164,8 @@ class DraftContributorsList(NodeContributorsList, DraftRegistrationMixin):
     )
 
     pagination_class = DraftRegistrationContributorPagination
+    # BaseContributorList's prefetch_embedded loads node contributors, not draft ones
+    prefetch_embedded = None
 
     required_read_scopes = [CoreScopes.DRAFT_REGISTRATIONS_READ]
     required_write_scopes = [CoreScopes.DRAFT_REGISTRATIONS_WRITE]
@@ -2,12 +2,13 @@ from datetime import datetime
 from collections import OrderedDict
 
 from django.core.urlresolvers import resolve, reverse
+from django.db.models import OuterRef, Subquery
 import furl
 import pytz
 import jsonschema
 
 from framework.auth.core import Auth
-from osf.models import BaseFileNode, OSFUser, Comment, Preprint, AbstractNode
+from osf.models import BaseFileNode, OSFUser, Comment, Preprint, AbstractNode, FileVersion
 from rest_framework import serializers as ser
 from rest_framework.fields import SkipField
 from website import settings
@@ -159,6 +160,12 @@ class BaseFileSerializer(JSONAPISerializer):
         'last_touched',
         'tags',
     ])
+    filter_expressions = {
+        # Matches get_size: the size of the latest version
+        'size': Subquery(
+            FileVersion.objects.filter(basefilenode=OuterRef('pk')).order_by('-created').values('size')[:1],
+        ),
+    }
     id = IDField(source='_id', read_only=True)
     type = TypeField()
     guid = ser.SerializerMethodField(
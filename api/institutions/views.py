@@ -416,6 +416,8 @@ class InstitutionImpactList(JSONAPIBaseView, ListFilterMixin, generics.ListAPIVi
     required_write_scopes = [CoreScopes.NULL]
 
     view_category = 'institutions'
+    # Metrics come from Elasticsearch, as a MockQueryset
+    allow_python_filtering = True
 
     @property
     def is_csv_export(self):
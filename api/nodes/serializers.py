@@ -571,7 +571,7 @@ class NodeSerializer(TaxonomizableSerializerMixin, JSONAPISerializer):
             user_perms = obj.get_permissions(user)[::-1]
 
         user_perms = user_perms or default_perm
-        if not user_perms and user in obj.parent_admin_users:
+        if not user_perms and obj.is_admin_parent(user):
             user_perms = [osf_permissions.READ]
         return user_perms
 
@@ -5,6 +5,7 @@ from django.db.models import Q, OuterRef, Exists, Subquery, CharField, Value, Bo
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from rest_framework.exceptions import PermissionDenied, NotFound
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.status import is_server_error
 import requests
 
@@ -13,6 +14,7 @@ from addons.wiki.models import NodeSettings as WikiNodeSettings
 from osf.models import AbstractNode, Preprint, Guid, NodeRelation, Contributor
 from osf.models.node import NodeGroupObjectPermission
 from osf.utils import permissions
+from osf.utils.permission_resolver import prime_node_permissions
 
 from api.base.exceptions import ServiceUnavailableError
 from api.base.utils import get_object_or_error, waterbutler_api_url_for, get_user_auth, has_admin_scope
@@ -111,3 +113,18 @@ class NodeOptimizationMixin(object):
             has_admin_scope=Value(admin_scope, output_field=BooleanField()),
             region=Subquery(node_settings.values('region_abbrev')[:1]),
         )
+
+
+class NodePermissionResolverMixin(object):
+    """Bulk-load the requesting user's permissions on each page of nodes.
+
+    Permission checks made while serializing the page (``has_permission``, ``can_view``,
+    ``can_edit``, ``current_user_permissions``) then answer from memory instead of running
+    guardian lookups per node. Only applies to read-only requests. Must come before
+    ``JSONAPIBaseView`` in the bases of the view.
+    """
+    def paginate_queryset(self, queryset):
+        page = super(NodePermissionResolverMixin, self).paginate_queryset(queryset)
+        if page is not None and self.request.method in SAFE_METHODS:
+            prime_node_permissions(self.request.user, page)
+        return page
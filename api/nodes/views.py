@@ -112,7 +112,7 @@ from api.nodes.serializers import (
     NodeGroupsCreateSerializer,
     NodeGroupsDetailSerializer,
 )
-from api.nodes.utils import NodeOptimizationMixin, enforce_no_children
+from api.nodes.utils import NodeOptimizationMixin, NodePermissionResolverMixin, enforce_no_children
 from api.osf_groups.views import OSFGroupMixin
 from api.preprints.serializers import PreprintSerializer
 from api.registrations.serializers import (
@@ -138,6 +138,7 @@ from osf.models import NodeRelation, Guid
 from osf.models import BaseFileNode
 from osf.models.files import File, Folder
 from addons.osfstorage.models import Region
+from osf.utils.permission_resolver import prime_node_permissions
 from osf.utils.permissions import ADMIN, WRITE_NODE
 from website import mails, settings
 
@@ -181,6 +182,29 @@ class NodeMixin(object):
             self.check_object_permissions(self.request, node)
         return node
 
+    def prefetch_embedded(self, views):
+        """Load the nodes for a page of embedded views of this class in one query, and the
+        requesting user's permissions on them, instead of once per embedding item.
+        """
+        node_ids = {
+            view.kwargs[self.node_lookup_url_kwarg] for view in views
+            if view.kwargs[self.node_lookup_url_kwarg] not in view.request.parents[Node]
+        }
+        if not node_ids:
+            return
+        # Deleted nodes are left to get_node, which reports them as gone
+        nodes = Node.objects.filter(guids___id__in=node_ids, is_deleted=False).annotate(
+            region=F('addons_osfstorage_node_settings__region___id'),
+        ).exclude(region=None)
+        nodes = {node._id: node for node in nodes}
+        for view in views:
+            node = nodes.get(view.kwargs[self.node_lookup_url_kwarg])
+            if node is not None:
+                view.request.parents[Node].setdefault(node._id, node)
+        # Embedded requests always claim to be GETs; check the method of the real one
+        if self.request._request.method in drf_permissions.SAFE_METHODS:
+            prime_node_permissions(self.request.user, list(nodes.values()))
+
 
 class DraftMixin(object):
 
@@ -226,7 +250,7 @@ class DraftMixin(object):
         return draft
 
 
-class NodeList(JSONAPIBaseView, bulk_views.BulkUpdateJSONAPIView, bulk_views.BulkDestroyJSONAPIView, bulk_views.ListBulkCreateJSONAPIView, NodesFilterMixin, WaterButlerMixin, NodeOptimizationMixin):
+class NodeList(NodePermissionResolverMixin, JSONAPIBaseView, bulk_views.BulkUpdateJSONAPIView, bulk_views.BulkDestroyJSONAPIView, bulk_views.ListBulkCreateJSONAPIView, NodesFilterMixin, WaterButlerMixin, NodeOptimizationMixin):
     """The documentation for this endpoint can be found [here](https://developer.osf.io/#operation/nodes_list).
     """
     permission_classes = (
@@ -603,6 +627,8 @@ class NodeBibliographicContributorsList(BaseContributorList, NodeMixin):
 
     def get_default_queryset(self):
         contributors = super(NodeBibliographicContributorsList, self).get_default_queryset()
+        if isinstance(contributors, list):
+            return [contributor for contributor in contributors if contributor.visible]
         return contributors.filter(visible=True)
 
 
@@ -719,7 +745,7 @@ class NodeRegistrationsList(JSONAPIBaseView, generics.ListCreateAPIView, NodeMix
             raise e
 
 
-class NodeChildrenList(BaseChildrenList, bulk_views.ListBulkCreateJSONAPIView, NodeMixin):
+class NodeChildrenList(NodePermissionResolverMixin, BaseChildrenList, bulk_views.ListBulkCreateJSONAPIView, NodeMixin):
     """The documentation for this endpoint can be found [here](https://developer.osf.io/#operation/nodes_children_list).
     """
 
@@ -64,6 +64,8 @@ from osf.metrics import PreprintDownload, PreprintView
 class PreprintMixin(NodeMixin):
     serializer_class = PreprintSerializer
     preprint_lookup_url_kwarg = 'preprint_id'
+    # NodeMixin's prefetch_embedded loads nodes by node_id, which preprint routes don't have
+    prefetch_embedded = None
 
     def get_preprint(self, check_object_permissions=True, ignore_404=False):
         qs = Preprint.objects.filter(guids___id=self.kwargs[self.preprint_lookup_url_kwarg], guids___id__isnull=False)
@@ -345,6 +347,8 @@ class PreprintContributorsList(NodeContributorsList, PreprintMixin):
     )
 
     pagination_class = PreprintContributorPagination
+    # BaseContributorList's prefetch_embedded loads node contributors, not preprint ones
+    prefetch_embedded = None
 
     required_read_scopes = [CoreScopes.PREPRINT_CONTRIBUTORS_READ]
     required_write_scopes = [CoreScopes.PREPRINT_CONTRIBUTORS_WRITE]
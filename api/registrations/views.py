@@ -82,6 +82,8 @@ class RegistrationMixin(NodeMixin):
 
     serializer_class = RegistrationSerializer
     node_lookup_url_kwarg = 'node_id'
+    # get_node always queries, so there's nothing to gain from loading registrations in bulk
+    prefetch_embedded = None
 
     def get_node(self, check_object_permissions=True):
         node = get_object_or_error(
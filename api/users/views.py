@@ -3,7 +3,6 @@ import pytz
 from django.apps import apps
 from django.db.models import F
 from guardian.shortcuts import get_objects_for_user
-from rest_framework.throttling import UserRateThrottle
 
 from api.addons.views import AddonSettingsMixin
 from api.base import permissions as base_permissions
@@ -25,11 +24,11 @@ from api.base.utils import (
     is_truthy,
 )
 from api.base.views import JSONAPIBaseView, WaterButlerMixin
-from api.base.throttling import SendEmailThrottle, SendEmailDeactivationThrottle, NonCookieAuthThrottle, BurstRateThrottle
+from api.base.throttling import SendEmailThrottle, SendEmailDeactivationThrottle, NonCookieAuthThrottle, BurstRateThrottle, UserRateThrottle
 from api.institutions.serializers import InstitutionSerializer
 from api.nodes.filters import NodesFilterMixin, UserNodesFilterMixin
 from api.nodes.serializers import DraftRegistrationLegacySerializer
-from api.nodes.utils import NodeOptimizationMixin
+from api.nodes.utils import NodeOptimizationMixin, NodePermissionResolverMixin
 from api.osf_groups.serializers import GroupSerializer
 from api.preprints.serializers import PreprintSerializer
 from api.registrations.serializers import RegistrationSerializer
@@ -111,6 +110,9 @@ class UserMixin(object):
             if user._id == key:
                 if check_permissions:
                     self.check_object_permissions(self.request, user)
+                if key in self.request.parents[OSFUser]:
+                    # Loaded by prefetch_embedded
+                    return self.request.parents[OSFUser][key]
                 return get_object_or_error(
                     OSFUser.objects.filter(id=user.id).annotate(default_region=F('addons_osfstorage_user_settings__default_region___id')).exclude(default_region=None),
                     request=self.request,
@@ -141,6 +143,27 @@ class UserMixin(object):
             self.check_object_permissions(self.request, obj)
         return obj
 
+    def prefetch_embedded(self, views):
+        """Load the users for a page of embedded views of this class in one query, instead of
+        once per embedding item.
+        """
+        keys = {
+            view.kwargs[self.user_lookup_url_kwarg] for view in views
+            if view.kwargs[self.user_lookup_url_kwarg] not in view.request.parents[OSFUser]
+        }
+        keys.discard('me')
+        if not keys:
+            return
+        # Disabled users are left to get_user, which reports them as gone
+        users = OSFUser.objects.filter(guids___id__in=keys, date_disabled__isnull=True).annotate(
+            default_region=F('addons_osfstorage_user_settings__default_region___id'),
+        ).exclude(default_region=None)
+        users = {user._id: user for user in users}
+        for view in views:
+            user = users.get(view.kwargs[self.user_lookup_url_kwarg])
+            if user is not None:
+                view.request.parents[OSFUser].setdefault(user._id, user)
+
 
 class UserList(JSONAPIBaseView, generics.ListAPIView, ListFilterMixin):
     """The documentation for this endpoint can be found [here](https://developer.osf.io/#operation/users_list).
@@ -298,7 +321,7 @@ class UserAddonAccountDetail(JSONAPIBaseView, generics.RetrieveAPIView, UserMixi
         return account
 
 
-class UserNodes(JSONAPIBaseView, generics.ListAPIView, UserMixin, UserNodesFilterMixin, NodeOptimizationMixin):
+class UserNodes(NodePermissionResolverMixin, JSONAPIBaseView, generics.ListAPIView, UserMixin, UserNodesFilterMixin, NodeOptimizationMixin):
     """The documentation for this endpoint can be found [here](https://developer.osf.io/#operation/users_nodes_list).
     """
     permission_classes = (
@@ -824,6 +847,8 @@ class UserEmailsList(JSONAPIBaseView, generics.ListAPIView, generics.CreateAPIVi
     view_name = 'user-emails'
 
     serializer_class = UserEmailsSerializer
+    # Unconfirmed emails only exist in the user's email_verifications
+    allow_python_filtering = True
 
     def get_default_queryset(self):
         user = self.get_user()
@@ -5,6 +5,7 @@ import pytest
 import pytz
 
 from dateutil import parser
+from django.db.models.functions import Length
 from django.utils import timezone
 
 from nose.tools import *  # noqa:
@@ -23,6 +24,7 @@ from api.base.exceptions import (
     InvalidFilterComparisonType,
     InvalidFilterMatchType,
 )
+from osf.models import AbstractNode
 from osf_tests.factories import (
     NodeFactory,
     AuthUserFactory,
@@ -88,6 +90,30 @@ class FakeRecord(object):
 class FakeListView(ListFilterMixin):
 
     serializer_class = FakeSerializer
+    allow_python_filtering = True
+
+
+class FakeMethodFieldSerializer(ser.Serializer):
+
+    filterable_fields = ('title_length', 'creator_name')
+    filter_expressions = {
+        'title_length': Length('title'),
+        'creator_name': 'creator__fullname',
+    }
+
+    title_length = ser.SerializerMethodField()
+    creator_name = ser.SerializerMethodField()
+
+    def get_title_length(self, obj):
+        return len(obj.title)
+
+    def get_creator_name(self, obj):
+        return obj.creator.fullname
+
+
+class FakeMethodFieldListView(ListFilterMixin):
+
+    serializer_class = FakeMethodFieldSerializer
 
 
 class TestFilterMixin(ApiTestCase):
@@ -153,6 +179,27 @@ class TestFilterMixin(ApiTestCase):
             False
         )
 
+    def test_get_filtered_queryset_requires_opt_in(self):
+        view = FakeMethodFieldListView()
+        params = {'value': '3', 'op': 'eq', 'source_field_name': 'title_length'}
+        with assert_raises(InvalidFilterError):
+            view.get_filtered_queryset('title_length', params, [])
+
+    def test_method_fields_filtered_in_database(self):
+        creator = AuthUserFactory(fullname='Fin Tech')
+        short = NodeFactory(title='abc', creator=creator)
+        NodeFactory(title='abcdef', creator=creator)
+        other = NodeFactory(title='xyz')
+        view = FakeMethodFieldListView()
+        default_queryset = AbstractNode.objects.all()
+
+        filtered = view.param_queryset({'filter[title_length]': '3'}, default_queryset)
+        assert_false(isinstance(filtered, list))
+        assert_equal(set(filtered), {short, other})
+
+        filtered = view.param_queryset({'filter[title_length]': '3', 'filter[creator_name]': 'Fin Tech'}, default_queryset)
+        assert_equal(list(filtered), [short])
+
     def test_parse_query_params_uses_field_source_attribute(self):
         query_params = {
             'filter[bool_field]': 'false',
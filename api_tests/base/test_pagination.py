@@ -54,3 +54,76 @@ class TestJSONAPIPagination(ApiTestCase):
         assert_not_in('meta', links)
         assert_in('total', meta)
         assert_in('per_page', meta)
+
+
+class TestJSONAPICursorPagination(ApiTestCase):
+
+    def setUp(self):
+        super(TestJSONAPICursorPagination, self).setUp()
+        self.user = factories.AuthUserFactory()
+        for i in range(0, 11):
+            factories.ProjectFactory(creator=self.user, title='Project {:02d}'.format(10 - i))
+        self.url = '/{}nodes/?version=2.1&page[size]=4'.format(settings.API_BASE)
+        self.cursor_url = '{}&page[cursor]='.format(self.url)
+
+    def get_ids(self, res):
+        return [node['id'] for node in res.json['data']]
+
+    def test_cursor_pages_match_page_numbers(self):
+        res = self.app.get('/{}nodes/?version=2.1&page[size]=100'.format(settings.API_BASE), auth=self.user.auth)
+        expected = self.get_ids(res)
+
+        ids = []
+        url = self.cursor_url
+        pages = 0
+        while url:
+            res = self.app.get(url, auth=self.user.auth)
+            assert_equal(res.status_code, 200)
+            ids.extend(self.get_ids(res))
+            url = res.json['links']['next']
+            pages += 1
+        assert_equal(ids, expected)
+        assert_equal(pages, 3)
+
+    def test_cursor_links_and_meta(self):
+        res = self.app.get(self.cursor_url, auth=self.user.auth)
+        links = res.json['links']
+        meta = res.json['meta']
+        assert_is_none(links['prev'])
+        assert_is_none(links['last'])
+        assert_in('page%5Bcursor%5D=', links['first'])
+        assert_is_not_none(links['next'])
+        assert_not_in('total', meta)
+        assert_equal(meta['per_page'], 4)
+
+        second = self.app.get(links['next'], auth=self.user.auth)
+        assert_is_not_none(second.json['links']['prev'])
+        previous = self.app.get(second.json['links']['prev'], auth=self.user.auth)
+        assert_equal(self.get_ids(previous), self.get_ids(res))
+
+    def test_cursor_follows_requested_sort(self):
+        res = self.app.get('/{}nodes/?version=2.1&page[size]=100&sort=title'.format(settings.API_BASE), auth=self.user.auth)
+        expected = self.get_ids(res)
+        res = self.app.get('{}&sort=title'.format(self.cursor_url), auth=self.user.auth)
+        second = self.app.get(res.json['links']['next'], auth=self.user.auth)
+        assert_equal(self.get_ids(res) + self.get_ids(second), expected[:8])
+
+    def test_cursor_totals(self):
+        res = self.app.get('{}&page[total]=exact'.format(self.cursor_url), auth=self.user.auth)
+        assert_equal(res.json['meta']['total'], 11)
+        res = self.app.get('{}&page[total]=estimate'.format(self.cursor_url), auth=self.user.auth)
+        assert_true(isinstance(res.json['meta']['total'], int))
+        res = self.app.get('{}&page[total]=all'.format(self.cursor_url), auth=self.user.auth, expect_errors=True)
+        assert_equal(res.status_code, 400)
+
+    def test_invalid_cursor(self):
+        res = self.app.get('{}notacursor'.format(self.cursor_url), auth=self.user.auth, expect_errors=True)
+        assert_equal(res.status_code, 400)
+        assert_equal(res.json['errors'][0]['source']['parameter'], 'page[cursor]')
+
+    def test_cursor_pagination_deprecated_version(self):
+        url = '/{}nodes/?page[size]=4&page[cursor]='.format(settings.API_BASE)
+        res = self.app.get(url, auth=self.user.auth)
+        links = res.json['links']
+        assert_in('next', links)
+        assert_equal(links['meta']['per_page'], 4)
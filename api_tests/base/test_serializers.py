@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from rest_framework import status as http_status
 import importlib
+import mock
 import pkgutil
 
 import pytest
@@ -11,6 +12,8 @@ from future.moves.urllib.parse import quote
 from nose.tools import *  # noqa:
 import re
 
+from django.http import QueryDict
+
 from tests.base import ApiTestCase, DbTestCase
 from osf_tests import factories
 from tests.utils import make_drf_request_with_version
@@ -626,6 +629,37 @@ class TestShowIfVersion(ApiTestCase):
         assert_not_in('node_links', data['relationships'])
 
 
+class TestFieldPlan(ApiTestCase):
+
+    def setUp(self):
+        super(TestFieldPlan, self).setUp()
+        self.nodes = [factories.NodeFactory() for _ in range(3)]
+
+    def test_plan_built_once_for_list(self):
+        req = make_drf_request_with_version(version='2.0')
+        with mock.patch.object(JSONAPISerializer, 'build_field_plan', autospec=True, side_effect=JSONAPISerializer.build_field_plan) as build:
+            data = NodeSerializer(self.nodes, many=True, context={'request': req}).data
+        assert_equal(build.call_count, 1)
+        assert_equal([item['id'] for item in data], [node._id for node in self.nodes])
+        for item in data:
+            assert_in('node_links', item['relationships'])
+
+    def test_plan_follows_request(self):
+        serializer = NodeSerializer(context={'request': make_drf_request_with_version(version='2.0')})
+        assert_in('node_links', serializer.to_representation(self.nodes[0])['data']['relationships'])
+
+        serializer._context = {'request': make_drf_request_with_version(version='2.1')}
+        assert_not_in('node_links', serializer.to_representation(self.nodes[0])['data']['relationships'])
+
+    def test_sparse_fieldset(self):
+        req = make_drf_request_with_version(version='2.0')
+        req._request.GET = QueryDict('fields[nodes]=title')
+        data = NodeSerializer(self.nodes, many=True, context={'request': req}).data
+        for item in data:
+            assert_equal(list(item['attributes'].keys()), ['title'])
+            assert_not_in('relationships', item)
+
+
 class VersionedDateTimeField(DbTestCase):
 
     def setUp(self):
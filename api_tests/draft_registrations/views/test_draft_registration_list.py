@@ -64,6 +64,16 @@ class TestDraftRegistrationListNewWorkflow(TestDraftRegistrationList):
         res = app.get(url_draft_registrations, expect_errors=True)
         assert res.status_code == 401
 
+    def test_embed_contributors(self, app, user, draft_registration, url_draft_registrations):
+        res = app.get('{}version=2.1&embed=contributors'.format(url_draft_registrations), auth=user.auth)
+        assert res.status_code == 200
+        assert len(res.json['data']) == 1
+        contributors = res.json['data'][0]['embeds']['contributors']
+        assert [each['id'] for each in contributors['data']] == [
+            '{}-{}'.format(draft_registration._id, contrib._id) for contrib in draft_registration.contributors
+        ]
+        assert contributors['meta']['total_bibliographic'] == len(draft_registration.visible_contributors)
+
 
 class TestDraftRegistrationCreateWithNode(TestDraftRegistrationCreate):
     @pytest.fixture()
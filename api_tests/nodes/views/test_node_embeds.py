@@ -1,7 +1,9 @@
 import functools
+import mock
 import pytest
 
 from api.base.settings.defaults import API_BASE
+from api.base.views import BaseContributorList
 from framework.auth.core import Auth
 from osf_tests.factories import (
     ProjectFactory,
@@ -156,3 +158,27 @@ class TestNodeEmbeds:
         res = app.get(url, auth=write_contrib_one.auth)
         assert res.status_code == 200
         assert res.json['data']['embeds']['contributors']['meta']['total_bibliographic'] == 3
+
+    def test_list_embeds_are_batched(
+            self, app, user, write_contribs, root_node,
+            child_one, child_two):
+        url = '/{}nodes/{}/children/?version=2.1&embed=contributors&embed=parent'.format(API_BASE, root_node._id)
+
+        with mock.patch.object(
+                BaseContributorList, 'prefetch_embedded', autospec=True,
+                side_effect=BaseContributorList.prefetch_embedded) as prefetch:
+            res = app.get(url, auth=user.auth)
+        assert res.status_code == 200
+        # One call for the whole page, with a view per child
+        assert prefetch.call_count == 1
+        assert len(prefetch.call_args[0][1]) == 2
+
+        data = {node['id']: node for node in res.json['data']}
+        assert set(data) == {child_one._id, child_two._id}
+        for node in (child_one, child_two):
+            embeds = data[node._id]['embeds']
+            assert embeds['parent']['data']['id'] == root_node._id
+            assert [contrib['id'] for contrib in embeds['contributors']['data']] == [
+                '{}-{}'.format(node._id, contrib._id) for contrib in node.contributors
+            ]
+            assert embeds['contributors']['meta']['total_bibliographic'] == len(node.visible_contributors)
@@ -44,6 +44,13 @@ class TestPreprintActionFilters(ReviewActionFilterMixin):
         res = app.get(url, auth=user.auth, expect_errors=True)
         assert res.status_code == 403
 
+    def test_embed_target(self, app, url, user, preprint, expected_actions):
+        res = app.get('{}?embed=target'.format(url), auth=user.auth)
+        assert res.status_code == 200
+        assert len(res.json['data']) == len(expected_actions)
+        for action in res.json['data']:
+            assert action['embeds']['target']['data']['id'] == preprint._id
+
 
 @pytest.mark.enable_quickfiles_creation
 class TestReviewActionSettings(ReviewActionCommentSettingsMixin):
@@ -255,6 +255,28 @@ class TestPreprintList(ApiTestCase):
         assert pp._id not in user_res_ids
         assert pp._id in mod_res_ids
 
+    def test_embed_contributors(self):
+        contrib = AuthUserFactory()
+        self.preprint.add_contributor(contrib, visible=False, save=True)
+        url = '{}?version=2.1&embed=contributors&embed=bibliographic_contributors'.format(self.url)
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.status_code, 200)
+        embeds = res.json['data'][0]['embeds']
+
+        contributors = embeds['contributors']
+        assert_equal(
+            [each['id'] for each in contributors['data']],
+            ['{}-{}'.format(self.preprint._id, user._id) for user in (self.user, contrib)],
+        )
+        assert_equal(contributors['meta']['total_bibliographic'], 1)
+
+        bibliographic = embeds['bibliographic_contributors']
+        assert_equal(
+            [each['id'] for each in bibliographic['data']],
+            ['{}-{}'.format(self.preprint._id, self.user._id)],
+        )
+        assert_equal(bibliographic['meta']['total_bibliographic'], 1)
+
 
 class TestPreprintsListFiltering(PreprintsListFilteringMixin):
 
@@ -79,6 +79,7 @@ class TestSloanMetrics(OsfTestCase):
             sloan_coi=1,
             sloan_data=0,
             sloan_id=sloan_cookie_value,
+            timestamp=mock.ANY,
         )
 
 
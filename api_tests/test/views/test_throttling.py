@@ -74,3 +74,29 @@ class TestThrottling:
         assert res.status_code == 200
         res = app.get(url, headers=headers, expect_errors=True)
         assert res.status_code == 429
+
+    def test_user_rate_throttle_refills_gradually(self, app, url, user):
+        # test-user allows 2 requests an hour, so one is earned back every half hour
+        with mock.patch('api.base.throttling.TestUserRateThrottle.timer', return_value=1000.0):
+            assert app.get(url, auth=user.auth).status_code == 200
+            assert app.get(url, auth=user.auth).status_code == 200
+            res = app.get(url, auth=user.auth, expect_errors=True)
+            assert res.status_code == 429
+            assert res.headers['Retry-After'] == '1800'
+        with mock.patch('api.base.throttling.TestUserRateThrottle.timer', return_value=2800.0):
+            assert app.get(url, auth=user.auth).status_code == 200
+            assert app.get(url, auth=user.auth, expect_errors=True).status_code == 429
+
+    def test_user_rate_throttle_without_lock_checks_state(self, app, url, user):
+        lock_unavailable = mock.patch('django.core.cache.backends.locmem.LocMemCache.add', return_value=False)
+        with mock.patch('api.base.throttling.TestUserRateThrottle.timer', return_value=1000.0), \
+                mock.patch('api.base.throttling.time.sleep'):
+            with lock_unavailable:
+                # Allowed by the stored state, but not counted against it
+                assert app.get(url, auth=user.auth).status_code == 200
+            assert app.get(url, auth=user.auth).status_code == 200
+            assert app.get(url, auth=user.auth).status_code == 200
+            with lock_unavailable:
+                res = app.get(url, auth=user.auth, expect_errors=True)
+                assert res.status_code == 429
+                assert res.headers['Retry-After'] == '1800'
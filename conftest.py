@@ -53,6 +53,10 @@ def override_settings():
     website_settings.BCRYPT_LOG_ROUNDS = 1
     # Make sure we don't accidentally send any emails
     website_settings.SENDGRID_API_KEY = None
+    # Tests mock CAS responses per token; don't let them leak between requests
+    website_settings.CAS_TOKEN_CACHE_TIMEOUT = 0
+    # Sessions are often changed directly in the database by tests; always load them from there
+    website_settings.SESSION_CACHE_TIMEOUT = 0
     # Set this here instead of in SILENT_LOGGERS, in case developers
     # call setLevel in local.py
     logging.getLogger('website.mails.mails').setLevel(logging.CRITICAL)
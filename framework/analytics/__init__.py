@@ -2,6 +2,8 @@
 
 import logging
 
+from dateutil.parser import parse as parse_date
+
 from framework.celery_tasks import app
 from framework.postcommit_tasks.handlers import run_postcommit
 
@@ -32,6 +34,30 @@ def update_counter(resource, file, version, action, node_info=None):
     return PageCounter.update_counter(resource, file, version=version, action=action, node_info=node_info)
 
 
+def track_visit(resource, file, version, action, node_info=None):
+    """Track a visit to a resource's file in the session, without counting it yet.
+
+    :return dict: JSON serializable visit, to count later with ``apply_visit``
+    """
+    from osf.models import PageCounter
+    visit = PageCounter.track_visit(resource, file, version=version, action=action, node_info=node_info)
+    visit['date'] = visit['date'].isoformat()
+    return visit
+
+
+def apply_visit(visit):
+    """Count a visit returned by ``track_visit`` towards its counter."""
+    from osf.models import PageCounter
+    return PageCounter.apply_visit(**dict(visit, date=parse_date(visit['date']).date()))
+
+
+@app.task(name='framework.analytics.flush_page_counters')
+def flush_page_counters():
+    """Apply buffered page counter increments; see PageCounter.flush_increments."""
+    from osf.models import PageCounter
+    return PageCounter.flush_increments()
+
+
 def get_basic_counters(resource, file, version, action):
     from osf.models import PageCounter
     return PageCounter.get_basic_counters(resource, file, version=version, action=action)
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 
 import furl
+import hashlib
 from rest_framework import status as http_status
 import json
 from future.moves.urllib.parse import quote
 
+from django.conf import settings as django_settings
+from django.core.cache import caches
 from lxml import etree
 import requests
 
@@ -53,6 +56,68 @@ class CasResponse(object):
         self.attributes = attributes or {}
 
 
+class CasTokenCache(object):
+    """TTL-bounded cache of successful CAS profile lookups for bearer tokens.
+
+    Entries are keyed by a SHA-256 hash of the access token, so raw tokens never reach the cache
+    backend. Only the user GUID and the attributes (including scopes) of the ``CasResponse`` are
+    stored. Hit and miss counters are kept per process.
+    """
+
+    KEY_PREFIX = 'cas_token:'
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[django_settings.CAS_TOKEN_CACHE_NAME]
+
+    @property
+    def enabled(self):
+        return bool(settings.CAS_TOKEN_CACHE_TIMEOUT)
+
+    def make_key(self, access_token):
+        return self.KEY_PREFIX + hashlib.sha256(access_token.encode('utf-8')).hexdigest()
+
+    def get(self, access_token):
+        """Return the cached ``CasResponse`` for ``access_token``, or ``None`` on a miss."""
+        if not self.enabled:
+            return None
+        cached = self.cache.get(self.make_key(access_token))
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        resp = CasResponse(authenticated=True, user=cached['user'], attributes=dict(cached['attributes']))
+        resp.attributes['accessToken'] = access_token
+        return resp
+
+    def set(self, access_token, resp):
+        if not self.enabled or not resp.authenticated:
+            return
+        attributes = {key: value for key, value in resp.attributes.items() if key != 'accessToken'}
+        self.cache.set(
+            self.make_key(access_token),
+            {'user': resp.user, 'attributes': attributes},
+            settings.CAS_TOKEN_CACHE_TIMEOUT,
+        )
+
+    def invalidate(self, access_token):
+        self.cache.delete(self.make_key(access_token))
+
+    def clear(self):
+        self.cache.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+
+token_cache = CasTokenCache()
+
+
 class CasClient(object):
     """HTTP client for the CAS server."""
 
@@ -122,20 +187,27 @@ class CasClient(object):
 
     def profile(self, access_token):
         """
-        Send request to get profile information, given an access token.
+        Send request to get profile information, given an access token. Successful lookups are
+        served from ``token_cache`` until they expire or the token is revoked.
 
         :param str access_token: CAS access_token.
         :rtype: CasResponse
         :raises: CasError if an unexpected response is returned.
         """
 
+        cached = token_cache.get(access_token)
+        if cached is not None:
+            return cached
+
         url = self.get_profile_url()
         headers = {
             'Authorization': 'Bearer {}'.format(access_token),
         }
         resp = requests.get(url, headers=headers)
         if resp.status_code == 200:
-            return self._parse_profile(resp.content, access_token)
+            cas_resp = self._parse_profile(resp.content, access_token)
+            token_cache.set(access_token, cas_resp)
+            return cas_resp
         else:
             self._handle_error(resp)
 
@@ -183,6 +255,12 @@ class CasClient(object):
         url = self.get_auth_token_revocation_url()
 
         resp = requests.post(url, data=payload)
+        # Drop cached lookups even if CAS errors, e.g. for a token it has never seen.
+        if 'token' in payload:
+            token_cache.invalidate(payload['token'])
+        else:
+            # Tokens issued to an application are not known individually
+            token_cache.clear()
         if resp.status_code == 204:
             return True
         else:
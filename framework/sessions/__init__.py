@@ -13,7 +13,7 @@ from weakref import WeakKeyDictionary
 from werkzeug.local import LocalProxy
 
 from framework.flask import redirect
-from framework.sessions.utils import remove_session
+from framework.sessions.utils import remove_session, session_cache
 from website import settings
 
 
@@ -159,16 +159,17 @@ def before_request():
     if cookie:
         try:
             session_id = itsdangerous.Signer(settings.SECRET_KEY).unsign(cookie)
-            user_session = Session.load(session_id) or Session(_id=session_id)
+            user_session = session_cache.load(session_id) or Session(_id=session_id)
         except itsdangerous.BadData:
             return
         if not throttle_period_expired(user_session.created, settings.OSF_SESSION_TIMEOUT):
             # Update date last login when making non-api requests
-            if user_session.data.get('auth_user_id') and 'api' not in request.url:
+            user_id = user_session.data.get('auth_user_id')
+            if user_id and 'api' not in request.url and session_cache.claim_last_login_update(user_id):
                 OSFUser = apps.get_model('osf.OSFUser')
                 (
                     OSFUser.objects
-                    .filter(guids___id__isnull=False, guids___id=user_session.data['auth_user_id'])
+                    .filter(guids___id__isnull=False, guids___id=user_id)
                     # Throttle updates
                     .filter(Q(date_last_login__isnull=True) | Q(date_last_login__lt=timezone.now() - settings.DATE_LAST_LOGIN_THROTTLE_DELTA))
                 ).update(date_last_login=timezone.now())
@@ -1,4 +1,76 @@
 # -*- coding: utf-8 -*-
+from django.conf import settings as django_settings
+from django.core.cache import caches
+from django.db import transaction
+
+from osf.utils.fields import ensure_str
+from website import settings
+
+
+class SessionCache(object):
+    """Read-through, write-through cache of ``Session``s in front of the database.
+
+    Sessions are cached by id when loaded or saved, and dropped when removed, so requests from a
+    signed-in user can skip loading their session. Entries expire after ``SESSION_CACHE_TIMEOUT``
+    seconds, which bounds how long a session deleted some other way (e.g. by clear_sessions) can
+    still be loaded. The cache is off unless ``SESSION_CACHE_TIMEOUT`` is set.
+    """
+
+    KEY_PREFIX = 'session:'
+    LAST_LOGIN_KEY_PREFIX = 'session_last_login:'
+
+    @property
+    def cache(self):
+        return caches[django_settings.SESSION_CACHE_NAME]
+
+    @property
+    def enabled(self):
+        return bool(settings.SESSION_CACHE_TIMEOUT)
+
+    def make_key(self, session_id):
+        return self.KEY_PREFIX + ensure_str(session_id)
+
+    def load(self, session_id):
+        """Return the ``Session`` with ``session_id``, or ``None`` if there isn't one."""
+        from osf.models import Session
+
+        session_id = ensure_str(session_id)
+        if self.enabled:
+            session = self.cache.get(self.make_key(session_id))
+            if session is not None:
+                return session
+        session = Session.load(session_id)
+        if session is not None:
+            self.set(session)
+        return session
+
+    def set(self, session):
+        if self.enabled:
+            self.cache.set(self.make_key(session._id), session, settings.SESSION_CACHE_TIMEOUT)
+
+    def saved(self, session):
+        """Write ``session`` through once it's committed; until then, load it from the database."""
+        self.invalidate(session._id)
+        transaction.on_commit(lambda: self.set(session))
+
+    def invalidate(self, *session_ids):
+        self.cache.delete_many([self.make_key(session_id) for session_id in session_ids])
+
+    def claim_last_login_update(self, user_id):
+        """Return whether ``date_last_login`` may need updating for a request by ``user_id``.
+
+        Only the first call per ``DATE_LAST_LOGIN_THROTTLE`` seconds returns True, sparing the
+        update query for the rest of the user's requests.
+        """
+        if not self.enabled:
+            return True
+        return self.cache.add(self.LAST_LOGIN_KEY_PREFIX + user_id, True, settings.DATE_LAST_LOGIN_THROTTLE)
+
+    def clear(self):
+        self.cache.clear()
+
+
+session_cache = SessionCache()
 
 
 def remove_sessions_for_user(user):
@@ -11,7 +83,12 @@ def remove_sessions_for_user(user):
     from osf.models import Session
 
     if user._id:
-        Session.objects.filter(data__auth_user_id=user._id).delete()
+        sessions = Session.objects.filter(data__auth_user_id=user._id)
+        session_ids = list(sessions.values_list('_id', flat=True))
+        session_cache.invalidate(*session_ids)
+        sessions.delete()
+        # Again once committed, in case a request cached a session before the delete was visible
+        transaction.on_commit(lambda: session_cache.invalidate(*session_ids))
 
 
 def remove_session(session):
@@ -22,4 +99,7 @@ def remove_session(session):
     :return:
     """
     from osf.models import Session
+    session_cache.invalidate(session._id)
     Session.objects.filter(id=session.id).delete()
+    # Again once committed, in case a request cached the session before the delete was visible
+    transaction.on_commit(lambda: session_cache.invalidate(session._id))
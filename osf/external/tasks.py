@@ -17,3 +17,17 @@ def update_submissions_status_async(ids):
         submission = ChronosSubmission.load(submission_id)
         if submission.modified < timezone.now() - settings.CHRONOS_SUBMISSION_UPDATE_TIME:
             client.sync_manuscript(submission)
+
+
+@celery_app.task(ignore_results=True)
+def check_resources_for_spam(user_id, resources, request_headers):
+    """Run the spam checks queued by ``osf.models.spam.enqueue_spam_check`` for one user."""
+    user = apps.get_model('osf.OSFUser').load(user_id)
+    for resource in resources:
+        obj = apps.get_model(resource['model']).objects.filter(pk=resource['pk']).first()
+        if obj is None:
+            continue
+        try:
+            obj.run_spam_check(user, resource['saved_fields'], request_headers)
+        except Exception:
+            logger.exception('Spam check failed for {} {}'.format(resource['model'], resource['pk']))
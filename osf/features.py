@@ -47,6 +47,10 @@ switches = {
     'SLOAN_DATA_INPUT': 'sloan_data_input',
     'SLOAN_PREREG_INPUT': 'sloan_prereg_input',
     'ENABLE_RAW_METRICS': 'enable_raw_metrics',
+    'NODE_ANCESTOR_CLOSURE': 'node_ancestor_closure',
+    'OSFSTORAGE_STORED_PATHS': 'osfstorage_stored_paths',
+    'BUFFERED_PAGE_COUNTERS': 'buffered_page_counters',
+    'ASYNC_SPAM_CHECKS': 'async_spam_checks',
 }
 
 locals().update(flags)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# This is a management command, rather than a migration, because it only writes
+# database content, may take a long time, and can safely be re-run to repair the table.
+from __future__ import unicode_literals
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from osf.models import NodeAncestor, NodeRelation
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_node_ancestors(batch_size=1000, start_id=0):
+    """Populate ``NodeAncestor`` from non-link ``NodeRelation``s, in batches of child node ids.
+
+    Each batch runs in its own transaction, so an interrupted run can be resumed from the last
+    logged child id with ``start_id``.
+    """
+    child_ids = NodeRelation.objects.filter(
+        is_node_link=False,
+    ).order_by('child_id').values_list('child_id', flat=True).distinct()
+
+    total = 0
+    last_id = start_id
+    while True:
+        batch = list(child_ids.filter(child_id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        with transaction.atomic():
+            total += NodeAncestor.objects.backfill(batch)
+        last_id = batch[-1]
+        logger.info('Wrote ancestors for children up to id {} ({} rows so far)'.format(last_id, total))
+    return total
+
+
+class Command(BaseCommand):
+    """
+    Backfill the NodeAncestor closure table. Enable the ``node_ancestor_closure`` switch once it
+    has completed.
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=1000,
+            help='Number of child nodes whose ancestors are written per transaction',
+        )
+        parser.add_argument(
+            '--start_id',
+            type=int,
+            default=0,
+            help='Resume after this child node id',
+        )
+
+    def handle(self, *args, **options):
+        total = backfill_node_ancestors(batch_size=options['batch_size'], start_id=options['start_id'])
+        logger.info('Done. Wrote {} NodeAncestor rows.'.format(total))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# This is a management command, rather than a migration, because it only writes
+# database content, touches every osfstorage file, and can safely be re-run.
+from __future__ import unicode_literals
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from addons.osfstorage.models import OsfStorageFolder
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_SQL = """
+    WITH RECURSIVE paths(id, path) AS (
+        SELECT id, name || '/'
+        FROM osf_basefilenode
+        WHERE id = ANY(%(root_ids)s)
+      UNION ALL
+        SELECT C.id, P.path || C.name || CASE WHEN C.type = 'osf.osfstoragefolder' THEN '/' ELSE '' END
+        FROM paths AS P
+            JOIN osf_basefilenode AS C ON C.parent_id = P.id
+        WHERE C.type IN ('osf.osfstoragefile', 'osf.osfstoragefolder')
+    )
+    UPDATE osf_basefilenode
+    SET stored_materialized_path = paths.path
+    FROM paths
+    WHERE osf_basefilenode.id = paths.id
+    AND osf_basefilenode.stored_materialized_path IS DISTINCT FROM paths.path;
+"""
+
+
+def backfill_osfstorage_materialized_paths(batch_size=500, start_id=0):
+    """Write ``stored_materialized_path`` for every non-trashed osfstorage node, one batch of
+    root folders (and their whole trees) per transaction. Resumable with ``start_id``.
+    """
+    roots = OsfStorageFolder.objects.filter(is_root=True).order_by('id').values_list('id', flat=True)
+    total = 0
+    last_id = start_id
+    while True:
+        batch = list(roots.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(BACKFILL_SQL, {'root_ids': batch})
+            total += cursor.rowcount
+        last_id = batch[-1]
+        logger.info('Backfilled trees up to root folder id {} ({} rows so far)'.format(last_id, total))
+    return total
+
+
+class Command(BaseCommand):
+    """
+    Backfill OsfStorageFileNode.stored_materialized_path. Enable the ``osfstorage_stored_paths``
+    switch once it has completed.
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=500,
+            help='Number of root folders whose trees are written per transaction',
+        )
+        parser.add_argument(
+            '--start_id',
+            type=int,
+            default=0,
+            help='Resume after this root folder id',
+        )
+
+    def handle(self, *args, **options):
+        total = backfill_osfstorage_materialized_paths(batch_size=options['batch_size'], start_id=options['start_id'])
+        logger.info('Done. Updated {} file nodes.'.format(total))
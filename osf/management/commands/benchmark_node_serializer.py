@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Time NodeSerializer per node, reusing its field plan across a page of nodes and rebuilding
+it for every node, as serialization did before plans were cached.
+"""
+from __future__ import division
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from api.nodes.serializers import NodeSerializer
+from osf.models import Node
+
+logger = logging.getLogger(__name__)
+
+
+def make_request(version, params):
+    request = Request(RequestFactory().get('/v2/nodes/', params))
+    request.version = version
+    request.parser_context['kwargs'] = {'version': 'v2'}
+    return request
+
+
+def time_serializer(nodes, request, reuse_plan):
+    """Return the seconds taken to serialize each of ``nodes`` with one serializer."""
+    serializer = NodeSerializer(context={'request': request})
+    start = time.time()
+    for node in nodes:
+        if not reuse_plan:
+            serializer.__dict__.pop('_field_plans', None)
+        serializer.to_representation(node)
+    return (time.time() - start) / len(nodes)
+
+
+def benchmark_node_serializer(count=100, iterations=5, version='2.0', fields=None):
+    """Return the best time per node, in seconds, with and without the field plan reused."""
+    nodes = list(Node.objects.filter(is_deleted=False, is_public=True).order_by('-modified')[:count])
+    if not nodes:
+        raise ValueError('There are no public nodes to serialize')
+    params = {'fields[nodes]': fields} if fields else {}
+    request = make_request(version, params)
+    # Warm up caches on the nodes, so both runs see the same queries
+    time_serializer(nodes, request, reuse_plan=True)
+    return {
+        'with_plan': min(time_serializer(nodes, request, reuse_plan=True) for _ in range(iterations)),
+        'without_plan': min(time_serializer(nodes, request, reuse_plan=False) for _ in range(iterations)),
+    }
+
+
+class Command(BaseCommand):
+    """Micro-benchmark JSONAPISerializer field plans with NodeSerializer."""
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--count', type=int, default=100, help='Number of public nodes to serialize')
+        parser.add_argument('--iterations', type=int, default=5, help='Runs of each mode; the fastest is reported')
+        parser.add_argument('--api_version', default='2.0', help='API version of the fake request')
+        parser.add_argument('--fields', default=None, help='Sparse fieldset for nodes, e.g. "title,description"')
+
+    def handle(self, *args, **options):
+        results = benchmark_node_serializer(
+            count=options['count'],
+            iterations=options['iterations'],
+            version=options['api_version'],
+            fields=options['fields'],
+        )
+        for mode in ('with_plan', 'without_plan'):
+            logger.info('{}: {:.3f} ms per node'.format(mode, results[mode] * 1000))
+        logger.info('Speedup: {:.2f}x'.format(results['without_plan'] / results['with_plan']))
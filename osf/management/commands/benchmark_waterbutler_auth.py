@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Time WaterButler's auth callback under concurrent anonymous downloads of one preprint's
+primary file, as a popular preprint sees them. Run it against a running OSF instance.
+"""
+from __future__ import division
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import logging
+import time
+
+import jwe
+import jwt
+import requests
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from osf.models import Preprint
+from website import settings
+
+logger = logging.getLogger(__name__)
+
+
+def build_payload(preprint, action='download'):
+    """Return the encrypted payload WaterButler sends for ``action`` on the preprint's primary file."""
+    key = jwe.kdf(settings.WATERBUTLER_JWE_SECRET.encode('utf-8'), settings.WATERBUTLER_JWE_SALT.encode('utf-8'))
+    return jwe.encrypt(jwt.encode({
+        'data': {
+            'action': action,
+            'nid': preprint._id,
+            'provider': 'osfstorage',
+            'path': preprint.primary_file.path,
+        },
+        'exp': timezone.now() + datetime.timedelta(seconds=settings.WATERBUTLER_JWT_EXPIRATION),
+    }, settings.WATERBUTLER_JWT_SECRET, algorithm=settings.WATERBUTLER_JWT_ALGORITHM), key).decode()
+
+
+def percentile(timings, pct):
+    return timings[min(len(timings) - 1, int(len(timings) * pct / 100))]
+
+
+def benchmark_waterbutler_auth(preprint, count=500, concurrency=20, url=None):
+    """Return latency percentiles and throughput of ``count`` auth callbacks, ``concurrency`` at a time."""
+    url = url or '{}api/v1/files/auth/'.format(settings.INTERNAL_DOMAIN)
+    params = {'payload': build_payload(preprint)}
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    def call(_):
+        start = time.time()
+        session.get(url, params=params).raise_for_status()
+        return time.time() - start
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = sorted(executor.map(call, range(count)))
+    elapsed = time.time() - start
+    return {
+        'p50': percentile(timings, 50),
+        'p95': percentile(timings, 95),
+        'p99': percentile(timings, 99),
+        'max': timings[-1],
+        'throughput': count / elapsed,
+    }
+
+
+class Command(BaseCommand):
+    """Benchmark the latency of WaterButler's auth callback for a popular preprint's downloads."""
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('preprint', help='Guid of a public preprint with a primary file')
+        parser.add_argument('--count', type=int, default=500, help='Number of callbacks to make')
+        parser.add_argument('--concurrency', type=int, default=20, help='Number of callbacks in flight at once')
+        parser.add_argument('--url', default=None, help='Auth callback URL, defaults to the one on INTERNAL_DOMAIN')
+
+    def handle(self, *args, **options):
+        preprint = Preprint.load(options['preprint'])
+        if not preprint or not preprint.primary_file:
+            raise ValueError('{} is not a preprint with a primary file'.format(options['preprint']))
+        results = benchmark_waterbutler_auth(
+            preprint,
+            count=options['count'],
+            concurrency=options['concurrency'],
+            url=options['url'],
+        )
+        for stat in ('p50', 'p95', 'p99', 'max'):
+            logger.info('{}: {:.1f} ms'.format(stat, results[stat] * 1000))
+        logger.info('Throughput: {:.1f} callbacks per second'.format(results['throughput']))
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+from concurrent.futures import ThreadPoolExecutor, wait
 import datetime as dt
 import time
 import io
@@ -8,8 +9,9 @@ import json
 import logging
 import requests
 import shutil
-import tempfile
+import threading
 
+from django.db import connection
 from django.db.models import Q
 from django.core import serializers
 from django.core.management.base import BaseCommand
@@ -27,12 +29,15 @@ from osf.models import (
     QuickFilesNode
 )
 from osf.utils.workflows import DefaultStates
-from scripts.utils import Progress
 from api.base.utils import waterbutler_api_url_for
 from api.base.settings.defaults import GBs
 
 ERRORS = []
-TMP_PATH = tempfile.mkdtemp()
+
+# Downloads are streamed to disk in chunks of this many bytes
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_TIMEOUT = 60
 
 PREPRINT_EXPORT_FIELDS = [
     'title',
@@ -62,6 +67,11 @@ REGISTRATION_EXPORT_FIELDS = NODE_EXPORT_FIELDS + [
 logging.getLogger('urllib3').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
+
+class ExportError(Exception):
+    pass
+
+
 def export_metadata(node, current_dir):
     """
     Exports the pretty printed serialization of a given model instance to metadata.json.
@@ -78,32 +88,69 @@ def export_metadata(node, current_dir):
         metadata = json.loads(serializers.serialize('json', [node], fields=export_fields))
         json.dump(metadata[0]['fields'], f, indent=4, sort_keys=True)
 
+def download_file(url, file_path, retries=DOWNLOAD_RETRIES):
+    """
+    Streams the response for url to file_path in chunks, through a ".part" file that is only renamed
+    once the download completes. A dropped connection is retried up to `retries` times, resuming
+    with a Range request when the server supports one, and starting over otherwise.
+    Returns the status code of the last response, and its body if the download failed or None.
+
+    """
+    partial_path = file_path + '.part'
+    for attempt in range(retries + 1):
+        offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+        headers = {'Range': 'bytes={}-'.format(offset)} if offset else {}
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                if response.status_code == 416 and offset:
+                    # Nothing left after the partial file, so it was already complete
+                    pass
+                elif response.status_code in (200, 206):
+                    # 206 continues the partial file, 200 means the server sent everything again
+                    with open(partial_path, 'ab' if response.status_code == 206 else 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                else:
+                    # Read while the stream is still open
+                    return response.status_code, response.text
+            os.rename(partial_path, file_path)
+            return response.status_code, None
+        except requests.exceptions.RequestException as e:
+            if attempt == retries:
+                raise
+            logger.warning('Download to {} interrupted ({}), retrying'.format(file_path, e))
+            time.sleep(2 ** attempt)
+
 def export_files(node, user, current_dir):
     """
     Creates a "files" directory within the current directory.
     Exports all of the OSFStorage files for a given node.
     Uses WB's download zip functionality to download osfstorage-archive.zip in a single request.
+    An archive left by an interrupted export is kept rather than downloaded again.
 
     """
     files_dir = os.path.join(current_dir, 'files')
-    os.mkdir(files_dir)
-    response = requests.get(
-        url=waterbutler_api_url_for(
+    file_path = os.path.join(files_dir, 'osfstorage-archive.zip')
+    if not os.path.exists(files_dir):
+        os.mkdir(files_dir)
+    if os.path.exists(file_path):
+        return
+    status_code, error = download_file(
+        waterbutler_api_url_for(
             node_id=node._id,
             _internal=True,
             provider='osfstorage',
             zip='',
             cookie=user.get_or_create_cookie(),
             base_url=node.osfstorage_region.waterbutler_url
-        )
+        ),
+        file_path,
     )
-    if response.status_code == 200:
-        with open(os.path.join(files_dir, 'osfstorage-archive.zip'), 'wb') as f:
-            f.write(response.content)
-    else:
-        ERRORS.append(
+    if error is not None:
+        # Raised rather than recorded here, so the node isn't marked as exported and is retried
+        raise ExportError(
             'Error exporting files for node {}. Waterbutler responded with a {} status code. Response: {}'
-            .format(node._id, response.status_code, response.json())
+            .format(node._id, status_code, error)
         )
 
 def export_wikis(node, current_dir):
@@ -113,7 +160,8 @@ def export_wikis(node, current_dir):
 
     """
     wikis_dir = os.path.join(current_dir, 'wikis')
-    os.mkdir(wikis_dir)
+    if not os.path.exists(wikis_dir):
+        os.mkdir(wikis_dir)
     for wiki in WikiPage.objects.get_wiki_pages_latest(node):
         if wiki.content:
             with io.open(os.path.join(wikis_dir, '{}.md'.format(wiki.wiki_page.page_name)), 'w', encoding='utf-8') as f:
@@ -122,9 +170,9 @@ def export_wikis(node, current_dir):
 def export_resource(node, user, current_dir):
     """
     Exports metadata, files, and wikis for given node (project, registration, or preprint).
+    Returns (child, child_dir) pairs for the node's readable descendants, which are exported separately.
     If the given node has children,
-        Creates a "components" directory.
-        Recursively exports the node's children.
+        Creates a "components" directory, with a directory for each child.
         Note: *Sometimes* an empty "components" directory will be created if the given node has children,
         but the user being exported does not have access to them.
 
@@ -135,31 +183,111 @@ def export_resource(node, user, current_dir):
     ctype = ContentType.objects.get_for_model(node.__class__)
     if OsfStorageFileNode.objects.filter(target_object_id=node.id, target_content_type=ctype):
         export_files(node, user, current_dir)
+    return get_components(node, user, current_dir)
 
+def get_components(node, user, current_dir):
+    components = []
     if hasattr(node, 'find_readable_descendants'):
         descendants = list(node.find_readable_descendants(Auth(user)))
         if len(descendants):
             components_dir = os.path.join(current_dir, 'components')
-            os.mkdir(components_dir)
             for child in descendants:
-                current_dir = os.path.join(components_dir, child._id)
-                os.mkdir(current_dir)
-                export_resource(child, user, current_dir)
+                child_dir = os.path.join(components_dir, child._id)
+                if not os.path.exists(child_dir):
+                    os.makedirs(child_dir)
+                components.append((child, child_dir))
+    return components
+
 
-def export_resources(nodes_to_export, user, dir, nodes_type):
+class ExportManifest(object):
+    """
+    Progress of an export, kept in export_manifest.json in its directory so an interrupted
+    export can continue where it stopped. Records the directory of every resource whose
+    metadata, files, and wikis have all been exported.
+
+    """
+    FILE_NAME = 'export_manifest.json'
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.path = os.path.join(base_dir, self.FILE_NAME)
+        self.lock = threading.Lock()
+        self.data = {'started': dt.datetime.utcnow().isoformat(), 'completed': {}}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.data = json.load(f)
+
+    def is_completed(self, current_dir):
+        return os.path.relpath(current_dir, self.base_dir) in self.data['completed']
+
+    def mark_completed(self, node, current_dir):
+        with self.lock:
+            self.data['completed'][os.path.relpath(current_dir, self.base_dir)] = node._id
+            self.data['updated'] = dt.datetime.utcnow().isoformat()
+            # Written to a temporary file first, so an interruption never leaves a truncated manifest
+            with open(self.path + '.tmp', 'w') as f:
+                json.dump(self.data, f, indent=4, sort_keys=True)
+            os.rename(self.path + '.tmp', self.path)
+            return len(self.data['completed'])
+
+
+class ResourceExporter(object):
+    """
+    Exports resources with a bounded pool of threads. Every node, including each component,
+    is exported as its own job, so independent nodes download concurrently.
+
+    """
+    def __init__(self, user, manifest, workers):
+        self.user = user
+        self.manifest = manifest
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.futures = []
+        self.lock = threading.Lock()
+
+    def submit(self, node, current_dir):
+        with self.lock:
+            self.futures.append(self.executor.submit(self.export, node, current_dir))
+
+    def export(self, node, current_dir):
+        try:
+            if self.manifest.is_completed(current_dir):
+                components = get_components(node, self.user, current_dir)
+            else:
+                components = export_resource(node, self.user, current_dir)
+                count = self.manifest.mark_completed(node, current_dir)
+                logger.info('Exported {} ({} resources done)'.format(node._id, count))
+            for child, child_dir in components:
+                self.submit(child, child_dir)
+        except ExportError as e:
+            ERRORS.append(str(e))
+        except Exception as e:
+            logger.exception(e)
+            ERRORS.append('Error exporting {}: {}'.format(node._id, e))
+        finally:
+            # Each thread opens its own database connection
+            connection.close()
+
+    def wait(self):
+        """Blocks until every job, including components submitted by running jobs, has finished."""
+        while True:
+            with self.lock:
+                pending = [future for future in self.futures if not future.done()]
+            if not pending:
+                break
+            wait(pending)
+        self.executor.shutdown()
+
+def export_resources(nodes_to_export, exporter, dir):
     """
     Creates appropriate directory structure and exports a given set of resources
-    (projects, registrations, quickfiles or preprints) by calling export helper functions.
+    (projects, registrations, quickfiles or preprints) with the given ResourceExporter.
 
     """
-    progress = Progress()
-    progress.start(nodes_to_export.count(), nodes_type.upper())
     for node in nodes_to_export:
         current_dir = os.path.join(dir, node._id)
-        os.mkdir(current_dir)
-        export_resource(node, user, current_dir)
-        progress.increment()
-    progress.stop()
+        if not os.path.exists(current_dir):
+            os.mkdir(current_dir)
+        exporter.submit(node, current_dir)
 
 def get_usage(user):
     # includes nodes, registrations, quickfiles
@@ -184,9 +312,11 @@ def get_preprints_to_export(user):
     )
 
 
-def export_account(user_id, path, only_private=False, only_admin=False, export_files=True, export_wikis=True):
+def export_account(user_id, path, only_private=False, only_admin=False, export_files=True, export_wikis=True, workers=4):
     """
     Exports (as a zip file) all of the projects, registrations, and preprints for which the given user is a contributor.
+    Resources are exported by `workers` threads into <path>/<user_guid>-export/, along with export_manifest.json.
+    Running the export again after an interruption skips the resources the manifest lists as done.
 
     The directory structure of the exported file is:
 
@@ -225,22 +355,25 @@ def export_account(user_id, path, only_private=False, only_admin=False, export_f
 
     """
     user = OSFUser.objects.get(guids___id=user_id, guids___id__isnull=False)
+    # Drop errors left by an earlier export in the same process, which were already reported
+    del ERRORS[:]
     proceed = input('\nUser has {:.2f} GB of data in OSFStorage that will be exported.\nWould you like to continue? [y/n] '.format(get_usage(user)))
     if not proceed or proceed.lower() != 'y':
         print('Exiting...')
         exit(1)
 
-    base_dir = os.path.join(TMP_PATH, user_id)
+    base_dir = os.path.join(path, '{}-export'.format(user_id))
     preprints_dir = os.path.join(base_dir, 'preprints')
     projects_dir = os.path.join(base_dir, 'projects')
     registrations_dir = os.path.join(base_dir, 'registrations')
     quickfiles_dir = os.path.join(base_dir, 'quickfiles')
 
-    os.mkdir(base_dir)
-    os.mkdir(preprints_dir)
-    os.mkdir(projects_dir)
-    os.mkdir(registrations_dir)
-    os.mkdir(quickfiles_dir)
+    if os.path.exists(base_dir):
+        print('Continuing the export in {}'.format(base_dir))
+    for resource_dir in (preprints_dir, projects_dir, registrations_dir, quickfiles_dir):
+        if not os.path.exists(resource_dir):
+            os.makedirs(resource_dir)
+    exporter = ResourceExporter(user, ExportManifest(base_dir), workers)
 
     preprints_to_export = get_preprints_to_export(user)
 
@@ -258,22 +391,25 @@ def export_account(user_id, path, only_private=False, only_admin=False, export_f
         QuickFilesNode.objects.filter(creator=user)
     )
 
-    export_resources(projects_to_export, user, projects_dir, 'projects')
-    export_resources(preprints_to_export, user, preprints_dir, 'preprints')
-    export_resources(registrations_to_export, user, registrations_dir, 'registrations')
-    export_resources(quickfiles_to_export, user, quickfiles_dir, 'quickfiles')
+    export_resources(projects_to_export, exporter, projects_dir)
+    export_resources(preprints_to_export, exporter, preprints_dir)
+    export_resources(registrations_to_export, exporter, registrations_dir)
+    export_resources(quickfiles_to_export, exporter, quickfiles_dir)
+    exporter.wait()
+
+    if ERRORS:
+        print('Export incomplete, errors logged below. Run the export again to retry them.')
+        for err in ERRORS:
+            logger.error(err)
+        return
 
     timestamp = dt.datetime.fromtimestamp(time.time()).strftime('%Y%m%d%H%M%S')
     output = os.path.join(path, '{user_id}-export-{timestamp}'.format(**locals()))
-    print('Creating {output}.zip ...').format(**locals())
+    print('Creating {output}.zip ...'.format(**locals()))
     shutil.make_archive(output, 'zip', base_dir)
     shutil.rmtree(base_dir)
 
-    finished_msg = 'Finished without errors.' if not ERRORS else 'Finished with errors logged below.'
-    print(finished_msg)
-
-    for err in ERRORS:
-        logger.error(err)
+    print('Finished without errors.')
 
 
 class Command(BaseCommand):
@@ -296,9 +432,16 @@ class Command(BaseCommand):
             required=True,
             help='Path where to save the output file.'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of nodes to export concurrently.'
+        )
 
     def handle(self, *args, **options):
         export_account(
             user_id=options['user'],
             path=options['path'],
+            workers=options['workers'],
         )
@@ -1,52 +1,122 @@
 import datetime as dt
+import logging
 
+from dateutil.parser import parse as parse_date
+from django.contrib.auth.models import Permission
 from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Case, IntegerField, Sum, When
 
 from framework.celery_tasks import app as celery_app
 from osf.metrics import InstitutionProjectCounts, UserInstitutionProjectCounts
-from osf.models import Institution, Node
+from osf.models import AbstractNode, Institution, NodeRelation, OSFUser
+from osf.models.node import NodeGroupObjectPermission
+from osf.utils.permissions import READ_NODE
 
+logger = logging.getLogger(__name__)
 
-@celery_app.task(name='management.commands.update_institution_project_counts')
-def update_institution_project_counts():
-    now = dt.datetime.now()
+# Public and private top-level project counts for every affiliated user of an institution that
+# can read at least one of its projects, equivalent to get_nodes_for_user for each user.
+USER_PROJECT_COUNTS_SQL = """
+    SELECT UG.osfuser_id,
+        COUNT(DISTINCT N.id) FILTER (WHERE N.is_public IS TRUE),
+        COUNT(DISTINCT N.id) FILTER (WHERE N.is_public IS FALSE)
+    FROM {node_institutions} AS NI
+        JOIN {node} AS N ON N.id = NI.abstractnode_id
+        JOIN {node_permissions} AS G ON G.content_object_id = N.id
+        JOIN {user_groups} AS UG ON UG.group_id = G.group_id
+        JOIN {user_institutions} AS UI ON UI.osfuser_id = UG.osfuser_id AND UI.institution_id = NI.institution_id
+    WHERE NI.institution_id = %(institution_id)s
+        AND G.permission_id = %(permission_id)s
+        AND N.type = 'osf.node'
+        AND N.is_deleted IS FALSE
+        AND NOT EXISTS (SELECT 1 FROM {node_relation} AS R WHERE R.child_id = N.id)
+    GROUP BY UG.osfuser_id;
+"""
 
-    for institution in Institution.objects.all():
 
-        institution_public_projects_qs = institution.nodes.filter(type='osf.node', parent_nodes=None, is_public=True, is_deleted=False)
-        institution_private_projects_qs = institution.nodes.filter(type='osf.node', parent_nodes=None, is_public=False, is_deleted=False)
+def get_user_project_counts(institution):
+    """Return a dict of user id to (public, private) project counts, from a single query."""
+    sql = USER_PROJECT_COUNTS_SQL.format(
+        node=AbstractNode._meta.db_table,
+        node_institutions=AbstractNode.affiliated_institutions.through._meta.db_table,
+        node_permissions=NodeGroupObjectPermission._meta.db_table,
+        node_relation=NodeRelation._meta.db_table,
+        user_groups=OSFUser.groups.through._meta.db_table,
+        user_institutions=OSFUser.affiliated_institutions.through._meta.db_table,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {
+            'institution_id': institution.id,
+            'permission_id': Permission.objects.get(codename=READ_NODE).id,
+        })
+        return {user_id: (public, private) for user_id, public, private in cursor.fetchall()}
 
-        institution_public_projects_count = institution_public_projects_qs.count()
-        institution_private_projects_count = institution_private_projects_qs.count()
 
-        InstitutionProjectCounts.record_institution_project_counts(
-            institution=institution,
-            public_project_count=institution_public_projects_count,
-            private_project_count=institution_private_projects_count,
-            timestamp=now
-        )
+def count_projects(is_public):
+    return Sum(Case(When(is_public=is_public, then=1), default=0, output_field=IntegerField()))
+
+
+def update_project_counts_for_institution(institution, timestamp):
+    project_counts = institution.nodes.filter(
+        type='osf.node',
+        parent_nodes=None,
+        is_deleted=False,
+    ).aggregate(
+        public=count_projects(is_public=True),
+        private=count_projects(is_public=False),
+    )
+
+    InstitutionProjectCounts.record_institution_project_counts(
+        institution=institution,
+        public_project_count=project_counts['public'] or 0,
+        private_project_count=project_counts['private'] or 0,
+        timestamp=timestamp
+    )
+
+    user_project_counts = get_user_project_counts(institution)
+    indexed = UserInstitutionProjectCounts.bulk_record_user_institution_project_counts(
+        institution,
+        (
+            (user,) + user_project_counts.get(user.id, (0, 0))
+            for user in institution.osfuser_set.all()
+        ),
+        timestamp=timestamp
+    )
+    logger.info('Recorded project counts for {} users of {}'.format(indexed, institution._id))
 
-        for user in institution.osfuser_set.all():
-            user_public_project_count = Node.objects.get_nodes_for_user(
-                user=user,
-                base_queryset=institution_public_projects_qs
-            ).count()
 
-            user_private_project_count = Node.objects.get_nodes_for_user(
-                user=user,
-                base_queryset=institution_private_projects_qs
-            ).count()
+@celery_app.task(name='management.commands.update_institution_project_counts_for_institution')
+def update_institution_project_counts_for_institution(institution_id, timestamp):
+    update_project_counts_for_institution(Institution.objects.get(id=institution_id), parse_date(timestamp))
 
-            UserInstitutionProjectCounts.record_user_institution_project_counts(
-                user=user,
-                institution=institution,
-                public_project_count=user_public_project_count,
-                private_project_count=user_private_project_count,
-                timestamp=now
-            )
+
+@celery_app.task(name='management.commands.update_institution_project_counts')
+def update_institution_project_counts(parallel=False):
+    """Record project counts for every institution and its users.
+
+    With ``parallel``, each institution is queued as its own task, so workers process them
+    concurrently; every document still shares the same timestamp.
+    """
+    now = dt.datetime.now()
+
+    for institution in Institution.objects.all():
+        if parallel:
+            update_institution_project_counts_for_institution.delay(institution.id, now.isoformat())
+        else:
+            update_project_counts_for_institution(institution, now)
 
 
 class Command(BaseCommand):
 
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--parallel',
+            action='store_true',
+            dest='parallel',
+            help='Queue a task per institution instead of counting them one after another',
+        )
+
     def handle(self, *args, **options):
-        update_institution_project_counts()
+        update_institution_project_counts(parallel=options['parallel'])
@@ -1,6 +1,7 @@
 import datetime as dt
 
 from elasticsearch.exceptions import NotFoundError
+from elasticsearch.helpers import bulk
 from elasticsearch_metrics import metrics
 from django.db import models
 from django.utils import timezone
@@ -11,6 +12,25 @@ from api.base.settings import MAX_SIZE_OF_ES_QUERY, DEFAULT_ES_NULL_VALUE
 
 class MetricMixin(object):
 
+    @classmethod
+    def bulk_record(cls, records, timestamp=None, using=None):
+        """Index a metric for each dict of field values in ``records`` with a single bulk
+        request, rather than one request per metric as with ``record``.
+        Returns the number of metrics indexed.
+        """
+        timestamp = timestamp or timezone.now()
+        index = cls.get_index_name(timestamp)
+        actions = (
+            {
+                '_index': index,
+                '_type': 'doc',
+                '_source': cls(timestamp=timestamp, **record).to_dict(),
+            }
+            for record in records
+        )
+        indexed, _ = bulk(cls._get_connection(using), actions)
+        return indexed
+
     @classmethod
     def _get_relevant_indices(cls, after):
         # NOTE: This will only work for yearly indices. This logic
@@ -268,6 +288,22 @@ class UserInstitutionProjectCounts(MetricMixin, metrics.Metric):
             **kwargs
         )
 
+    @classmethod
+    def bulk_record_user_institution_project_counts(cls, institution, user_counts, **kwargs):
+        """Record every ``(user, public_project_count, private_project_count)`` in ``user_counts``
+        in one bulk request.
+        """
+        return cls.bulk_record((
+            {
+                'user_id': user._id,
+                'institution_id': institution._id,
+                'department': getattr(user, 'department', DEFAULT_ES_NULL_VALUE),
+                'public_project_count': public_project_count,
+                'private_project_count': private_project_count,
+            }
+            for user, public_project_count, private_project_count in user_counts
+        ), **kwargs)
+
     @classmethod
     def get_current_user_metrics(cls, institution) -> list:
         """
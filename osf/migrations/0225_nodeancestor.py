@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from osf.utils.migrations import AddWaffleSwitches
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0224_population_registration_subscription_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodeAncestor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='osf.AbstractNode')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='osf.AbstractNode')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='nodeancestor',
+            unique_together=set([('ancestor', 'descendant')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='nodeancestor',
+            index_together=set([('descendant', 'depth')]),
+        ),
+        AddWaffleSwitches(['node_ancestor_closure'], active=False),
+    ]
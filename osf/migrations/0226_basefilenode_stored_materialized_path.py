@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+from osf.utils.migrations import AddWaffleSwitches
+
+
+class Migration(migrations.Migration):
+    atomic = False  # CREATE INDEX CONCURRENTLY cannot be run in a txn
+
+    dependencies = [
+        ('osf', '0225_nodeancestor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='basefilenode',
+            name='stored_materialized_path',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RunSQL(
+            [
+                """
+                CREATE INDEX CONCURRENTLY osf_basefilenode_checkout_stored_materialized_path_index
+                ON osf_basefilenode (target_content_type_id, target_object_id, stored_materialized_path text_pattern_ops)
+                WHERE checkout_id IS NOT NULL;
+                """,
+            ], [
+                """
+                DROP INDEX IF EXISTS osf_basefilenode_checkout_stored_materialized_path_index;
+                """,
+            ]
+        ),
+        AddWaffleSwitches(['osfstorage_stored_paths'], active=False),
+    ]
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from osf.utils.migrations import AddWaffleSwitches
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0226_basefilenode_stored_materialized_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageCounterIncrement',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page', models.CharField(max_length=300)),
+                ('action', models.CharField(max_length=128)),
+                ('version', models.IntegerField(blank=True, null=True)),
+                ('date', models.DateField()),
+                ('unique_today', models.BooleanField(default=False)),
+                ('counted', models.BooleanField(default=False)),
+                ('unique', models.BooleanField(default=False)),
+                ('file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='osf.BaseFileNode')),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='osf.Guid')),
+            ],
+        ),
+        AddWaffleSwitches(['buffered_page_counters'], active=False),
+    ]
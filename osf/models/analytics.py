@@ -1,12 +1,15 @@
 import logging
 
+import waffle
 from dateutil import parser
 from django.db import models, transaction
+from django_bulk_update.helper import bulk_update
 from django.db.models import Sum
 from django.db.models.expressions import RawSQL
 from django.utils import timezone
 
 from framework.sessions import session
+from osf import features
 from osf.models.base import BaseModel, Guid
 from osf.utils.datetime_aware_jsonfield import DateTimeAwareJSONField
 
@@ -96,8 +99,69 @@ class PageCounter(BaseModel):
             '$', '_'
         )
 
+    @staticmethod
+    def record_visit(page, cleaned_page, date_string, node_info):
+        """Track a visit to ``page`` in the session and work out what it adds to the page's counter.
+
+        :return tuple: whether the visit adds to today's unique visitors, to the total count and to
+            the all-time unique visitors
+        """
+        visited_by_date = session.data.get('visited_by_date', {'date': date_string, 'pages': []})
+        unique_today = False
+        # if they visited something today
+        if date_string == visited_by_date['date']:
+            # if they haven't visited this page today
+            if cleaned_page not in visited_by_date['pages']:
+                unique_today = True
+        # if they haven't visited something today
+        else:
+            # set their visited by date to blank
+            visited_by_date['date'] = date_string
+            visited_by_date['pages'] = []
+            unique_today = True
+
+        # update their sessions
+        visited_by_date['pages'].append(cleaned_page)
+        session.data['visited_by_date'] = visited_by_date
+
+        # if a download counter is being updated, only perform the update
+        # if the user who is downloading isn't a contributor to the project
+        page_type = cleaned_page.split(':')[0]
+        if page_type in ('download', 'view') and node_info:
+            if node_info['contributors'].filter(guids___id__isnull=False, guids___id=session.data.get('auth_user_id')).exists():
+                return unique_today, False, False
+
+        unique = False
+        visited = session.data.get('visited', [])
+        if page not in visited:
+            unique = True
+            visited.append(page)
+            session.data['visited'] = visited
+
+        session.save()
+        return unique_today, True, unique
+
+    def add_visit(self, date_string, unique_today, counted, unique):
+        """Apply one visit, as returned by ``record_visit``, to this counter without saving it."""
+        day = self.date.setdefault(date_string, {})
+        if unique_today:
+            day['unique'] = day.get('unique', 0) + 1
+        day['total'] = day.get('total', 0) + 1
+        if counted:
+            self.total += 1
+            if unique:
+                self.unique += 1
+
     @classmethod
     def update_counter(cls, resource, file, version, action, node_info):
+        cls.apply_visit(**cls.track_visit(resource, file, version, action, node_info))
+
+    @classmethod
+    def track_visit(cls, resource, file, version, action, node_info):
+        """Track a visit in the session only, so it can be counted later, outside the request.
+
+        :return dict: the visit, as keyword arguments for ``apply_visit``
+        """
         if version is not None:
             page = '{0}:{1}:{2}:{3}'.format(action, resource._id, file._id, version)
         else:
@@ -105,73 +169,102 @@ class PageCounter(BaseModel):
 
         cleaned_page = cls.clean_page(page)
         date = timezone.now()
-        date_string = date.strftime('%Y/%m/%d')
-        visited_by_date = session.data.get('visited_by_date', {'date': date_string, 'pages': []})
+        unique_today, counted, unique = cls.record_visit(page, cleaned_page, date.strftime('%Y/%m/%d'), node_info)
+        return {
+            'page': cleaned_page,
+            'resource_id': resource.id,
+            'file_id': file.id,
+            'action': action,
+            'version': version,
+            'date': date.date(),
+            'unique_today': unique_today,
+            'counted': counted,
+            'unique': unique,
+        }
+
+    @classmethod
+    def apply_visit(cls, page, resource_id, file_id, action, version, date, unique_today, counted, unique):
+        """Count a visit returned by ``track_visit`` towards its page's counter."""
+        if waffle.switch_is_active(features.BUFFERED_PAGE_COUNTERS):
+            # Append-only, so popular files don't serialize their visitors on the counter's row lock.
+            # flush_page_counters folds these into the PageCounter.
+            PageCounterIncrement.objects.create(
+                page=page,
+                resource_id=resource_id,
+                file_id=file_id,
+                action=action,
+                version=version,
+                date=date,
+                unique_today=unique_today,
+                counted=counted,
+                unique=unique,
+            )
+            return
+
         with transaction.atomic():
             # Temporary backwards compat - when creating new PageCounters, temporarily keep writing to _id field.
             # After we're sure this is stable, we can stop writing to the _id field, and query on
             # resource/file/action/version
             model_instance, created = cls.objects.select_for_update().get_or_create(
-                _id=cleaned_page,
-                resource=resource,
-                file=file,
+                _id=page,
+                resource_id=resource_id,
+                file_id=file_id,
                 action=action,
                 version=version
             )
+            model_instance.add_visit(date.strftime('%Y/%m/%d'), unique_today, counted, unique)
+            model_instance.save()
 
-            # if they visited something today
-            if date_string == visited_by_date['date']:
-                # if they haven't visited this page today
-                if cleaned_page not in visited_by_date['pages']:
-                    # if the model_instance has today in it
-                    if date_string in model_instance.date.keys():
-                        # increment the number of unique visitors for today
-                        model_instance.date[date_string]['unique'] += 1
-                    else:
-                        # set the number of unique visitors for today to 1
-                        model_instance.date[date_string] = dict(unique=1)
-            # if they haven't visited something today
-            else:
-                # set their visited by date to blank
-                visited_by_date['date'] = date_string
-                visited_by_date['pages'] = []
-                # if the model_instance has today in it
-                if date_string in model_instance.date.keys():
-                    # increment the number of unique visitors for today
-                    model_instance.date[date_string]['unique'] += 1
-                else:
-                    # set the number of unique visitors to 1
-                    model_instance.date[date_string] = dict(unique=1)
+    @classmethod
+    def flush_increments(cls, batch_size=10000):
+        """Fold buffered ``PageCounterIncrement``s into their PageCounters, ``batch_size`` at a time.
 
-            # update their sessions
-            visited_by_date['pages'].append(cleaned_page)
-            session.data['visited_by_date'] = visited_by_date
+        Each batch is applied with one bulk update in its own transaction. Increments locked by
+        another flush are skipped, so overlapping flushes don't count anything twice.
 
-            if date_string in model_instance.date.keys():
-                if 'total' not in model_instance.date[date_string].keys():
-                    model_instance.date[date_string].update(total=0)
-                model_instance.date[date_string]['total'] += 1
-            else:
-                model_instance.date[date_string] = dict(total=1)
-
-            # if a download counter is being updated, only perform the update
-            # if the user who is downloading isn't a contributor to the project
-            page_type = cleaned_page.split(':')[0]
-            if page_type in ('download', 'view') and node_info:
-                if node_info['contributors'].filter(guids___id__isnull=False, guids___id=session.data.get('auth_user_id')).exists():
-                    model_instance.save()
-                    return
+        :return int: number of increments applied
+        """
+        applied = 0
+        while True:
+            with transaction.atomic():
+                increments = list(
+                    PageCounterIncrement.objects.select_for_update(skip_locked=True).order_by('id')[:batch_size]
+                )
+                if not increments:
+                    return applied
 
-            visited = session.data.get('visited', [])
-            if page not in visited:
-                model_instance.unique += 1
-                visited.append(page)
-                session.data['visited'] = visited
+                first_increments = {}
+                for increment in increments:
+                    first_increments.setdefault(increment.page, increment)
+                # Lock in a consistent order to avoid deadlocking with update_counter
+                counters = {
+                    counter._id: counter
+                    for counter in cls.objects.select_for_update().filter(_id__in=list(first_increments)).order_by('id')
+                }
+                for page, increment in first_increments.items():
+                    if page not in counters:
+                        counters[page], created = cls.objects.select_for_update().get_or_create(
+                            _id=page,
+                            resource_id=increment.resource_id,
+                            file_id=increment.file_id,
+                            action=increment.action,
+                            version=increment.version,
+                        )
 
-            session.save()
-            model_instance.total += 1
+                for increment in increments:
+                    counters[increment.page].add_visit(
+                        increment.date.strftime('%Y/%m/%d'),
+                        increment.unique_today,
+                        increment.counted,
+                        increment.unique,
+                    )
+                bulk_update(list(counters.values()), update_fields=['date', 'total', 'unique'])
+                PageCounterIncrement.objects.filter(id__in=[increment.id for increment in increments]).delete()
 
-            model_instance.save()
+            applied += len(increments)
+            logger.info('Applied {} page counter increments'.format(applied))
+            if len(increments) < batch_size:
+                return applied
 
     @classmethod
     def get_basic_counters(cls, resource, file, version, action):
@@ -180,3 +273,23 @@ class PageCounter(BaseModel):
             return (counter.unique, counter.total)
         except cls.DoesNotExist:
             return (None, None)
+
+
+class PageCounterIncrement(models.Model):
+    """One visit to a page, buffered until ``PageCounter.flush_increments`` applies it.
+
+    Written instead of updating the PageCounter directly while the ``buffered_page_counters``
+    switch is on. Counts read from PageCounter are accurate as of the last flush.
+    """
+    # The PageCounter's _id
+    page = models.CharField(max_length=300)
+    action = models.CharField(max_length=128)
+    resource = models.ForeignKey(Guid, related_name='+', on_delete=models.CASCADE)
+    file = models.ForeignKey('osf.BaseFileNode', related_name='+', on_delete=models.CASCADE)
+    version = models.IntegerField(null=True, blank=True)
+    date = models.DateField()
+
+    # What the visit adds to the counter; see PageCounter.record_visit
+    unique_today = models.BooleanField(default=False)
+    counted = models.BooleanField(default=False)
+    unique = models.BooleanField(default=False)
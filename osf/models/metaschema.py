@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 import waffle
 import jsonschema
 
 from website.util import api_v2_url
 
 from osf.models.base import BaseModel, ObjectIDMixin
-from osf.models.validators import RegistrationResponsesValidator
+from osf.models.validators import RegistrationResponsesValidator, compile_json_schema
 from osf.utils.datetime_aware_jsonfield import DateTimeAwareJSONField
 from osf.exceptions import ValidationValueError, ValidationError
 
@@ -31,6 +34,18 @@ SCHEMABLOCK_TYPES = [
 ]
 
 
+# Compiled validators of RegistrationSchemas, keyed on the schema id and modified date first.
+# Schemas don't change once they're in use, so entries are only dropped when a schema or
+# one of its blocks is saved. Other processes miss their entries once they reload the schema,
+# since saving a block touches its schema's modified date as well.
+_validator_cache = {}
+
+
+def clear_validator_cache(schema_id):
+    for key in [key for key in _validator_cache if key[0] == schema_id]:
+        _validator_cache.pop(key, None)
+
+
 def allow_egap_admins(queryset, request):
     """
     Allows egap admins to see EGAP registrations as visible, should be deleted when when the EGAP registry goes
@@ -125,15 +140,37 @@ class RegistrationSchema(AbstractSchema):
         path = '/schemas/registrations/{}/'.format(self._id)
         return api_v2_url(path)
 
+    def _get_cached_validator(self, key, build):
+        """Return ``build()``, cached per schema version under ``key`` while the schema is saved."""
+        if self.pk is None:
+            return build()
+        key = (self.pk, self.modified) + key
+        if key not in _validator_cache:
+            _validator_cache[key] = build()
+        return _validator_cache[key]
+
+    def get_metadata_validator(self, reviewer=False, required_fields=False):
+        return self._get_cached_validator(
+            ('metadata', bool(required_fields), bool(reviewer)),
+            lambda: compile_json_schema(create_jsonschema_from_metaschema(
+                self.schema,
+                required_fields=required_fields,
+                is_reviewer=reviewer,
+            )),
+        )
+
+    def get_registration_responses_validator(self, required_fields=False):
+        return self._get_cached_validator(
+            ('registration_responses', bool(required_fields)),
+            lambda: RegistrationResponsesValidator(list(self.schema_blocks.all()), required_fields),
+        )
+
     def validate_metadata(self, metadata, reviewer=False, required_fields=False):
         """
         Validates registration_metadata field.
         """
-        schema = create_jsonschema_from_metaschema(self.schema,
-                                                   required_fields=required_fields,
-                                                   is_reviewer=reviewer)
         try:
-            jsonschema.validate(metadata, schema)
+            self.get_metadata_validator(reviewer=reviewer, required_fields=required_fields).validate(metadata)
         except jsonschema.ValidationError as e:
             for page in self.schema['pages']:
                 for question in page['questions']:
@@ -168,7 +205,7 @@ class RegistrationSchema(AbstractSchema):
         """Validates `registration_responses` against this schema (using `schema_blocks`).
         Raises `ValidationError` if invalid. Otherwise, returns True.
         """
-        validator = RegistrationResponsesValidator(self.schema_blocks.all(), required_fields)
+        validator = self.get_registration_responses_validator(required_fields=required_fields)
         return validator.validate(registration_responses)
 
 
@@ -209,3 +246,15 @@ class RegistrationSchemaBlock(ObjectIDMixin, BaseModel):
         """
         self.registration_response_key = self.registration_response_key or None
         return super(RegistrationSchemaBlock, self).save(*args, **kwargs)
+
+
+@receiver(post_save, sender=RegistrationSchema)
+def clear_schema_validators(sender, instance, **kwargs):
+    clear_validator_cache(instance.pk)
+
+
+@receiver(post_save, sender=RegistrationSchemaBlock)
+@receiver(post_delete, sender=RegistrationSchemaBlock)
+def clear_schema_block_validators(sender, instance, **kwargs):
+    RegistrationSchema.objects.filter(pk=instance.schema_id).update(modified=timezone.now())
+    clear_validator_cache(instance.schema_id)
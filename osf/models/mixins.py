@@ -1,6 +1,7 @@
 import pytz
 import markupsafe
 import logging
+import waffle
 
 from django.apps import apps
 from django.contrib.auth.models import Group, AnonymousUser
@@ -18,6 +19,7 @@ from framework.auth import Auth
 from framework.auth.core import get_user
 from framework.analytics import increment_user_activity_counters
 from framework.exceptions import PermissionsError
+from osf import features
 from osf.exceptions import (
     InvalidTriggerError,
     ValidationValueError,
@@ -29,7 +31,7 @@ from osf.exceptions import (
 from osf.models.node_relation import NodeRelation
 from osf.models.nodelog import NodeLog
 from osf.models.subject import Subject
-from osf.models.spam import SpamMixin, SpamStatus
+from osf.models.spam import SpamMixin, SpamStatus, enqueue_spam_check
 from osf.models.validators import validate_title
 from osf.models.tag import Tag
 from osf.utils import sanitize
@@ -43,6 +45,7 @@ from osf.utils.machines import (
 )
 
 from osf.utils.permissions import ADMIN, REVIEW_GROUPS, READ, WRITE
+from osf.utils.permission_resolver import get_node_permission_resolver
 from osf.utils.registrations import flatten_registration_metadata, expand_registration_responses
 from osf.utils.workflows import (
     DefaultStates,
@@ -1873,6 +1876,10 @@ class ContributorMixin(models.Model):
 
         if not user or user.is_anonymous:
             return False
+        if object_type == 'node':
+            resolver = get_node_permission_resolver(user, self)
+            if resolver:
+                return resolver.has_permission(self, permission, check_parent=check_parent)
         perm = '{}_{}'.format(permission, object_type)
         # Using get_group_perms to get permissions that are inferred through
         # group membership - not inherited from superuser status
@@ -1905,7 +1912,9 @@ class ContributorMixin(models.Model):
             return []
         # If base_perms not on model, will error
         perms = self.base_perms
-        user_perms = sorted(set(get_group_perms(user, self)).intersection(perms), key=perms.index)
+        resolver = get_node_permission_resolver(user, self) if self.guardian_object_type == 'node' else None
+        group_perms = resolver.get_permissions(self) if resolver else get_group_perms(user, self)
+        user_perms = sorted(set(group_perms).intersection(perms), key=perms.index)
         return [perm.split('_')[0] for perm in user_perms]
 
     def set_permissions(self, user, permissions, validate=True, save=False):
@@ -1985,6 +1994,9 @@ class SpamOverrideMixin(SpamMixin):
     # Override on model
     SPAM_CHECK_FIELDS = {}
 
+    # Flagging spam can make the object private
+    SPAM_CHECK_UPDATE_FIELDS = SpamMixin.SPAM_CHECK_UPDATE_FIELDS + ('is_public', 'keenio_read_key')
+
     @property
     def log_class(self):
         return NotImplementedError()
@@ -2083,7 +2095,12 @@ class SpamOverrideMixin(SpamMixin):
             return False
         if hasattr(self, 'conferences') and self.conferences.filter(auto_check_spam=False).exists():
             return False
+        if waffle.switch_is_active(features.ASYNC_SPAM_CHECKS):
+            enqueue_spam_check(self, user, sorted(saved_fields or []), request_headers)
+            return False
+        return self._check_spam_content(user, saved_fields, request_headers)
 
+    def _check_spam_content(self, user, saved_fields, request_headers):
         content = self._get_spam_content(saved_fields)
         if not content:
             return
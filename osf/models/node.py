@@ -22,6 +22,7 @@ from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.functional import cached_property
 from keen import scoped_keys
+import waffle
 from psycopg2._psycopg import AsIs
 from typedmodels.models import TypedModel, TypedModelManager
 from include import IncludeManager
@@ -32,6 +33,7 @@ from guardian.models import (
 from guardian.shortcuts import get_objects_for_user, get_groups_with_perms
 
 from framework import status
+from osf import features
 from framework.auth import oauth_scopes
 from framework.celery_tasks.handlers import enqueue_task, get_task_from_queue
 from framework.exceptions import PermissionsError, HTTPError
@@ -46,7 +48,7 @@ from osf.models.licenses import NodeLicenseRecord
 from osf.models.mixins import (AddonModelMixin, CommentableMixin, Loggable, GuardianMixin,
                                NodeLinkMixin, SpamOverrideMixin, RegistrationResponseMixin,
                                EditableFieldsMixin)
-from osf.models.node_relation import NodeRelation
+from osf.models.node_relation import NodeRelation, NodeAncestor
 from osf.models.nodelog import NodeLog
 from osf.models.private_link import PrivateLink
 from osf.models.tag import Tag
@@ -64,6 +66,7 @@ from website.project import tasks as node_tasks
 from website.project.model import NodeUpdateError
 from website.identifiers.tasks import update_doi_metadata_on_change
 from website.identifiers.clients import DataCiteClient
+from osf.utils.permission_resolver import get_node_permission_resolver
 from osf.utils.permissions import (
     ADMIN,
     ADMIN_NODE,
@@ -99,6 +102,13 @@ class AbstractNodeQuerySet(GuidMixinQuerySet):
             if active:
                 query = query.filter(is_deleted=False)
             return query
+        elif waffle.switch_is_active(features.NODE_ANCESTOR_CLOSURE):
+            descendants = Q(id__in=NodeAncestor.objects.filter(ancestor_id=root.pk).values('descendant_id'))
+            if active:
+                descendants &= Q(is_deleted=False)
+            if include_root:
+                descendants |= Q(id=root.pk)
+            return AbstractNode.objects.filter(descendants)
         else:
             sql = """
                 WITH RECURSIVE descendants AS (
@@ -155,6 +165,26 @@ class AbstractNodeQuerySet(GuidMixinQuerySet):
         if user is not None and not isinstance(user, AnonymousUser):
             read_user_query = get_objects_for_user(user, READ_NODE, self, with_superuser=False)
             qs |= read_user_query
+            if waffle.switch_is_active(features.NODE_ANCESTOR_CLOSURE):
+                qs |= self.extra(where=["""
+                    "osf_abstractnode".id in (
+                        WITH admin_nodes AS (
+                            SELECT N.id as node_id
+                            FROM osf_abstractnode as N, auth_permission as P, osf_nodegroupobjectpermission as G, osf_osfuser_groups as UG
+                            WHERE P.codename = 'admin_node'
+                            AND G.permission_id = P.id
+                            AND UG.osfuser_id = %s
+                            AND G.group_id = UG.group_id
+                            AND G.content_object_id = N.id
+                            AND N.type = 'osf.node'
+                        ) SELECT node_id FROM admin_nodes
+                        UNION ALL
+                        SELECT "osf_nodeancestor"."descendant_id"
+                        FROM admin_nodes
+                        JOIN "osf_nodeancestor" ON "osf_nodeancestor"."ancestor_id" = admin_nodes.node_id
+                    )
+                """], params=(user.id, ))
+                return qs.filter(is_deleted=False)
             qs |= self.extra(where=["""
                 "osf_abstractnode".id in (
                     WITH RECURSIVE implicit_read AS (
@@ -852,6 +882,10 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
                                     Useful for checking parent permissions for non-group actions like registrations.
         :return: bool Does the user have admin permissions on this object or its parents?
         """
+        if include_group_admin:
+            resolver = get_node_permission_resolver(user, self)
+            if resolver:
+                return resolver.is_admin_parent(self)
         if self.has_permission(user, ADMIN, check_parent=False):
             ret = True
             if not include_group_admin and not self.is_contributor(user):
@@ -879,6 +913,13 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
 
     @property
     def parents(self):
+        """List of ancestors, nearest first."""
+        if waffle.switch_is_active(features.NODE_ANCESTOR_CLOSURE):
+            ancestor_ids = list(NodeAncestor.objects.filter(
+                descendant_id=self.pk
+            ).order_by('depth').values_list('ancestor_id', flat=True))
+            ancestors = AbstractNode.objects.in_bulk(ancestor_ids)
+            return [ancestors[pk] for pk in ancestor_ids]
         if self.parent_node:
             return [self.parent_node] + self.parent_node.parents
         return []
@@ -912,13 +953,16 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         return self._get_admin_contributor_ids()
 
     def _get_admin_contributor_ids(self, include_self=False):
-        def get_admin_contributor_ids(node):
-            return node.get_group(ADMIN).user_set.filter(is_active=True).values_list('guids___id', flat=True)
+        def get_admin_contributor_ids(nodes):
+            group_names = [node.format_group(ADMIN) for node in nodes]
+            if not group_names:
+                return set()
+            return set(OSFUser.objects.filter(
+                groups__name__in=group_names, is_active=True
+            ).values_list('guids___id', flat=True))
         contributor_ids = set(self.contributors.values_list('guids___id', flat=True))
-        admin_ids = set(get_admin_contributor_ids(self)) if include_self else set()
-        for parent in self.parents:
-            admins = get_admin_contributor_ids(parent)
-            admin_ids.update(set(admins).difference(contributor_ids))
+        admin_ids = get_admin_contributor_ids([self]) if include_self else set()
+        admin_ids.update(get_admin_contributor_ids(self.parents).difference(contributor_ids))
         return admin_ids
 
     @property
@@ -1293,6 +1337,11 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         return self.private_links.filter(is_deleted=True).values_list('key', flat=True)
 
     def get_root(self):
+        if waffle.switch_is_active(features.NODE_ANCESTOR_CLOSURE):
+            root_id = NodeAncestor.objects.filter(
+                descendant_id=self.pk
+            ).order_by('-depth').values_list('ancestor_id', flat=True).first()
+            return AbstractNode.objects.get(pk=root_id) if root_id else self
         sql = """
             WITH RECURSIVE ascendants AS (
               SELECT
@@ -1957,6 +2006,14 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
             # Specifically call the super class save method to avoid recursion into model save method.
             super(AbstractNode, self).save()
 
+    def run_spam_check(self, user, saved_fields, request_headers):
+        # Override for SpamMixin
+        state = self.get_spam_check_state()
+        is_spam = self._check_spam_content(user, saved_fields, request_headers)
+        # Saved even when not spam, to keep the hash of the checked content
+        self.save_spam_check_result(state, save=super(AbstractNode, self).save)
+        return is_spam
+
     def resolve(self):
         """For compat with v1 Pointers."""
         return self
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, connection
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from .base import BaseModel, ObjectIDMixin
 
@@ -25,3 +27,101 @@ class NodeRelation(ObjectIDMixin, BaseModel):
         index_together = (
             ('is_node_link', 'child', 'parent'),
         )
+
+
+class NodeAncestorManager(models.Manager):
+
+    LINK_SQL = """
+        INSERT INTO {table} (ancestor_id, descendant_id, depth)
+        SELECT A.ancestor_id, D.descendant_id, A.depth + D.depth + 1
+        FROM (
+            SELECT ancestor_id, depth FROM {table} WHERE descendant_id = %(parent_id)s
+            UNION ALL SELECT %(parent_id)s, 0
+        ) AS A CROSS JOIN (
+            SELECT descendant_id, depth FROM {table} WHERE ancestor_id = %(child_id)s
+            UNION ALL SELECT %(child_id)s, 0
+        ) AS D
+        ON CONFLICT (ancestor_id, descendant_id) DO NOTHING;
+    """
+
+    UNLINK_SQL = """
+        DELETE FROM {table}
+        WHERE ancestor_id IN (
+            SELECT ancestor_id FROM {table} WHERE descendant_id = %(parent_id)s
+            UNION ALL SELECT %(parent_id)s
+        ) AND descendant_id IN (
+            SELECT descendant_id FROM {table} WHERE ancestor_id = %(child_id)s
+            UNION ALL SELECT %(child_id)s
+        );
+    """
+
+    # Rebuilds the rows of a batch of descendants from osf_noderelation
+    BACKFILL_SQL = """
+        WITH RECURSIVE ancestors AS (
+            SELECT child_id AS descendant_id, parent_id AS ancestor_id, 1 AS depth
+            FROM {relation_table}
+            WHERE is_node_link IS FALSE AND child_id = ANY(%(node_ids)s)
+        UNION ALL
+            SELECT A.descendant_id, R.parent_id, A.depth + 1
+            FROM ancestors AS A
+                JOIN {relation_table} AS R ON R.child_id = A.ancestor_id
+            WHERE R.is_node_link IS FALSE
+        )
+        INSERT INTO {table} (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM ancestors
+        ON CONFLICT (ancestor_id, descendant_id) DO UPDATE SET depth = EXCLUDED.depth;
+    """
+
+    def _execute(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql.format(
+                table=self.model._meta.db_table,
+                relation_table=NodeRelation._meta.db_table,
+            ), params)
+            return cursor.rowcount
+
+    def link(self, parent_id, child_id):
+        """Record that ``child_id`` and its subtree now sit below ``parent_id`` and its ancestors."""
+        return self._execute(self.LINK_SQL, {'parent_id': parent_id, 'child_id': child_id})
+
+    def unlink(self, parent_id, child_id):
+        """Remove every path that ran through the ``parent_id`` -> ``child_id`` relation."""
+        return self._execute(self.UNLINK_SQL, {'parent_id': parent_id, 'child_id': child_id})
+
+    def backfill(self, node_ids):
+        """Write the closure rows of every node in ``node_ids`` from ``osf_noderelation``."""
+        return self._execute(self.BACKFILL_SQL, {'node_ids': list(node_ids)})
+
+
+class NodeAncestor(models.Model):
+    """Closure table of the component (non-link) hierarchy.
+
+    Holds one row per (ancestor, descendant) pair at any distance, so descendant and ancestor
+    lookups are a single indexed query instead of a recursive one over ``NodeRelation``.
+    Kept in sync by the ``NodeRelation`` signal receivers below; ``backfill_node_ancestors``
+    populates it for existing data. Reads are gated by the ``node_ancestor_closure`` switch.
+    """
+    ancestor = models.ForeignKey('AbstractNode', related_name='+', on_delete=models.CASCADE)
+    descendant = models.ForeignKey('AbstractNode', related_name='+', on_delete=models.CASCADE)
+    # Number of NodeRelations between the two nodes; a direct child has depth 1
+    depth = models.PositiveIntegerField()
+
+    objects = NodeAncestorManager()
+
+    class Meta:
+        unique_together = ('ancestor', 'descendant')
+        index_together = (
+            ('descendant', 'depth'),
+        )
+
+
+@receiver(post_save, sender=NodeRelation)
+def add_node_ancestors(sender, instance, created, **kwargs):
+    if created and not instance.is_node_link:
+        NodeAncestor.objects.link(instance.parent_id, instance.child_id)
+
+
+@receiver(post_delete, sender=NodeRelation)
+def remove_node_ancestors(sender, instance, **kwargs):
+    if not instance.is_node_link:
+        NodeAncestor.objects.unlink(instance.parent_id, instance.child_id)
@@ -822,6 +822,14 @@ class Preprint(DirtyFieldsMixin, GuidMixin, IdentifierMixin, ReviewableMixin, Ba
 
         return super(Preprint, self).set_description(description, auth, save)
 
+    def run_spam_check(self, user, saved_fields, request_headers):
+        # Override for SpamMixin
+        state = self.get_spam_check_state()
+        is_spam = self._check_spam_content(user, saved_fields, request_headers)
+        # Specifically call the super class save method to avoid queueing another spam check.
+        self.save_spam_check_result(state, save=super(Preprint, self).save)
+        return is_spam
+
     def get_spam_fields(self, saved_fields):
         return self.SPAM_CHECK_FIELDS if self.is_published and 'is_published' in saved_fields else self.SPAM_CHECK_FIELDS.intersection(
             saved_fields)
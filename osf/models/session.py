@@ -1,3 +1,4 @@
+from framework.sessions.utils import session_cache
 from osf.models.base import BaseModel, ObjectIDMixin
 from osf.utils.datetime_aware_jsonfield import DateTimeAwareJSONField
 
@@ -12,3 +13,8 @@ class Session(ObjectIDMixin, BaseModel):
     @property
     def is_external_first_login(self):
         return 'auth_user_external_first_login' in self.data
+
+    def save(self, *args, **kwargs):
+        ret = super(Session, self).save(*args, **kwargs)
+        session_cache.saved(self)
+        return ret
@@ -1,8 +1,11 @@
 import abc
+import copy
+import hashlib
 import logging
 
 from django.db import models
 from django.utils import timezone
+from framework.celery_tasks.handlers import enqueue_task, get_task_from_queue
 from osf.exceptions import ValidationValueError, ValidationTypeError
 from osf.utils.datetime_aware_jsonfield import DateTimeAwareJSONField
 from osf.utils.fields import NonNaiveDateTimeField
@@ -18,6 +21,8 @@ def _get_client():
     AKISMET_APIKEY should be `None` for local testing.
     :return:
     """
+    if settings.AKISMET_FAKE_CLIENT:
+        return akismet.FakeAkismetClient()
     return akismet.AkismetClient(
         apikey=settings.AKISMET_APIKEY,
         website=settings.DOMAIN,
@@ -39,6 +44,31 @@ def _validate_reports(value, *args, **kwargs):
             )
 
 
+def enqueue_spam_check(resource, user, saved_fields, request_headers):
+    """Queue ``resource.run_spam_check`` to run in a celery task after the request, so the request
+    doesn't wait on the spam service.
+
+    Everything ``user`` saves during a request is checked by one task, and a resource saved more
+    than once is checked once, for all of its saved fields. ``saved_fields`` must be JSON
+    serializable: a list of field names, or a dict of field name to saved values.
+    """
+    from osf.external.tasks import check_resources_for_spam
+
+    resource_entry = {'model': resource._meta.label, 'pk': resource.pk, 'saved_fields': saved_fields}
+    task = get_task_from_queue(check_resources_for_spam.name, predicate=lambda task: task.kwargs['user_id'] == user._id)
+    if not task:
+        enqueue_task(check_resources_for_spam.s(user_id=user._id, resources=[resource_entry], request_headers=request_headers))
+        return
+    for entry in task.kwargs['resources']:
+        if (entry['model'], entry['pk']) == (resource_entry['model'], resource_entry['pk']):
+            if isinstance(saved_fields, dict):
+                entry['saved_fields'].update(saved_fields)
+            else:
+                entry['saved_fields'] = sorted(set(entry['saved_fields']).union(saved_fields))
+            return
+    task.kwargs['resources'].append(resource_entry)
+
+
 class SpamStatus(object):
     UNKNOWN = None
     FLAGGED = 1
@@ -80,6 +110,9 @@ class SpamMixin(models.Model):
         default=dict, blank=True, validators=[_validate_reports]
     )
 
+    # Fields a spam check may change, and so the only ones saved after a queued check
+    SPAM_CHECK_UPDATE_FIELDS = ('spam_status', 'spam_data', 'spam_pro_tip')
+
     def flag_spam(self):
         # If ham and unedited then tell user that they should read it again
         if self.spam_status == SpamStatus.UNKNOWN:
@@ -187,12 +220,44 @@ class SpamMixin(models.Model):
         """Must return is_spam"""
         pass
 
+    @abc.abstractmethod
+    def run_spam_check(self, user, saved_fields, request_headers):
+        """Check ``saved_fields`` for spam and save the outcome. Called by queued spam checks."""
+        raise NotImplementedError()
+
+    def get_spam_check_state(self):
+        """Return copies of the fields a spam check may change, for ``save_spam_check_result``."""
+        return {
+            field: copy.deepcopy(getattr(self, field))
+            for field in self.SPAM_CHECK_UPDATE_FIELDS if hasattr(self, field)
+        }
+
+    def save_spam_check_result(self, state, save=None):
+        """Save only the fields that changed since ``state`` was taken, if any.
+
+        Queued checks run while the object may be edited elsewhere, so a full save would overwrite
+        those edits with what was loaded before the check.
+
+        :param dict state: from ``get_spam_check_state``, taken before the check
+        :param save: the save method to call, defaulting to ``self.save``
+        :return list: the names of the saved fields
+        """
+        update_fields = [field for field, value in state.items() if getattr(self, field) != value]
+        if update_fields:
+            (save or self.save)(update_fields=update_fields)
+        return update_fields
+
     def do_check_spam(self, author, author_email, content, request_headers, update=True):
         if self.spam_status == SpamStatus.HAM:
             return False
         if self.is_spammy:
             return True
 
+        # Unchanged content that was already checked came back clean, or it would be spammy
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        if self.spam_data.get('content_hash') == content_hash:
+            return False
+
         client = _get_client()
         remote_addr = request_headers['Remote-Addr']
         user_agent = request_headers.get('User-Agent')
@@ -214,6 +279,7 @@ class SpamMixin(models.Model):
                 'Referer': referer,
             }
             self.spam_data['content'] = content
+            self.spam_data['content_hash'] = content_hash
             self.spam_data['author'] = author
             self.spam_data['author_email'] = author_email
             if is_spam:
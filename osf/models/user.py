@@ -27,6 +27,7 @@ from django.db.models import Count
 from django.db.models.signals import post_save
 from django.utils import timezone
 from guardian.shortcuts import get_objects_for_user
+import waffle
 
 from framework.auth import Auth, signals, utils
 from framework.auth.core import generate_verification_key
@@ -35,7 +36,8 @@ from framework.auth.exceptions import (ChangePasswordError, ExpiredTokenError,
                                        MergeConfirmedRequiredError,
                                        MergeConflictError)
 from framework.exceptions import PermissionsError
-from framework.sessions.utils import remove_sessions_for_user
+from framework.sessions.utils import remove_sessions_for_user, session_cache
+from osf import features
 from osf.utils.requests import get_current_request
 from osf.exceptions import reraise_django_validation_errors, MaxRetriesError, UserStateError
 from osf.models.base import BaseModel, GuidMixin, GuidMixinQuerySet
@@ -43,7 +45,7 @@ from osf.models.contributor import Contributor, RecentlyAddedContributor
 from osf.models.institution import Institution
 from osf.models.mixins import AddonModelMixin
 from osf.models.nodelog import NodeLog
-from osf.models.spam import SpamMixin
+from osf.models.spam import SpamMixin, enqueue_spam_check
 from osf.models.session import Session
 from osf.models.tag import Tag
 from osf.models.validators import validate_email, validate_social, validate_history_item
@@ -1742,7 +1744,7 @@ class OSFUser(DirtyFieldsMixin, GuidMixin, BaseModel, AbstractBaseUser, Permissi
         except itsdangerous.BadSignature:
             return None
 
-        user_session = Session.load(token)
+        user_session = session_cache.load(token)
 
         if user_session is None:
             return None
@@ -1768,18 +1770,30 @@ class OSFUser(DirtyFieldsMixin, GuidMixin, BaseModel, AbstractBaseUser, Permissi
     def check_spam(self, saved_fields, request_headers):
         if not website_settings.SPAM_CHECK_ENABLED:
             return False
-        is_spam = False
-        if set(self.SPAM_USER_PROFILE_FIELDS.keys()).intersection(set(saved_fields.keys())):
-            content = self._get_spam_content(saved_fields)
-            if content:
-                is_spam = self.do_check_spam(
-                    self.fullname,
-                    self.username,
-                    content,
-                    request_headers
-                )
-                self.save()
+        if not set(self.SPAM_USER_PROFILE_FIELDS.keys()).intersection(set(saved_fields.keys())):
+            return False
+        if waffle.switch_is_active(features.ASYNC_SPAM_CHECKS):
+            spam_fields = {
+                field: contents for field, contents in saved_fields.items()
+                if field in self.SPAM_USER_PROFILE_FIELDS
+            }
+            enqueue_spam_check(self, self, spam_fields, request_headers)
+            return False
+        return self.run_spam_check(self, saved_fields, request_headers)
 
+    def run_spam_check(self, user, saved_fields, request_headers):
+        # Override for SpamMixin
+        is_spam = False
+        content = self._get_spam_content(saved_fields)
+        if content:
+            state = self.get_spam_check_state()
+            is_spam = self.do_check_spam(
+                self.fullname,
+                self.username,
+                content,
+                request_headers
+            )
+            self.save_spam_check_result(state)
         return is_spam
 
     def gdpr_delete(self):
@@ -11,6 +11,7 @@ from rest_framework import exceptions
 
 from website.notifications.constants import NOTIFICATION_TYPES
 
+from osf.utils.caching import cached_property
 from osf.utils.registrations import FILE_VIEW_URL_REGEX
 from osf.utils.sanitize import strip_html
 from osf.exceptions import ValidationError, ValidationValueError, reraise_django_validation_errors, BlacklistedEmailError
@@ -225,6 +226,15 @@ def validate_location(value):
     return True
 
 
+def compile_json_schema(json_schema):
+    """Return a validator instance for ``json_schema``, as ``jsonschema.validate`` builds on each call.
+    Raises ``jsonschema.SchemaError`` if ``json_schema`` is itself invalid.
+    """
+    cls = jsonschema.validators.validator_for(json_schema)
+    cls.check_schema(json_schema)
+    return cls(json_schema)
+
+
 class RegistrationResponsesValidator:
     NON_EMPTY_STRING = {
         'type': 'string',
@@ -275,6 +285,11 @@ class RegistrationResponsesValidator:
         self.required_fields = required_fields
         self.json_schema = self._build_json_schema()
 
+    @cached_property
+    def compiled_schema(self):
+        """A jsonschema validator for ``json_schema``, checked once rather than on every call."""
+        return compile_json_schema(self.json_schema)
+
     def validate(self, registration_responses):
         """Validate the given registration_responses
 
@@ -282,7 +297,7 @@ class RegistrationResponsesValidator:
         :raises ValidationError (if invalid)
         """
         try:
-            jsonschema.validate(registration_responses, self.json_schema)
+            self.compiled_schema.validate(registration_responses)
         except jsonschema.ValidationError as e:
             properties = self.json_schema.get('properties', {})
             relative_path = getattr(e, 'relative_path', None)
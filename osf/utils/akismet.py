@@ -118,3 +118,28 @@ class AkismetClient(object):
         )
         if res.status_code != requests.codes.ok:
             raise AkismetClientError(reason=res.text)
+
+
+class FakeAkismetClient(object):
+    """Local stand-in for AkismetClient, used when ``AKISMET_FAKE_CLIENT`` is set.
+
+    Like Akismet's own test mode, content is spam exactly when the author or content contains
+    ``SPAM_MARKER``; nothing leaves the process.
+    """
+    SPAM_MARKER = 'viagra-test-123'
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def check_comment(self, user_ip, user_agent, **kwargs):
+        is_spam = any(
+            self.SPAM_MARKER in (kwargs.get(key) or '')
+            for key in ('comment_author', 'comment_content')
+        )
+        return is_spam, None
+
+    def submit_spam(self, user_ip, user_agent, **kwargs):
+        pass
+
+    def submit_ham(self, user_ip, user_agent, **kwargs):
+        pass
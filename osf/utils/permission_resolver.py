@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Request-scoped, bulk-loaded node permissions.
+
+List endpoints check permissions for every node on a page, and each check runs
+``guardian.get_group_perms`` (plus a walk up the parent chain for implicit admin READ).
+A ``NodePermissionResolver`` loads a user's permissions on a whole page of nodes and
+their ancestors in a constant number of queries, and ``AbstractNode`` permission
+checks answer from it while it is attached to the current request.
+
+Resolvers are only primed for safe (read-only) requests, so permissions cannot change
+underneath them.
+"""
+from django.db import connection
+from psycopg2._psycopg import AsIs
+
+from osf.utils.permissions import ADMIN, READ
+from osf.utils.requests import get_current_request, DummyRequest
+
+ANCESTORS_SQL = """
+    WITH RECURSIVE ancestors AS (
+        SELECT
+            child_id AS node_id,
+            parent_id
+        FROM %s
+        WHERE is_node_link IS FALSE AND child_id IN %s
+    UNION ALL
+        SELECT
+            A.node_id,
+            R.parent_id
+        FROM ancestors AS A
+            JOIN %s AS R ON R.child_id = A.parent_id
+        WHERE R.is_node_link IS FALSE
+    ) SELECT node_id, parent_id FROM ancestors;
+"""
+
+REQUEST_ATTRIBUTE = '_node_permission_resolvers'
+
+
+class NodePermissionResolver(object):
+    """Answers node permission checks for one user from permissions loaded in bulk."""
+
+    def __init__(self, user):
+        self.user = user
+        self._group_ids = None
+        # node id -> set of permission codenames, e.g. {'read_node', 'write_node'}
+        self._perms = {}
+        # node id -> ids of all of its non-link ancestors
+        self._ancestors = {}
+
+    @property
+    def group_ids(self):
+        if self._group_ids is None:
+            self._group_ids = list(self.user.groups.values_list('id', flat=True))
+        return self._group_ids
+
+    def load(self, nodes):
+        """Load permissions for ``nodes`` and all of their ancestors.
+
+        :param nodes: iterable of AbstractNodes; nodes already loaded are skipped
+        """
+        from osf.models import NodeRelation
+        from osf.models.node import NodeGroupObjectPermission
+
+        node_ids = {node.id for node in nodes if node.id not in self._ancestors}
+        if not node_ids:
+            return
+
+        ancestors = {node_id: set() for node_id in node_ids}
+        with connection.cursor() as cursor:
+            node_relation_table = AsIs(NodeRelation._meta.db_table)
+            cursor.execute(ANCESTORS_SQL, [node_relation_table, tuple(node_ids), node_relation_table])
+            for node_id, parent_id in cursor.fetchall():
+                ancestors[node_id].add(parent_id)
+
+        to_fetch = node_ids.union(*ancestors.values()).difference(self._perms)
+        for node_id in to_fetch:
+            self._perms[node_id] = set()
+        if to_fetch and self.group_ids:
+            rows = NodeGroupObjectPermission.objects.filter(
+                group_id__in=self.group_ids,
+                content_object_id__in=to_fetch,
+            ).values_list('content_object_id', 'permission__codename')
+            for node_id, codename in rows:
+                self._perms[node_id].add(codename)
+        self._ancestors.update(ancestors)
+
+    def handles(self, node):
+        return node.id in self._ancestors
+
+    def get_permissions(self, node):
+        """Return the raw permission codenames the user has on ``node`` (no implicit admin)."""
+        return self._perms[node.id]
+
+    def has_permission(self, node, permission, check_parent=True):
+        if '{}_node'.format(permission) in self._perms[node.id]:
+            return True
+        if permission == READ and check_parent:
+            return self.is_admin_parent(node)
+        return False
+
+    def is_admin_parent(self, node):
+        """Whether the user is an admin, directly or through a group, on ``node`` or any ancestor."""
+        admin_perm = '{}_node'.format(ADMIN)
+        return any(
+            admin_perm in self._perms[node_id]
+            for node_id in self._ancestors[node.id].union([node.id])
+        )
+
+
+def _get_request():
+    request = get_current_request()
+    if isinstance(request, DummyRequest):
+        # Process-global; never store per-request state on it
+        return None
+    return request
+
+
+def prime_node_permissions(user, nodes):
+    """Bulk-load ``user``'s permissions on ``nodes`` for the rest of the current request."""
+    request = _get_request()
+    if request is None or not user or user.is_anonymous:
+        return None
+    resolvers = getattr(request, REQUEST_ATTRIBUTE, None)
+    if resolvers is None:
+        resolvers = {}
+        setattr(request, REQUEST_ATTRIBUTE, resolvers)
+    resolver = resolvers.get(user.id)
+    if resolver is None:
+        resolver = resolvers[user.id] = NodePermissionResolver(user)
+    resolver.load(nodes)
+    return resolver
+
+
+def get_node_permission_resolver(user, node):
+    """Return the primed resolver for ``user`` if it covers ``node``, else None."""
+    if not user or user.is_anonymous:
+        return None
+    request = _get_request()
+    resolvers = getattr(request, REQUEST_ATTRIBUTE, None) if request is not None else None
+    if not resolvers:
+        return None
+    resolver = resolvers.get(user.id)
+    if resolver is not None and resolver.handles(node):
+        return resolver
+    return None
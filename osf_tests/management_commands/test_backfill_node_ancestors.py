@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import pytest
+from waffle.testutils import override_switch
+
+from osf import features
+from osf.management.commands.backfill_node_ancestors import backfill_node_ancestors
+from osf.models import AbstractNode, NodeAncestor, NodeRelation
+from osf_tests.factories import AuthUserFactory, NodeFactory, ProjectFactory
+
+
+def ancestry(node):
+    return set(NodeAncestor.objects.filter(descendant=node).values_list('ancestor_id', 'depth'))
+
+
+@pytest.mark.django_db
+class TestNodeAncestor:
+
+    @pytest.fixture()
+    def project(self):
+        return ProjectFactory()
+
+    @pytest.fixture()
+    def component(self, project):
+        return NodeFactory(parent=project)
+
+    @pytest.fixture()
+    def grandchild(self, component):
+        return NodeFactory(parent=component)
+
+    def test_maintained_on_create(self, project, component, grandchild):
+        assert ancestry(project) == set()
+        assert ancestry(component) == {(project.id, 1)}
+        assert ancestry(grandchild) == {(component.id, 1), (project.id, 2)}
+
+    def test_node_links_ignored(self, project, grandchild):
+        other = ProjectFactory()
+        NodeRelation.objects.create(parent=other, child=project, is_node_link=True)
+        assert not NodeAncestor.objects.filter(ancestor=other).exists()
+
+    def test_maintained_on_delete(self, project, component, grandchild):
+        NodeRelation.objects.get(parent=project, child=component).delete()
+        assert ancestry(component) == set()
+        assert ancestry(grandchild) == {(component.id, 1)}
+
+    def test_backfill(self, project, component, grandchild):
+        expected = set(NodeAncestor.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+        NodeAncestor.objects.all().delete()
+        backfill_node_ancestors(batch_size=1)
+        assert set(NodeAncestor.objects.values_list('ancestor_id', 'descendant_id', 'depth')) == expected
+
+    def test_reads_match_recursive_queries(self, project, component, grandchild):
+        user = AuthUserFactory()
+        component.add_contributor(user, permissions='admin', save=True)
+        with override_switch(features.NODE_ANCESTOR_CLOSURE, active=False):
+            children = set(AbstractNode.objects.get_children(component, include_root=True))
+            root = grandchild.get_root()
+            parents = grandchild.parents
+            viewable = set(AbstractNode.objects.can_view(user))
+        with override_switch(features.NODE_ANCESTOR_CLOSURE, active=True):
+            assert set(AbstractNode.objects.get_children(component, include_root=True)) == children
+            assert grandchild.get_root() == root
+            assert grandchild.parents == parents
+            assert set(AbstractNode.objects.can_view(user)) == viewable
+        assert grandchild in viewable
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from addons.osfstorage.models import OsfStorageFileNode
+from osf.management.commands.backfill_osfstorage_materialized_paths import backfill_osfstorage_materialized_paths
+from osf_tests.factories import ProjectFactory
+
+
+@pytest.mark.django_db
+def test_backfill_osfstorage_materialized_paths():
+    root = ProjectFactory().get_addon('osfstorage').get_root()
+    folder = root.append_folder('Cloud')
+    child = folder.append_file('Carp')
+    OsfStorageFileNode.objects.filter(id__in=[root.id, folder.id, child.id]).update(stored_materialized_path=None)
+
+    backfill_osfstorage_materialized_paths(batch_size=1)
+
+    paths = dict(OsfStorageFileNode.objects.filter(
+        id__in=[root.id, folder.id, child.id]
+    ).values_list('id', 'stored_materialized_path'))
+    assert paths == {root.id: '/', folder.id: '/Cloud/', child.id: '/Cloud/Carp'}
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import Future
+import glob
+import os
+
+import mock
+import pytest
+import requests
+import responses
+
+from osf.management.commands import export_user_account
+from osf.management.commands.export_user_account import download_file, export_account, ExportManifest
+from osf_tests.factories import ProjectFactory, UserFactory
+
+URL = 'http://localhost:7777/v1/resources/abcde/providers/osfstorage/?zip='
+
+
+class TestDownloadFile:
+
+    @pytest.fixture()
+    def file_path(self, tmpdir):
+        return str(tmpdir.join('osfstorage-archive.zip'))
+
+    @responses.activate
+    def test_streams_to_file(self, file_path):
+        responses.add(responses.GET, URL, body=b'zipped files', status=200)
+        download_file(URL, file_path)
+        with open(file_path, 'rb') as f:
+            assert f.read() == b'zipped files'
+        assert not os.path.exists(file_path + '.part')
+
+    @responses.activate
+    def test_resumes_partial_download(self, file_path):
+        with open(file_path + '.part', 'wb') as f:
+            f.write(b'zipped ')
+        responses.add(responses.GET, URL, body=b'files', status=206)
+        download_file(URL, file_path)
+        assert responses.calls[0].request.headers['Range'] == 'bytes=7-'
+        with open(file_path, 'rb') as f:
+            assert f.read() == b'zipped files'
+
+    @responses.activate
+    def test_restarts_when_range_is_ignored(self, file_path):
+        with open(file_path + '.part', 'wb') as f:
+            f.write(b'stale ')
+        responses.add(responses.GET, URL, body=b'zipped files', status=200)
+        download_file(URL, file_path)
+        with open(file_path, 'rb') as f:
+            assert f.read() == b'zipped files'
+
+    @responses.activate
+    def test_retries_dropped_connection(self, file_path, monkeypatch):
+        monkeypatch.setattr('time.sleep', lambda seconds: None)
+        responses.add(responses.GET, URL, body=requests.exceptions.ConnectionError('dropped'))
+        responses.add(responses.GET, URL, body=b'zipped files', status=200)
+        download_file(URL, file_path)
+        assert len(responses.calls) == 2
+        with open(file_path, 'rb') as f:
+            assert f.read() == b'zipped files'
+
+    @responses.activate
+    def test_completes_partial_download_past_the_end(self, file_path):
+        with open(file_path + '.part', 'wb') as f:
+            f.write(b'zipped files')
+        responses.add(responses.GET, URL, status=416)
+        assert download_file(URL, file_path) == (416, None)
+        with open(file_path, 'rb') as f:
+            assert f.read() == b'zipped files'
+
+    @responses.activate
+    def test_returns_error_response(self, file_path):
+        responses.add(responses.GET, URL, json={'message': 'nope'}, status=403)
+        assert download_file(URL, file_path) == (403, '{"message": "nope"}')
+        assert not os.path.exists(file_path)
+
+
+@pytest.mark.django_db
+class TestExportManifest:
+
+    def test_completed_resources_persist(self, tmpdir):
+        project = ProjectFactory()
+        project_dir = str(tmpdir.join('projects', project._id))
+
+        manifest = ExportManifest(str(tmpdir))
+        assert not manifest.is_completed(project_dir)
+        manifest.mark_completed(project, project_dir)
+
+        resumed = ExportManifest(str(tmpdir))
+        assert resumed.is_completed(project_dir)
+        assert resumed.data['completed'] == {os.path.join('projects', project._id): project._id}
+
+
+class InlineExecutor(object):
+    """Runs jobs as they're submitted, in the test's thread and database transaction.
+
+    Only for exports without components, which are submitted while ResourceExporter holds its lock.
+    """
+
+    def __init__(self, max_workers):
+        pass
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+    def shutdown(self):
+        pass
+
+
+@pytest.mark.django_db
+class TestExportAccount:
+
+    @pytest.fixture(autouse=True)
+    def run_inline(self, monkeypatch):
+        monkeypatch.setattr(export_user_account, 'ThreadPoolExecutor', InlineExecutor)
+        monkeypatch.setattr(export_user_account, 'connection', mock.Mock())
+        monkeypatch.setattr('builtins.input', lambda prompt: 'y')
+
+    @pytest.fixture()
+    def user(self):
+        return UserFactory()
+
+    @pytest.fixture()
+    def projects(self, user):
+        projects = [ProjectFactory(creator=user), ProjectFactory(creator=user)]
+        for project in projects:
+            project.get_addon('osfstorage').get_root().append_file('data.csv')
+        return projects
+
+    def test_rerun_retries_failed_resources(self, user, projects, tmpdir):
+        failing, succeeding = projects
+        base_dir = str(tmpdir.join('{}-export'.format(user._id)))
+        downloads = []
+
+        def download(url, file_path, fail):
+            node_id = file_path.split(os.sep)[-3]
+            downloads.append(node_id)
+            if fail and node_id == failing._id:
+                return 500, '{"message": "Internal Server Error"}'
+            with open(file_path, 'wb') as f:
+                f.write(b'zipped files')
+            return 200, None
+
+        with mock.patch.object(export_user_account, 'download_file', side_effect=lambda url, file_path: download(url, file_path, fail=True)):
+            export_account(user._id, str(tmpdir))
+        assert sorted(downloads) == sorted([failing._id, succeeding._id])
+        assert len(export_user_account.ERRORS) == 1
+        assert ExportManifest(base_dir).data['completed'] == {
+            os.path.join('projects', succeeding._id): succeeding._id,
+        }
+
+        del downloads[:]
+        with mock.patch.object(export_user_account, 'download_file', side_effect=lambda url, file_path: download(url, file_path, fail=False)):
+            export_account(user._id, str(tmpdir))
+        assert downloads == [failing._id]
+        assert export_user_account.ERRORS == []
+        assert not os.path.exists(base_dir)
+        assert len(glob.glob(str(tmpdir.join('{}-export-*.zip'.format(user._id))))) == 1
@@ -7,12 +7,14 @@ import mock
 import pytest
 from django.utils import timezone
 from nose.tools import *  # noqa: F403
+from waffle.testutils import override_switch
 
 from datetime import datetime
 
 from addons.osfstorage.models import OsfStorageFile
 from framework import analytics
-from osf.models import PageCounter, OSFGroup
+from osf import features
+from osf.models import PageCounter, PageCounterIncrement, OSFGroup
 
 from tests.base import OsfTestCase
 from osf_tests.factories import UserFactory, ProjectFactory
@@ -144,6 +146,43 @@ class TestPageCounter:
         assert page_counter.total == 1
         assert page_counter.unique == 1
 
+    @mock.patch('osf.models.analytics.session')
+    def test_buffered_update_counter(self, mock_session, user, project, file_node):
+        mock_session.data = {}
+        resource = project.guids.first()
+        with override_switch(features.BUFFERED_PAGE_COUNTERS, active=True):
+            PageCounter.update_counter(resource, file_node, version=None, action='download', node_info={})
+            PageCounter.update_counter(resource, file_node, version=None, action='download', node_info={})
+            mock_session.data = {'auth_user_id': user._id}
+            PageCounter.update_counter(resource, file_node, version=None, action='download', node_info={'contributors': project.contributors})
+
+        # Nothing is counted until the increments are flushed
+        assert not PageCounter.objects.filter(resource=resource, file=file_node).exists()
+        assert PageCounterIncrement.objects.count() == 3
+
+        assert PageCounter.flush_increments(batch_size=2) == 3
+        assert not PageCounterIncrement.objects.exists()
+        page_counter = PageCounter.objects.get(resource=resource, file=file_node, version=None, action='download')
+        assert page_counter.total == 2
+        assert page_counter.unique == 1
+        date_string = timezone.now().strftime('%Y/%m/%d')
+        assert page_counter.date[date_string] == {'total': 3, 'unique': 2}
+        assert analytics.get_basic_counters(resource, file_node, version=None, action='download') == (1, 2)
+
+    @mock.patch('osf.models.analytics.session')
+    def test_flush_adds_to_existing_counter(self, mock_session, project, file_node):
+        mock_session.data = {}
+        resource = project.guids.first()
+        PageCounter.update_counter(resource, file_node, version=None, action='download', node_info={})
+        with override_switch(features.BUFFERED_PAGE_COUNTERS, active=True):
+            mock_session.data = {}
+            PageCounter.update_counter(resource, file_node, version=None, action='download', node_info={})
+
+        assert analytics.flush_page_counters() == 1
+        page_counter = PageCounter.objects.get(resource=resource, file=file_node, version=None, action='download')
+        assert page_counter.total == 2
+        assert page_counter.unique == 2
+
     def test_get_all_downloads_on_date(self, page_counter, page_counter2):
         """
         This method tests that multiple pagecounter objects have their download totals summed properly.
@@ -15,7 +15,7 @@ from framework.auth.core import Auth
 from website import settings
 import website.search.search as search
 from website.search import elastic_search
-from website.search.util import build_query
+from website.search.util import build_query, build_query_string
 from website.search_migration.migrate import migrate
 from osf.models import (
     Retraction,
@@ -1295,6 +1295,68 @@ class TestSearchExceptions(OsfTestCase):
         self.project.save()
 
 
+class TestSearchMultiSearch(unittest.TestCase):
+
+    def msearch_response(self, aggregations, hits=None):
+        return {
+            'hits': {'total': len(hits or []), 'hits': hits or []},
+            'aggregations': aggregations,
+        }
+
+    @mock.patch('website.search.elastic_search.client')
+    def test_search_is_one_round_trip(self, mock_client):
+        hit = {'_source': {'category': 'project'}, '_type': 'project'}
+        mock_client.return_value.msearch.return_value = {'responses': [
+            self.msearch_response({'tag_cloud': {'buckets': [{'key': 'tag', 'doc_count': 1}]}}),
+            self.msearch_response({'licenses': {'buckets': [{'key': 'mit', 'doc_count': 1}]}}),
+            self.msearch_response({'counts': {'buckets': [{'key': 'project', 'doc_count': 1}]}}),
+            self.msearch_response({}, hits=[hit]),
+        ]}
+        query = {
+            'query': {'filtered': {
+                'query': build_query_string('tom'),
+                'filter': {'term': {'category': 'project'}},
+            }},
+            'from': 0,
+            'size': 10,
+        }
+        original = repr(query)
+
+        results = elastic_search.search(query, index=elastic_search.INDEX, raw=True)
+
+        assert_equal(mock_client.return_value.msearch.call_count, 1)
+        assert_false(mock_client.return_value.search.called)
+        assert_equal(repr(query), original)
+        assert_equal(results['results'], [hit])
+        assert_equal(results['tags'], [{'key': 'tag', 'doc_count': 1}])
+        assert_equal(results['aggs']['licenses'], {'mit': 1})
+        assert_equal(results['counts'], {'project': 1, 'total': 1})
+
+        body = mock_client.return_value.msearch.call_args[1]['body']
+        tag_query, aggs_query, count_query, main_query = body[1::2]
+        assert_not_in('filter', aggs_query['query']['filtered'])
+        assert_not_in('filter', count_query['query']['filtered'])
+        assert_in('filter', tag_query['query']['filtered'])
+        assert_not_in('from', tag_query)
+        assert_is(main_query, query)
+
+    @mock.patch('website.search.elastic_search.client')
+    def test_search_error_in_response(self, mock_client):
+        mock_client.return_value.msearch.return_value = {'responses': [
+            {'error': {'type': 'search_phase_execution_exception'}, 'status': 400},
+        ] * 4}
+        with assert_raises(elastic_search.exceptions.MalformedQueryError):
+            elastic_search.search(build_query('tom'), index=elastic_search.INDEX)
+
+    @mock.patch('website.search.elastic_search.client')
+    def test_search_missing_index(self, mock_client):
+        mock_client.return_value.msearch.return_value = {'responses': [
+            {'error': {'type': 'index_not_found_exception'}, 'status': 404},
+        ] * 4}
+        with assert_raises(elastic_search.exceptions.IndexNotFoundError):
+            elastic_search.search(build_query('tom'), index=elastic_search.INDEX)
+
+
 @pytest.mark.enable_search
 @pytest.mark.enable_enqueue_task
 class TestSearchMigration(OsfTestCase):
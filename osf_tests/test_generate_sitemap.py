@@ -1,3 +1,4 @@
+import json
 import os
 
 import pytest
@@ -5,6 +6,7 @@ import mock
 import shutil
 import tempfile
 import xml
+import xml.etree.ElementTree
 from future.moves.urllib.parse import urljoin
 
 from scripts import generate_sitemap
@@ -13,22 +15,31 @@ from osf_tests.factories import (AuthUserFactory, ProjectFactory, RegistrationFa
 from website import settings
 
 
+def read_sitemap_urls():
+    """Return every url listed in the sitemap files referenced by the sitemap index."""
+    sitemap_dir = os.path.join(settings.STATIC_FOLDER, 'sitemaps')
+    # Note: namespace was defined in the XML file, therefore necessary to include in tag
+    namespace = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+    index = xml.etree.ElementTree.parse(os.path.join(sitemap_dir, 'sitemap_index.xml'))
+    urls = []
+    for element in index.iter(namespace + 'loc'):
+        # Parse each generated XML sitemap file
+        with open(os.path.join(sitemap_dir, os.path.basename(element.text))) as f:
+            tree = xml.etree.ElementTree.parse(f)
+        # Get all the urls in the sitemap
+        urls.extend(element.text for element in tree.iter(namespace + 'loc'))
+    return urls
+
+
 def get_all_sitemap_urls():
     # Create temporary directory for the sitemaps to be generated
 
     generate_sitemap.main()
-
-    # Parse the generated XML sitemap file
-    with open(os.path.join(settings.STATIC_FOLDER, 'sitemaps/sitemap_0.xml')) as f:
-        tree = xml.etree.ElementTree.parse(f)
+    urls = read_sitemap_urls()
 
     shutil.rmtree(settings.STATIC_FOLDER)
 
-    # Get all the urls in the sitemap
-    # Note: namespace was defined in the XML file, therefore necessary to include in tag
-    namespace = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
-    urls = [element.text for element in tree.iter(namespace + 'loc')]
-
     return urls
 
 
@@ -175,3 +186,37 @@ class TestGenerateSitemap:
             urls = get_all_sitemap_urls()
 
         assert urljoin(settings.DOMAIN, project_deleted.url) not in urls
+
+    def test_shards_split_at_url_max(self, all_included_links, create_tmp_directory):
+
+        with mock.patch('website.settings.STATIC_FOLDER', create_tmp_directory):
+            with mock.patch('website.settings.SITEMAP_URL_MAX', 2):
+                urls = get_all_sitemap_urls()
+
+        assert len(all_included_links) == len(urls)
+        assert set(all_included_links) == set(urls)
+
+    def test_incremental_rewrites_changed_shards(self, all_included_links, project_registration_public, create_tmp_directory):
+
+        with mock.patch('website.settings.STATIC_FOLDER', create_tmp_directory):
+            with mock.patch('website.settings.SITEMAP_URL_MAX', 1):
+                generate_sitemap.main()
+                with open(os.path.join(settings.STATIC_FOLDER, 'sitemaps', generate_sitemap.MANIFEST_FILE_NAME)) as f:
+                    manifest = json.load(f)
+                node_shards = [shard for shard in manifest['shards'] if shard['section'] == 'node']
+                # Every shard but the last of each section is skipped when nothing in it changed
+                with mock.patch.object(generate_sitemap.ShardWriter, 'write_range', autospec=True,
+                                       side_effect=generate_sitemap.ShardWriter.write_range) as mock_write_range:
+                    generate_sitemap.main(incremental=True)
+                rewritten = {call[0][1] for call in mock_write_range.call_args_list}
+                assert rewritten == set(generate_sitemap.SECTIONS)
+                assert len(mock_write_range.call_args_list) == len(generate_sitemap.SECTIONS)
+
+                project_registration_public.is_public = False
+                project_registration_public.save()
+                generate_sitemap.main(incremental=True)
+                urls = read_sitemap_urls()
+
+        assert len(node_shards) > 1
+        assert urljoin(settings.DOMAIN, project_registration_public.url) not in urls
+        assert set(all_included_links) - set(urls) == {urljoin(settings.DOMAIN, project_registration_public.url)}
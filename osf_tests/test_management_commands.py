@@ -365,8 +365,9 @@ class TestInstitutionMetricsUpdate:
 
         return user
 
-    def test_update_institution_counts(self, app, institution, user1, user2, user3, user4):
-        update_institution_project_counts()
+    @pytest.mark.parametrize('parallel', [False, True])
+    def test_update_institution_counts(self, app, institution, user1, user2, user3, user4, parallel):
+        update_institution_project_counts(parallel=parallel)
 
         time.sleep(2)
 
@@ -5,7 +5,10 @@ import pytest
 import pytz
 import responses
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from waffle.testutils import override_switch
 from framework.celery_tasks import handlers
 from framework.exceptions import PermissionsError
 from framework.sessions import set_session
@@ -13,6 +16,7 @@ from api.caching import settings as cache_settings
 from api.caching.utils import storage_usage_cache
 from website.project.model import has_anonymous_link
 from website.project.signals import contributor_added, contributor_removed, after_create_registration
+from osf import features
 from osf.exceptions import NodeStateError
 from osf.utils import permissions
 from website.util import api_url_for, web_url_for
@@ -43,6 +47,8 @@ from osf.models import (
 
 from addons.wiki.models import WikiPage, WikiVersion
 from osf.models.node import AbstractNodeQuerySet
+from osf.models.spam import SpamStatus, enqueue_spam_check
+from osf.utils.akismet import FakeAkismetClient
 from osf.exceptions import ValidationError, ValidationValueError, UserStateError
 from osf.utils.workflows import DefaultStates
 from framework.auth.core import Auth
@@ -2401,6 +2407,79 @@ class TestNodeSpam:
         assert project.is_spammy
         assert project.is_public is False
 
+    @mock.patch.object(settings, 'SPAM_CHECK_ENABLED', True)
+    @mock.patch.object(settings, 'AKISMET_FAKE_CLIENT', True)
+    def test_async_check_spam_flags_node_from_task(self, project, user):
+        project.title = 'Cheap {}'.format(FakeAkismetClient.SPAM_MARKER)
+        project.save()
+        with override_switch(features.ASYNC_SPAM_CHECKS, active=True):
+            # Outside of a request, the queued check runs right away
+            assert project.check_spam(user, {'title': None}, {'Remote-Addr': '127.0.0.1'}) is False
+        project.reload()
+        assert project.spam_status == SpamStatus.FLAGGED
+        assert project.spam_data['content_hash']
+
+    @mock.patch.object(settings, 'SPAM_CHECK_ENABLED', True)
+    @mock.patch.object(settings, 'AKISMET_FAKE_CLIENT', True)
+    def test_unchanged_content_is_not_resubmitted(self, project, user):
+        with mock.patch.object(FakeAkismetClient, 'check_comment', autospec=True, return_value=(False, None)) as mock_check:
+            project.run_spam_check(user, ['title'], {'Remote-Addr': '127.0.0.1'})
+            project.reload()
+            project.run_spam_check(user, ['title'], {'Remote-Addr': '127.0.0.1'})
+            assert mock_check.call_count == 1
+
+            project.title = 'A new title'
+            project.save()
+            project.run_spam_check(user, ['title'], {'Remote-Addr': '127.0.0.1'})
+            assert mock_check.call_count == 2
+
+    @mock.patch.object(settings, 'SPAM_CHECK_ENABLED', True)
+    @mock.patch.object(settings, 'AKISMET_FAKE_CLIENT', True)
+    @mock.patch.object(settings, 'SPAM_FLAGGED_MAKE_NODE_PRIVATE', True)
+    def test_queued_check_keeps_edits_made_while_it_ran(self, project, user):
+        def edit_during_check(*args, **kwargs):
+            Node.objects.filter(id=project.id).update(description='Edited during the check')
+            return True, 'discard'
+
+        loaded = Node.objects.get(id=project.id)
+        with mock.patch.object(FakeAkismetClient, 'check_comment', side_effect=edit_during_check):
+            assert loaded.run_spam_check(user, ['title'], {'Remote-Addr': '127.0.0.1'}) is True
+
+        project.reload()
+        assert project.description == 'Edited during the check'
+        assert project.spam_status == SpamStatus.FLAGGED
+        assert project.spam_pro_tip == 'discard'
+        assert project.is_public is False
+
+    @mock.patch.object(settings, 'SPAM_CHECK_ENABLED', True)
+    @mock.patch.object(settings, 'AKISMET_FAKE_CLIENT', True)
+    def test_queued_check_without_changes_does_not_save(self, project, user):
+        project.run_spam_check(user, ['title'], {'Remote-Addr': '127.0.0.1'})
+        project.reload()
+        modified = project.modified
+        # The content was already checked clean, so nothing changes
+        with CaptureQueriesContext(connection) as ctx:
+            project.run_spam_check(user, ['title'], {'Remote-Addr': '127.0.0.1'})
+        assert not [query for query in ctx.captured_queries if query['sql'].startswith('UPDATE')]
+        project.reload()
+        assert project.modified == modified
+
+    def test_queued_spam_checks_are_batched_per_user(self, project, user):
+        other_project = ProjectFactory(is_public=True)
+        queued = []
+        with mock.patch('osf.models.spam.enqueue_task', side_effect=queued.append):
+            with mock.patch('osf.models.spam.get_task_from_queue', side_effect=lambda name, predicate: next((task for task in queued if predicate(task)), False)):
+                enqueue_spam_check(project, user, ['title'], {})
+                enqueue_spam_check(project, user, ['description'], {})
+                enqueue_spam_check(other_project, user, ['title'], {})
+                enqueue_spam_check(project, UserFactory(), ['title'], {})
+        assert len(queued) == 2
+        assert queued[0].kwargs['user_id'] == user._id
+        assert queued[0].kwargs['resources'] == [
+            {'model': 'osf.Node', 'pk': project.pk, 'saved_fields': ['description', 'title']},
+            {'model': 'osf.Node', 'pk': other_project.pk, 'saved_fields': ['title']},
+        ]
+
 
 # copied from tests/test_models.py
 class TestPrivateLinks:
@@ -0,0 +1,91 @@
+import mock
+import pytest
+
+from osf.utils import permissions
+from osf.utils.permission_resolver import (
+    NodePermissionResolver,
+    get_node_permission_resolver,
+    prime_node_permissions,
+)
+
+from .factories import AuthUserFactory, NodeFactory, ProjectFactory
+
+
+class FakeRequest(object):
+    pass
+
+
+@pytest.fixture()
+def request_context():
+    with mock.patch('osf.utils.permission_resolver.get_current_request', return_value=FakeRequest()):
+        yield
+
+
+@pytest.mark.django_db
+class TestNodePermissionResolver:
+
+    @pytest.fixture()
+    def user(self):
+        return AuthUserFactory()
+
+    @pytest.fixture()
+    def project(self, user):
+        return ProjectFactory(creator=user)
+
+    @pytest.fixture()
+    def component(self, project):
+        # user is an implicit admin on the component through the parent
+        return NodeFactory(parent=project)
+
+    @pytest.fixture()
+    def write_node(self, user):
+        node = ProjectFactory()
+        node.add_contributor(user, permissions=permissions.WRITE, save=True)
+        return node
+
+    @pytest.fixture()
+    def other_node(self):
+        return ProjectFactory()
+
+    def test_matches_guardian(self, user, project, component, write_node, other_node):
+        nodes = [project, component, write_node, other_node]
+        resolver = NodePermissionResolver(user)
+        resolver.load(nodes)
+        for node in nodes:
+            assert resolver.handles(node)
+            for perm in (permissions.READ, permissions.WRITE, permissions.ADMIN):
+                assert resolver.has_permission(node, perm) == node.has_permission(user, perm)
+            assert resolver.is_admin_parent(node) == node.is_admin_parent(user)
+
+    def test_implicit_admin_read(self, user, component):
+        resolver = NodePermissionResolver(user)
+        resolver.load([component])
+        assert resolver.has_permission(component, permissions.READ)
+        assert not resolver.has_permission(component, permissions.READ, check_parent=False)
+        assert not resolver.has_permission(component, permissions.WRITE)
+
+    def test_load_is_constant_queries(self, user, project, write_node, other_node, django_assert_num_queries):
+        components = [NodeFactory(parent=project) for _ in range(5)]
+        resolver = NodePermissionResolver(user)
+        # group ids, ancestors, group object permissions
+        with django_assert_num_queries(3):
+            resolver.load(components + [write_node, other_node])
+        with django_assert_num_queries(0):
+            resolver.load(components)
+
+    def test_model_checks_use_primed_resolver(self, request_context, user, project, component, other_node, django_assert_num_queries):
+        prime_node_permissions(user, [project, component, other_node])
+        with django_assert_num_queries(0):
+            assert component.has_permission(user, permissions.READ)
+            assert component.is_admin_parent(user)
+            assert project.get_permissions(user) == [permissions.READ, permissions.WRITE, permissions.ADMIN]
+            assert not other_node.has_permission(user, permissions.READ)
+
+    def test_no_resolver_outside_request(self, user, project):
+        prime_node_permissions(user, [project])
+        assert get_node_permission_resolver(user, project) is None
+
+    def test_unloaded_node_not_handled(self, request_context, user, project, other_node):
+        prime_node_permissions(user, [project])
+        assert get_node_permission_resolver(user, project)
+        assert get_node_permission_resolver(user, other_node) is None
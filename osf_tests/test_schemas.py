@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from osf.models import RegistrationSchema
 from osf.exceptions import ValidationValueError
@@ -166,3 +168,27 @@ class TestRegistrationSchemaValidation:
         with pytest.raises(ValidationValueError) as excinfo:
             prereg_schema.validate_registration_responses(prereg_test_data, required_fields=True)
         assert excinfo.value.message == "For your registration, your response to the 'Existing Data' field is invalid, your response must be one of the provided options."
+
+    def test_validators_cached_until_schema_changes(self, osf_standard_schema, osf_standard_data):
+        validator = osf_standard_schema.get_registration_responses_validator()
+        assert osf_standard_schema.get_registration_responses_validator() is validator
+        assert osf_standard_schema.get_registration_responses_validator(required_fields=True) is not validator
+        assert RegistrationSchema.objects.get(id=osf_standard_schema.id).get_registration_responses_validator() is validator
+
+        # A reloaded schema validates without querying its blocks again
+        schema = RegistrationSchema.objects.get(id=osf_standard_schema.id)
+        with CaptureQueriesContext(connection) as ctx:
+            assert schema.validate_registration_responses(osf_standard_data) is True
+        assert len(ctx.captured_queries) == 0
+
+        block = osf_standard_schema.schema_blocks.get(registration_response_key='datacompletion')
+        block.required = True
+        block.save()
+        assert osf_standard_schema.get_registration_responses_validator() is not validator
+        # Other processes key their validators on the schema's modified date
+        assert RegistrationSchema.objects.get(id=osf_standard_schema.id).modified > osf_standard_schema.modified
+
+        metadata_validator = osf_standard_schema.get_metadata_validator()
+        assert osf_standard_schema.get_metadata_validator() is metadata_validator
+        osf_standard_schema.save()
+        assert osf_standard_schema.get_metadata_validator() is not metadata_validator
@@ -1,9 +1,11 @@
+import mock
 import pytest
 
 from framework.sessions import utils
 from tests.base import DbTestCase
 from osf_tests.factories import SessionFactory, UserFactory
 from osf.models import OSFUser, Session
+from website import settings
 
 @pytest.mark.django_db
 class TestSession:
@@ -74,3 +76,56 @@ class SessionUtilsTestCase(DbTestCase):
         assert Session.objects.all().count() == 1
         utils.remove_session(session)
         assert Session.objects.all().count() == 0
+
+
+@pytest.mark.django_db
+class TestSessionCache:
+
+    @pytest.fixture(autouse=True)
+    def session_cache(self):
+        with mock.patch.object(settings, 'SESSION_CACHE_TIMEOUT', 60):
+            utils.session_cache.clear()
+            yield utils.session_cache
+            utils.session_cache.clear()
+
+    def test_load_reads_through(self, session_cache):
+        session = SessionFactory()
+        assert session_cache.load(session._id) == session
+
+        with mock.patch.object(Session, 'load') as mock_load:
+            assert session_cache.load(session._id) == session
+        assert not mock_load.called
+
+    def test_load_missing_session(self, session_cache):
+        assert session_cache.load('notasession') is None
+
+    def test_save_drops_cached_session(self, session_cache):
+        session = SessionFactory()
+        session_cache.load(session._id)
+        session.data['auth_user_fullname'] = 'Freddie Mercury'
+        session.save()
+        assert session_cache.load(session._id).data['auth_user_fullname'] == 'Freddie Mercury'
+
+    def test_remove_session_invalidates(self, session_cache):
+        session = SessionFactory()
+        session_cache.load(session._id)
+        utils.remove_session(session)
+        assert session_cache.load(session._id) is None
+
+    def test_remove_sessions_for_user_invalidates(self, session_cache):
+        user = UserFactory()
+        session = SessionFactory(user=user)
+        session_cache.load(session._id)
+        utils.remove_sessions_for_user(user)
+        assert session_cache.load(session._id) is None
+
+    def test_remove_session_invalidates_again_on_commit(self, session_cache):
+        session = SessionFactory()
+        callbacks = []
+        with mock.patch('framework.sessions.utils.transaction.on_commit', side_effect=callbacks.append):
+            utils.remove_session(session)
+        # Cached by a request that loaded the session before the delete was committed
+        session_cache.set(session)
+        for callback in callbacks:
+            callback()
+        assert session_cache.load(session._id) is None
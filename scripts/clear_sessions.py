@@ -1,4 +1,10 @@
-import sys
+"""Delete sessions that haven't been modified in SESSION_AGE_THRESHOLD days.
+
+Sessions are deleted in chunks of ids, each in its own short transaction, so the job never holds
+locks for long and can be stopped and rerun at any time; a rerun carries on with the sessions
+that are left. That makes it safe to run often, rather than as one large nightly delete.
+"""
+import argparse
 import time
 import logging
 import datetime
@@ -9,6 +15,7 @@ from django.utils import timezone
 from framework.celery_tasks import app as celery_app
 from website.app import setup_django
 setup_django()
+from framework.sessions.utils import session_cache
 from osf.models import Session
 
 from scripts.utils import add_file_logger
@@ -18,32 +25,74 @@ logging.basicConfig(level=logging.INFO)
 
 
 SESSION_AGE_THRESHOLD = 30
+CHUNK_SIZE = 1000
+# Seconds to pause between chunks, to leave room for other writes and replication
+CHUNK_SLEEP = 0.5
 
 
-def main(dry_run=True):
-    old_sessions = Session.objects.filter(modified__lt=timezone.now() - datetime.timedelta(days=SESSION_AGE_THRESHOLD))
-
-    if dry_run:
-        logger.warn('Dry run mode, will delete sessions and then abort the transaction')
-    logger.info('Preparing to delete Session objects older than {} days'.format(SESSION_AGE_THRESHOLD))
+def main(dry_run=True, chunk_size=CHUNK_SIZE, sleep=CHUNK_SLEEP, max_seconds=None, age_days=SESSION_AGE_THRESHOLD):
+    """Delete old sessions ``chunk_size`` at a time, in order of id.
 
-    with transaction.atomic():
-        start = time.time()
-        sessions_deleted = old_sessions.delete()[1]['osf.Session']
-        end = time.time()
+    :param float sleep: seconds to pause between chunks
+    :param float max_seconds: stop after the chunk that takes the job past this many seconds
+    :return int: number of sessions deleted, or that would have been with ``dry_run``
+    """
+    cutoff = timezone.now() - datetime.timedelta(days=age_days)
+    old_sessions = Session.objects.filter(modified__lt=cutoff).order_by('id')
 
-        logger.info('Deleting {} Session objects took {} seconds'.format(sessions_deleted, end - start))
+    if dry_run:
+        logger.warn('Dry run mode, will only count sessions to delete')
+    logger.info('Deleting Session objects older than {} days, {} at a time'.format(age_days, chunk_size))
+
+    start = time.time()
+    last_id = 0
+    deleted = 0
+    while True:
+        chunk = list(old_sessions.filter(id__gt=last_id).values_list('id', '_id')[:chunk_size])
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
 
         if dry_run:
-            raise Exception('Dry run, aborting the transaction!')
+            deleted += len(chunk)
+        else:
+            with transaction.atomic():
+                # Recheck the age, in case a session was used since the chunk was selected
+                deleted += Session.objects.filter(
+                    id__in=[pk for pk, session_id in chunk],
+                    modified__lt=cutoff,
+                ).delete()[0]
+            session_cache.invalidate(*[session_id for pk, session_id in chunk])
+
+        elapsed = time.time() - start
+        logger.info('{} {} Session objects up to id {} in {:.1f} seconds ({:.0f} per second)'.format(
+            'Found' if dry_run else 'Deleted', deleted, last_id, elapsed, deleted / elapsed if elapsed else 0
+        ))
+        if len(chunk) < chunk_size:
+            break
+        if max_seconds is not None and elapsed >= max_seconds:
+            logger.info('Stopping after {:.1f} seconds; the next run will continue from here'.format(elapsed))
+            break
+        time.sleep(sleep)
+
+    logger.info('{} {} Session objects in {:.1f} seconds'.format(
+        'Would delete' if dry_run else 'Deleted', deleted, time.time() - start
+    ))
+    return deleted
 
 
 @celery_app.task(name='scripts.clear_sessions')
-def run_main(dry_run=True):
+def run_main(dry_run=True, chunk_size=CHUNK_SIZE, sleep=CHUNK_SLEEP, max_seconds=None):
     if not dry_run:
         add_file_logger(logger, __file__)
-    main(dry_run=dry_run)
+    main(dry_run=dry_run, chunk_size=chunk_size, sleep=sleep, max_seconds=max_seconds)
 
 
 if __name__ == '__main__':
-    run_main(dry_run='--dry' in sys.argv)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dry', action='store_true', dest='dry_run', help='Only count the sessions to delete')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Sessions to delete per transaction')
+    parser.add_argument('--sleep', type=float, default=CHUNK_SLEEP, help='Seconds to pause between chunks')
+    parser.add_argument('--max-seconds', type=float, default=None, help='Stop after running for this long')
+    args = parser.parse_args()
+    run_main(dry_run=args.dry_run, chunk_size=args.chunk_size, sleep=args.sleep, max_seconds=args.max_seconds)
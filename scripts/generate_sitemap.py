@@ -1,24 +1,40 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-"""Generate a sitemap for osf.io"""
+"""Generate a sitemap for osf.io
+
+Rows are streamed from server-side cursors as plain values and written straight to XML, so
+memory use doesn't grow with the number of objects. Each section (static, user, node, preprint)
+is split into shards that cover a range of primary keys. Ranges are recorded in
+``sitemap_manifest.json``, which lets a run:
+
+* write the ranges in parallel worker processes (``--workers``), and
+* regenerate only the shards whose objects were modified since the last run (``--incremental``).
+"""
+import argparse
 import boto3
 import datetime
 import gzip
+import json
+import multiprocessing
 import os
 import shutil
-from future.moves.urllib.parse import urlparse, urljoin
-import xml
+from collections import OrderedDict
+from future.moves.urllib.parse import urljoin
+from xml.sax.saxutils import escape
 
 import django
 django.setup()
 import logging
 import tempfile
 
+from botocore.exceptions import ClientError
+from dateutil.parser import parse as parse_date
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils import timezone
 from framework import sentry
 from framework.celery_tasks import app as celery_app
-from django.db.models import Q
 from osf.models import OSFUser, AbstractNode, Preprint, PreprintProvider
-from osf.utils.workflows import DefaultStates
 from scripts import utils as script_utils
 from website import settings
 from website.app import init_app
@@ -26,12 +42,226 @@ from website.app import init_app
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+MANIFEST_FILE_NAME = 'sitemap_manifest.json'
+
+
+def filter_id_range(queryset, start, end):
+    """Limit ``queryset`` to ``start <= id < end``; either bound may be None for an open range."""
+    if start is not None:
+        queryset = queryset.filter(id__gte=start)
+    if end is not None:
+        queryset = queryset.filter(id__lt=end)
+    return queryset
+
+
+class Section(object):
+    """A kind of object listed in the sitemap. ``get_rows`` yields value dicts ordered by id and
+    ``get_urls`` turns one row into the url configs it contributes.
+    """
+    name = None
+    model = None
+    fields = ()
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_urls(self, row):
+        raise NotImplementedError
+
+    def get_rows(self, start, end):
+        queryset = filter_id_range(self.get_queryset(), start, end)
+        # iterator() reads through a server-side cursor, so rows are fetched in chunks
+        return queryset.order_by('id').values('id', 'guids___id', *self.fields).iterator()
+
+    def get_id_bounds(self):
+        return self.get_queryset().aggregate(start=Min('id'), end=Max('id'))
+
+    def changed_since(self, since, start, end):
+        # Checks every row, not only listed ones, so objects that were made private or deleted
+        # since the last run also mark their shard as changed
+        return filter_id_range(self.model.objects.filter(modified__gte=since), start, end).exists()
+
+
+class StaticSection(Section):
+    name = 'static'
+
+    def get_rows(self, start, end):
+        return iter(settings.SITEMAP_STATIC_URLS)
+
+    def get_urls(self, row):
+        return [OrderedDict(row, loc=urljoin(settings.DOMAIN, row['loc']))]
+
+    def get_id_bounds(self):
+        return {'start': None, 'end': None}
+
+    def changed_since(self, since, start, end):
+        return True
+
+
+class UserSection(Section):
+    name = 'user'
+    model = OSFUser
+
+    def get_queryset(self):
+        return OSFUser.objects.filter(is_active=True).exclude(date_confirmed__isnull=True)
+
+    def get_urls(self, row):
+        return [OrderedDict(settings.SITEMAP_USER_CONFIG, loc=urljoin(settings.DOMAIN, '/{}/'.format(row['guids___id'])))]
+
+
+class NodeSection(Section):
+    """Nodes and Registrations, no Collections"""
+    name = 'node'
+    model = AbstractNode
+    fields = ('modified', )
+
+    def get_queryset(self):
+        return (AbstractNode.objects
+            .filter(is_public=True, is_deleted=False, retraction_id__isnull=True)
+            .exclude(type__in=['osf.collection', 'osf.quickfilesnode']))
+
+    def get_urls(self, row):
+        return [OrderedDict(
+            settings.SITEMAP_NODE_CONFIG,
+            loc=urljoin(settings.DOMAIN, '/{}/'.format(row['guids___id'])),
+            lastmod=row['modified'].strftime('%Y-%m-%d'),
+        )]
+
+
+class PreprintSection(Section):
+    name = 'preprint'
+    model = Preprint
+    fields = ('modified', 'provider_id')
+
+    def __init__(self):
+        self.providers = {provider.id: provider for provider in PreprintProvider.objects.all()}
+
+    def get_queryset(self):
+        return Preprint.objects.can_view()
+
+    def get_urls(self, row):
+        guid = row['guids___id']
+        provider = self.providers[row['provider_id']]
+        preprint_date = row['modified'].strftime('%Y-%m-%d')
+        domain_redirect = provider.domain_redirect_enabled and provider.domain
+        if provider._id == 'osf':
+            preprint_url = '/preprints/{}/'.format(guid)
+        elif domain_redirect:
+            preprint_url = '/{}/'.format(guid)
+        else:
+            preprint_url = '/preprints/{}/{}/'.format(provider._id, guid)
+        return [
+            OrderedDict(
+                settings.SITEMAP_PREPRINT_CONFIG,
+                loc=urljoin(provider.domain if domain_redirect else settings.DOMAIN, preprint_url),
+                lastmod=preprint_date,
+            ),
+            # Preprint file url
+            OrderedDict(
+                settings.SITEMAP_PREPRINT_FILE_CONFIG,
+                loc=urljoin(provider.domain or settings.DOMAIN, os.path.join(guid, 'download', '?format=pdf')),
+                lastmod=preprint_date,
+            ),
+        ]
+
+    def changed_since(self, since, start, end):
+        # Preprint urls depend on their provider's domain settings
+        return (
+            PreprintProvider.objects.filter(modified__gte=since).exists() or
+            super(PreprintSection, self).changed_since(since, start, end)
+        )
+
+
+SECTIONS = OrderedDict((section.name, section) for section in (StaticSection, UserSection, NodeSection, PreprintSection))
+
+
+class ShardWriter(object):
+    """Writes the rows of id ranges into sitemap files of at most ``SITEMAP_URL_MAX`` urls,
+    starting a new shard at the id of the row that would overflow the current one.
+    """
+    def __init__(self, sitemap_dir):
+        self.sitemap_dir = sitemap_dir
+        self.errors = 0
+        self.shards = []
+        self.file = None
+
+    def write_range(self, section_name, start, end):
+        section = SECTIONS[section_name]()
+        self.new_doc(section_name, start)
+        for row in section.get_rows(start, end):
+            try:
+                urls = section.get_urls(row)
+            except Exception as e:
+                self.log_errors(section_name.upper(), row.get('guids___id'), e)
+                continue
+            if self.url_count + len(urls) > settings.SITEMAP_URL_MAX:
+                self.write_doc(end=row['id'])
+                self.new_doc(section_name, row['id'])
+            for config in urls:
+                self.add_url(config)
+        self.write_doc(end=end)
+
+    def new_doc(self, section, start):
+        """Opens a new sitemap shard and resets the url_count."""
+        file_name = 'sitemap_{}_{}.xml'.format(section, start or 0)
+        self.shard = OrderedDict((('section', section), ('start', start), ('end', None), ('file', file_name)))
+        self.file = open(os.path.join(self.sitemap_dir, file_name), 'w', encoding='utf-8')
+        self.file.write('<?xml version="1.0" encoding="utf-8"?>\n<urlset xmlns="{}">\n'.format(SITEMAP_NAMESPACE))
+        self.url_count = 0
+
+    def add_url(self, config):
+        """Adds a url to the current shard"""
+        tags = ''.join('    <{0}>{1}</{0}>\n'.format(name, escape(text)) for name, text in config.items())
+        self.file.write('  <url>\n{}  </url>\n'.format(tags))
+        self.url_count += 1
+
+    def write_doc(self, end):
+        """Closes and gzips the current shard. Empty shards keep their id range but no file."""
+        self.file.write('</urlset>\n')
+        self.file.close()
+        file_path = self.file.name
+        if self.url_count:
+            print('Writing and gzipping `{}`: url_count = {}'.format(file_path, str(self.url_count)))
+            with open(file_path, 'rb') as f_in, gzip.open(file_path + '.gz', 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        else:
+            os.remove(file_path)
+            self.shard['file'] = None
+        self.shard.update(end=end, url_count=self.url_count, lastmod=datetime.datetime.now().strftime('%Y-%m-%d'))
+        self.shards.append(self.shard)
+
+    def log_errors(self, obj, obj_id, error):
+        if not self.errors:
+            script_utils.add_file_logger(logger, __file__)
+        self.errors += 1
+        logger.info('Error on {}, {}:'.format(obj, obj_id))
+        logger.exception(error)
+
+        if self.errors <= 10:
+            sentry.log_message('Sitemap Error: {}'.format(error))
+
+        if self.errors == 1000:
+            sentry.log_message('ERROR: generate_sitemap stopped execution after reaching 1000 errors. See logs for details.')
+            raise Exception('Too many errors generating sitemap.')
+
+
+def write_ranges(sitemap_dir, ranges):
+    """Write each ``(section, start, end)`` in ``ranges``. Returns the shards and error count."""
+    writer = ShardWriter(sitemap_dir)
+    for section, start, end in ranges:
+        writer.write_range(section, start, end)
+    return writer.shards, writer.errors
+
+
+def write_range_in_worker(args):
+    return write_ranges(*args)
+
 
 class Sitemap(object):
     def __init__(self):
-        self.sitemap_count = 0
         self.errors = 0
-        self.new_doc()
+        self.shards = []
         if not settings.SITEMAP_TO_S3:
             self.sitemap_dir = os.path.join(settings.STATIC_FOLDER, 'sitemaps')
             if not os.path.exists(self.sitemap_dir):
@@ -53,53 +283,6 @@ class Sitemap(object):
         if settings.SITEMAP_TO_S3:
             shutil.rmtree(self.sitemap_dir)
 
-    def new_doc(self):
-        """Creates new sitemap document and resets the url_count."""
-        self.doc = xml.dom.minidom.Document()
-        self.urlset = self.doc.createElement('urlset')
-        self.urlset.setAttribute('xmlns', 'http://www.sitemaps.org/schemas/sitemap/0.9')
-        self.doc.appendChild(self.urlset)
-        self.url_count = 0
-
-    def add_tag(self, name, text):
-        """Adds a tag to the current url"""
-        tag = self.doc.createElement(name)
-        self.url.appendChild(tag)
-        tag_text = self.doc.createTextNode(text)
-        tag.appendChild(tag_text)
-
-    def add_url(self, config):
-        """Adds a url to the current urlset"""
-        if self.url_count >= settings.SITEMAP_URL_MAX:
-            self.write_doc()
-            self.new_doc()
-        self.url = self.doc.createElement('url')
-        self.urlset.appendChild(self.url)
-
-        for k, v in config.items():
-            self.add_tag(k, v)
-        self.url_count += 1
-
-    def write_doc(self):
-        """Writes and gzips each sitemap xml file"""
-        file_name = 'sitemap_{}.xml'.format(str(self.sitemap_count))
-        file_path = os.path.join(self.sitemap_dir, file_name)
-        zip_file_name = file_name + '.gz'
-        zip_file_path = file_path + '.gz'
-        print('Writing and gzipping `{}`: url_count = {}'.format(file_path, str(self.url_count)))
-
-        xml_str = self.doc.toprettyxml(indent='  ', encoding='utf-8')
-        with open(file_path, 'wb') as f:
-            f.write(xml_str)
-
-        # Write zipped file
-        with open(file_path, 'rb') as f_in, gzip.open(zip_file_path, 'wb') as f_out:
-            shutil.copyfileobj(f_in, f_out)
-        if settings.SITEMAP_TO_S3:
-            self.ship_to_s3(file_name, file_path)
-            self.ship_to_s3(zip_file_name, zip_file_path)
-        self.sitemap_count += 1
-
     def ship_to_s3(self, name, path):
         data = open(path, 'rb')
         try:
@@ -110,145 +293,119 @@ class Sitemap(object):
             sentry.log_message('ERROR: Sitemaps could not be uploaded to s3, see `generate_sitemap` logs')
         data.close()
 
-    def write_sitemap_index(self):
-        """Writes the index file for all of the sitemap files"""
-        doc = xml.dom.minidom.Document()
-        sitemap_index = self.doc.createElement('sitemapindex')
-        sitemap_index.setAttribute('xmlns', 'http://www.sitemaps.org/schemas/sitemap/0.9')
-        doc.appendChild(sitemap_index)
-
-        for f in range(self.sitemap_count):
-            sitemap = doc.createElement('sitemap')
-            sitemap_index.appendChild(sitemap)
-
-            loc = doc.createElement('loc')
-            sitemap.appendChild(loc)
-            loc_text = self.doc.createTextNode(urljoin(settings.DOMAIN, 'sitemaps/sitemap_{}.xml'.format(str(f))))
-            loc.appendChild(loc_text)
+    def ship_shard(self, shard):
+        if settings.SITEMAP_TO_S3 and shard['file']:
+            file_path = os.path.join(self.sitemap_dir, shard['file'])
+            self.ship_to_s3(shard['file'], file_path)
+            self.ship_to_s3(shard['file'] + '.gz', file_path + '.gz')
 
-            datemod = doc.createElement('lastmod')
-            sitemap.appendChild(datemod)
-            datemod_text = self.doc.createTextNode(datetime.datetime.now().strftime('%Y-%m-%d'))
-            datemod.appendChild(datemod_text)
+    def read_manifest(self):
+        """Returns the manifest of the last run, or None if there isn't one."""
+        try:
+            if settings.SITEMAP_TO_S3:
+                obj = self.s3.Object(settings.SITEMAP_AWS_BUCKET, 'sitemaps/{}'.format(MANIFEST_FILE_NAME))
+                return json.loads(obj.get()['Body'].read().decode('utf-8'))
+            with open(os.path.join(self.sitemap_dir, MANIFEST_FILE_NAME)) as f:
+                return json.load(f)
+        except (IOError, ClientError, ValueError):
+            return None
+
+    def write_manifest(self, generated):
+        file_path = os.path.join(self.sitemap_dir, MANIFEST_FILE_NAME)
+        with open(file_path, 'w') as f:
+            json.dump({'generated': generated.isoformat(), 'shards': self.shards}, f, indent=2)
+        if settings.SITEMAP_TO_S3:
+            self.ship_to_s3(MANIFEST_FILE_NAME, file_path)
 
+    def write_sitemap_index(self):
+        """Writes the index file for all of the sitemap files"""
         print('Writing `sitemap_index.xml`')
         file_name = 'sitemap_index.xml'
         file_path = os.path.join(self.sitemap_dir, file_name)
-        xml_str = doc.toprettyxml(indent='  ', encoding='utf-8')
-        with open(file_path, 'wb') as f:
-            f.write(xml_str)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="utf-8"?>\n<sitemapindex xmlns="{}">\n'.format(SITEMAP_NAMESPACE))
+            for shard in self.shards:
+                if not shard['file']:
+                    continue
+                f.write('  <sitemap>\n    <loc>{}</loc>\n    <lastmod>{}</lastmod>\n  </sitemap>\n'.format(
+                    escape(urljoin(settings.DOMAIN, 'sitemaps/{}'.format(shard['file']))),
+                    shard['lastmod'],
+                ))
+            f.write('</sitemapindex>\n')
         if settings.SITEMAP_TO_S3:
             self.ship_to_s3(file_name, file_path)
 
-    def log_errors(self, obj, obj_id, error):
-        if not self.errors:
-            script_utils.add_file_logger(logger, __file__)
-        self.errors += 1
-        logger.info('Error on {}, {}:'.format(obj, obj_id))
-        logger.exception(error)
-
-        if self.errors <= 10:
-            sentry.log_message('Sitemap Error: {}'.format(error))
-
-        if self.errors == 1000:
-            sentry.log_message('ERROR: generate_sitemap stopped execution after reaching 1000 errors. See logs for details.')
-            raise Exception('Too many errors generating sitemap.')
-
-    def generate(self):
-        print('Generating Sitemap')
-
-        # Progress bar
-        progress = script_utils.Progress(precision=0)
-
-        # Static urls
-        progress.start(len(settings.SITEMAP_STATIC_URLS), 'STAT: ')
-        for config in settings.SITEMAP_STATIC_URLS:
-            config['loc'] = urljoin(settings.DOMAIN, config['loc'])
-            self.add_url(config)
-            progress.increment()
-        progress.stop()
-
-        # User urls
-        objs = OSFUser.objects.filter(is_active=True).exclude(date_confirmed__isnull=True).values_list('guids___id', flat=True)
-        progress.start(objs.count(), 'USER: ')
-        for obj in objs:
-            try:
-                config = settings.SITEMAP_USER_CONFIG
-                config['loc'] = urljoin(settings.DOMAIN, '/{}/'.format(obj))
-                self.add_url(config)
-            except Exception as e:
-                self.log_errors('USER', obj, e)
-            progress.increment()
-        progress.stop()
-
-        # AbstractNode urls (Nodes and Registrations, no Collections)
-        objs = (AbstractNode.objects
-            .filter(is_public=True, is_deleted=False, retraction_id__isnull=True)
-            .exclude(type__in=['osf.collection', 'osf.quickfilesnode'])
-            .values('guids___id', 'modified'))
-        progress.start(objs.count(), 'NODE: ')
-        for obj in objs:
-            try:
-                config = settings.SITEMAP_NODE_CONFIG
-                config['loc'] = urljoin(settings.DOMAIN, '/{}/'.format(obj['guids___id']))
-                config['lastmod'] = obj['modified'].strftime('%Y-%m-%d')
-                self.add_url(config)
-            except Exception as e:
-                self.log_errors('NODE', obj['guids___id'], e)
-            progress.increment()
-        progress.stop()
-
-        # Preprint urls
-
-        objs = (Preprint.objects.can_view()
-                    .select_related('node', 'provider', 'primary_file'))
-        progress.start(objs.count() * 2, 'PREP: ')
-        osf = PreprintProvider.objects.get(_id='osf')
-        for obj in objs:
+    def get_full_ranges(self, workers):
+        """Split every section into ``workers`` id ranges of equal width."""
+        ranges = []
+        for name, section in SECTIONS.items():
+            bounds = section().get_id_bounds()
+            if workers == 1 or bounds['start'] is None:
+                ranges.append((name, None, None))
+                continue
+            width = (bounds['end'] - bounds['start']) // workers + 1
+            starts = [None] + [bounds['start'] + width * i for i in range(1, workers)]
+            ranges.extend(zip([name] * workers, starts, starts[1:] + [None]))
+        return ranges
+
+    def get_changed_ranges(self, manifest):
+        """Keep the shards of ``manifest`` with no changes since it was generated, and return the
+        id ranges of the rest. The last shard of each section is always rewritten, to pick up
+        new objects.
+        """
+        since = parse_date(manifest['generated'])
+        ranges = []
+        for shard in manifest['shards']:
+            section = SECTIONS[shard['section']]()
+            if shard['end'] is not None and not section.changed_since(since, shard['start'], shard['end']):
+                self.shards.append(shard)
+            else:
+                ranges.append((shard['section'], shard['start'], shard['end']))
+        return ranges
+
+    def write_ranges(self, ranges, workers):
+        if workers == 1:
+            results = [write_ranges(self.sitemap_dir, ranges)]
+        else:
+            # Forked workers must open their own database connections
+            connections.close_all()
+            pool = multiprocessing.Pool(workers)
             try:
-                preprint_date = obj.modified.strftime('%Y-%m-%d')
-                config = settings.SITEMAP_PREPRINT_CONFIG
-                preprint_url = obj.url
-                provider = obj.provider
-                domain = provider.domain if (provider.domain_redirect_enabled and provider.domain) else settings.DOMAIN
-                if provider == osf:
-                    preprint_url = '/preprints/{}/'.format(obj._id)
-                config['loc'] = urljoin(domain, preprint_url)
-                config['lastmod'] = preprint_date
-                self.add_url(config)
+                results = pool.map(write_range_in_worker, [(self.sitemap_dir, [r]) for r in ranges], chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+        for shards, errors in results:
+            self.errors += errors
+            for shard in shards:
+                self.ship_shard(shard)
+            self.shards.extend(shards)
+
+    def generate(self, incremental=False, workers=1):
+        print('Generating Sitemap')
+        started = timezone.now()
 
-                # Preprint file urls
-                try:
-                    file_config = settings.SITEMAP_PREPRINT_FILE_CONFIG
-                    file_config['loc'] = urljoin(
-                        obj.provider.domain or settings.DOMAIN,
-                        os.path.join(
-                            obj._id,
-                            'download',
-                            '?format=pdf'
-                        )
-                    )
-                    file_config['lastmod'] = preprint_date
-                    self.add_url(file_config)
-                except Exception as e:
-                    self.log_errors(obj.primary_file, obj.primary_file._id, e)
-            except Exception as e:
-                self.log_errors(obj, obj._id, e)
-            progress.increment(2)
-        progress.stop()
+        manifest = self.read_manifest() if incremental else None
+        if manifest:
+            ranges = self.get_changed_ranges(manifest)
+        else:
+            ranges = self.get_full_ranges(workers)
+        self.write_ranges(ranges, workers)
+        order = list(SECTIONS)
+        self.shards.sort(key=lambda shard: (order.index(shard['section']), shard['start'] or 0))
 
-        # Final write
-        self.write_doc()
         # Create index file
         self.write_sitemap_index()
+        self.write_manifest(started)
 
         # TODO: once the sitemap is validated add a ping to google with sitemap index file location
-        # TODO: server side cursor query wrapper might be useful as the index gets larger.
+        sitemap_count = len([shard for shard in self.shards if shard['file']])
         # Sitemap indexable limit check
-        if self.sitemap_count > settings.SITEMAP_INDEX_MAX * .90:  # 10% of urls remaining
+        if sitemap_count > settings.SITEMAP_INDEX_MAX * .90:  # 10% of urls remaining
             sentry.log_message('WARNING: Max sitemaps nearly reached.')
-        print('Total url_count = {}'.format((self.sitemap_count - 1) * settings.SITEMAP_URL_MAX + self.url_count))
-        print('Total sitemap_count = {}'.format(str(self.sitemap_count)))
+        print('Total url_count = {}'.format(sum(shard['url_count'] for shard in self.shards)))
+        print('Total sitemap_count = {}'.format(str(sitemap_count)))
+        print('Rewrote {} of {} id ranges'.format(len(ranges), len(self.shards)))
         if self.errors:
             sentry.log_message('WARNING: Generate sitemap encountered errors. See logs for details.')
             print('Total errors = {}'.format(str(self.errors)))
@@ -256,12 +413,19 @@ class Sitemap(object):
             print('No errors')
 
 @celery_app.task(name='scripts.generate_sitemap')
-def main():
+def main(incremental=False, workers=1):
+    """Generate the sitemap. ``workers`` > 1 forks a pool of processes, so it can't be used from
+    a daemonic celery worker; run this as a script instead.
+    """
     init_app(routes=False)  # Sets the storage backends on all models
     sitemap = Sitemap()
-    sitemap.generate()
+    sitemap.generate(incremental=incremental, workers=workers)
     sitemap.cleanup()
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a sitemap for osf.io')
+    parser.add_argument('--incremental', action='store_true', help='Only rewrite shards changed since the last run')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes writing shards')
+    args = parser.parse_args()
     init_app(set_backends=True, routes=False)
-    main()
+    main(incremental=args.incremental, workers=args.workers)
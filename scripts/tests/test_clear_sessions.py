@@ -0,0 +1,43 @@
+import datetime
+
+import mock
+import pytest
+from django.utils import timezone
+
+from osf.models import Session
+from osf_tests.factories import SessionFactory
+from scripts.clear_sessions import main
+
+
+@pytest.mark.django_db
+class TestClearSessions:
+
+    @pytest.fixture()
+    def old_sessions(self):
+        sessions = [SessionFactory() for _ in range(5)]
+        Session.objects.filter(id__in=[session.id for session in sessions]).update(
+            modified=timezone.now() - datetime.timedelta(days=31)
+        )
+        return sessions
+
+    @pytest.fixture()
+    def recent_session(self):
+        return SessionFactory()
+
+    @mock.patch('scripts.clear_sessions.time.sleep')
+    def test_deletes_old_sessions_in_chunks(self, mock_sleep, old_sessions, recent_session):
+        assert main(dry_run=False, chunk_size=2) == 5
+        assert list(Session.objects.all()) == [recent_session]
+        assert mock_sleep.call_count == 2
+
+    def test_dry_run_counts_without_deleting(self, old_sessions, recent_session):
+        assert main(dry_run=True) == 5
+        assert Session.objects.count() == 6
+
+    @mock.patch('scripts.clear_sessions.time.sleep')
+    def test_stops_after_max_seconds(self, mock_sleep, old_sessions, recent_session):
+        assert main(dry_run=False, chunk_size=2, max_seconds=0) == 2
+        assert Session.objects.count() == 4
+        # a later run picks up the rest
+        assert main(dry_run=False, chunk_size=2) == 3
+        assert Session.objects.count() == 1
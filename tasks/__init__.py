@@ -657,7 +657,7 @@ def clear_sessions(ctx, months=1, dry_run=False):
     from website.app import init_app
     init_app(routes=False, set_backends=True)
     from scripts import clear_sessions
-    clear_sessions.clear_sessions_relative(months=months, dry_run=dry_run)
+    clear_sessions.main(dry_run=dry_run, age_days=int(months) * 30)
 
 
 # Release tasks
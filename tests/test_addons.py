@@ -5,6 +5,7 @@ import datetime
 from rest_framework import status as http_status
 import time
 import functools
+import json
 
 import furl
 import itsdangerous
@@ -12,6 +13,7 @@ import jwe
 import jwt
 import mock
 import pytest
+from django.db import DatabaseError
 from django.utils import timezone
 from django.contrib.auth.models import Permission
 from framework.auth import cas, signing
@@ -29,6 +31,7 @@ from addons.github.exceptions import ApiError
 from addons.github.models import GithubFolder, GithubFile, GithubFileNode
 from addons.github.tests.factories import GitHubAccountFactory
 from addons.osfstorage.models import OsfStorageFileNode, OsfStorageFolder, OsfStorageFile
+from addons.osfstorage.tasks import record_file_access_task
 from addons.osfstorage.tests.factories import FileVersionFactory
 from osf.models import Session, RegistrationSchema, QuickFilesNode
 from osf.models import files as file_models
@@ -95,6 +98,13 @@ class TestAddonAuth(OsfTestCase):
         }, settings.WATERBUTLER_JWT_SECRET, algorithm=settings.WATERBUTLER_JWT_ALGORITHM), self.JWE_KEY)}
         return api_url_for('get_auth', **options)
 
+    def build_batch_payload(self, operations, **kwargs):
+        return {'payload': jwe.encrypt(jwt.encode({'data': dict(dict(
+            operations=operations,
+            metrics={'uri': settings.MFR_SERVER_URL}), **kwargs),
+            'exp': timezone.now() + datetime.timedelta(seconds=settings.WATERBUTLER_JWT_EXPIRATION),
+        }, settings.WATERBUTLER_JWT_SECRET, algorithm=settings.WATERBUTLER_JWT_ALGORITHM), self.JWE_KEY).decode()}
+
     def test_auth_download(self):
         url = self.build_url()
         res = self.app.get(url, auth=self.user.auth)
@@ -107,6 +117,30 @@ class TestAddonAuth(OsfTestCase):
         observed_url.port = expected_url.port
         assert_equal(expected_url, observed_url)
 
+    def test_auth_batch(self):
+        private_node = ProjectFactory(is_public=False)
+        operations = [
+            {'nid': self.node._id, 'provider': 'github', 'action': 'download'},
+            {'nid': self.node._id, 'provider': 'github', 'action': 'upload', 'path': '/folder/'},
+            {'nid': private_node._id, 'provider': 'osfstorage', 'action': 'download'},
+        ]
+        res = self.app.post_json(api_url_for('get_auth_batch'), self.build_batch_payload(operations), auth=self.user.auth)
+        assert_equal(res.status_code, 200)
+        payloads = res.json['payloads']
+        assert_equal(len(payloads), 3)
+        for payload in payloads[:2]:
+            data = jwt.decode(jwe.decrypt(payload['payload'].encode('utf-8'), self.JWE_KEY), settings.WATERBUTLER_JWT_SECRET, algorithm=settings.WATERBUTLER_JWT_ALGORITHM)['data']
+            assert_equal(data['auth'], views.make_auth(self.user))
+            assert_equal(data['credentials'], self.node_addon.serialize_waterbutler_credentials())
+            assert_equal(data['settings'], self.node_addon.serialize_waterbutler_settings())
+        assert_equal(payloads[2], {'status': 403})
+
+    def test_auth_batch_too_many_operations(self):
+        operations = [{'nid': self.node._id, 'provider': 'github', 'action': 'download'}] * 2
+        with mock.patch.object(settings, 'WATERBUTLER_AUTH_BATCH_SIZE', 1):
+            res = self.app.post_json(api_url_for('get_auth_batch'), self.build_batch_payload(operations), auth=self.user.auth, expect_errors=True)
+        assert_equal(res.status_code, 400)
+
     def test_auth_render_action_returns_200(self):
         url = self.build_url(action='render')
         res = self.app.get(url, auth=self.user.auth)
@@ -204,6 +238,35 @@ class TestAddonAuth(OsfTestCase):
         assert_equal(test_file.get_download_count(), 1)
         assert_equal(node.logs.count(), nlogs) # don't log views
 
+    @mock.patch('addons.base.views.enqueue_postcommit_task')
+    def test_action_download_non_contrib_defers_bookkeeping(self, mock_enqueue):
+        noncontrib = AuthUserFactory()
+        node = ProjectFactory(is_public=True)
+        test_file = create_test_file(node, self.user)
+        url = self.build_url(nid=node._id, action='download', provider='osfstorage', path=test_file.path, version=1)
+        res = self.app.get(url, auth=noncontrib.auth)
+        assert_equal(res.status_code, 200)
+
+        # nothing is written until the queued task runs
+        assert_equal(test_file.get_download_count(), 0)
+        assert not test_file.versions.first().seen_by.exists()
+
+        task, args, kwargs = mock_enqueue.call_args[0]
+        assert_equal(task, record_file_access_task)
+        task(*json.loads(json.dumps(args)), **json.loads(json.dumps(kwargs)))
+        assert_equal(test_file.get_download_count(), 1)
+        assert test_file.versions.first().seen_by.filter(guids___id=noncontrib._id).exists()
+
+    @mock.patch('addons.osfstorage.tasks.apply_visit', side_effect=[None, DatabaseError('deadlock detected'), None])
+    def test_record_file_access_retries_uncounted_visits(self, mock_apply):
+        test_file = create_test_file(self.node, self.user)
+        version = test_file.versions.first()
+        visits = [{'page': 'first'}, {'page': 'second'}]
+        # Eagerly applied, so the retry runs right away
+        record_file_access_task.apply((version.id, ), {'user_id': self.user._id, 'visits': visits})
+        assert_equal([call[0][0] for call in mock_apply.call_args_list], [visits[0], visits[1], visits[1]])
+        assert version.seen_by.filter(guids___id=self.user._id).exists()
+
     def test_action_download_mfr_views_contrib(self):
         test_file = create_test_file(self.node, self.user)
         url = self.build_url(action='render', provider='osfstorage', path=test_file.path, version=1)
@@ -219,6 +219,75 @@ class TestCASClient(OsfTestCase):
         assert 0
 
 
+class TestCASTokenCache(OsfTestCase):
+
+    def setUp(self):
+        OsfTestCase.setUp(self)
+        self.base_url = 'http://accounts.test.test'
+        self.client = cas.CasClient(self.base_url)
+        self.user = UserFactory()
+        self.profile_url = self.client.get_profile_url()
+        self.revocation_url = self.client.get_auth_token_revocation_url()
+        cas.token_cache.clear()
+        cas.token_cache.reset_stats()
+
+    def tearDown(self):
+        cas.token_cache.clear()
+        OsfTestCase.tearDown(self)
+
+    def add_profile_response(self):
+        responses.add(
+            responses.Response(
+                responses.GET,
+                self.profile_url,
+                json={'id': self.user._id, 'scope': ['osf.full_read']},
+                status=200,
+            )
+        )
+
+    @responses.activate
+    def test_profile_is_cached(self):
+        self.add_profile_response()
+        with mock.patch('framework.auth.cas.settings.CAS_TOKEN_CACHE_TIMEOUT', 60):
+            first = self.client.profile('token')
+            second = self.client.profile('token')
+        assert_equal(len(responses.calls), 1)
+        assert_equal(second.user, self.user._id)
+        assert_equal(second.attributes['accessToken'], 'token')
+        assert_equal(second.attributes['accessTokenScope'], first.attributes['accessTokenScope'])
+        assert_equal(cas.token_cache.hits, 1)
+        assert_equal(cas.token_cache.misses, 1)
+
+    def test_cache_key_does_not_contain_token(self):
+        assert_not_in('token', cas.token_cache.make_key('token')[len(cas.CasTokenCache.KEY_PREFIX):])
+
+    @responses.activate
+    def test_profile_not_cached_when_disabled(self):
+        self.add_profile_response()
+        with mock.patch('framework.auth.cas.settings.CAS_TOKEN_CACHE_TIMEOUT', 0):
+            self.client.profile('token')
+            self.client.profile('token')
+        assert_equal(len(responses.calls), 2)
+
+    @responses.activate
+    def test_revoke_tokens_invalidates_token(self):
+        self.add_profile_response()
+        responses.add(responses.Response(responses.POST, self.revocation_url, status=204))
+        with mock.patch('framework.auth.cas.settings.CAS_TOKEN_CACHE_TIMEOUT', 60):
+            self.client.profile('token')
+            self.client.revoke_tokens({'token': 'token'})
+            assert_is_none(cas.token_cache.get('token'))
+
+    @responses.activate
+    def test_revoke_application_tokens_clears_cache(self):
+        self.add_profile_response()
+        responses.add(responses.Response(responses.POST, self.revocation_url, status=204))
+        with mock.patch('framework.auth.cas.settings.CAS_TOKEN_CACHE_TIMEOUT', 60):
+            self.client.profile('token')
+            self.client.revoke_application_tokens('fake_id', 'fake_secret')
+            assert_is_none(cas.token_cache.get('token'))
+
+
 class TestCASTicketAuthentication(OsfTestCase):
 
     def setUp(self):
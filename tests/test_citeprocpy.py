@@ -5,7 +5,7 @@ import json
 from django.utils import timezone
 from nose.tools import *  # noqa: F403
 
-from api.citations.utils import render_citation
+from api.citations.utils import get_citation_style, render_citation, render_citations
 from osf_tests.factories import UserFactory, PreprintFactory
 from tests.base import OsfTestCase
 from osf.models import OSFUser
@@ -170,3 +170,36 @@ class TestCiteprocpyMLA(OsfTestCase):
                 self.preprint.provider.name,
                 self.formated_date)
         )
+
+
+class TestCitationStyleCache(OsfTestCase):
+
+    def setUp(self):
+        super(TestCitationStyleCache, self).setUp()
+        get_citation_style.cache_clear()
+        self.user = UserFactory(fullname='John Tordoff')
+        self.preprint = PreprintFactory(creator=self.user, title='My Preprint')
+        self.other_preprint = PreprintFactory(creator=self.user, title='My Other Preprint')
+
+    def tearDown(self):
+        get_citation_style.cache_clear()
+        super(TestCitationStyleCache, self).tearDown()
+
+    def test_style_parsed_once(self):
+        render_citation(self.preprint, 'apa')
+        render_citation(self.other_preprint, 'apa')
+        assert_equal(get_citation_style.cache_info().misses, 1)
+        assert_is(get_citation_style('apa'), get_citation_style('apa'))
+
+    def test_unknown_style_not_cached(self):
+        with assert_raises(ValueError):
+            render_citation(self.preprint, 'not-a-style')
+        assert_equal(get_citation_style.cache_info().currsize, 0)
+
+    def test_render_citations_matches_render_citation(self):
+        for style in ('apa', 'chicago-author-date', 'modern-language-association'):
+            citations = render_citations([self.preprint, self.other_preprint], style)
+            assert_equal(citations, {
+                self.preprint._id: render_citation(self.preprint, style),
+                self.other_preprint._id: render_citation(self.other_preprint, style),
+            })
@@ -2,11 +2,15 @@ import collections
 import mock
 from babel import dates, Locale
 from schema import Schema, And, Use, Or
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from waffle.testutils import override_switch
 
 from nose.tools import *  # noqa PEP8 asserts
 
 from framework.auth import Auth
+from osf import features
 from osf.models import Comment, NotificationDigest, NotificationSubscription, Guid, OSFUser
 
 from website.notifications.tasks import get_users_emails, send_users_email, group_by_node, remove_notifications
@@ -1283,6 +1287,56 @@ class TestCompileSubscriptions(NotificationTestCase):
         assert_equal(subs, {'email_transactional': [], 'email_digest': [self.user_1._id], 'none': []})
 
 
+    def test_event_subscription_overrides_event_type(self):
+        self.shared_sub.email_transactional.add(self.user_1)
+        self.shared_sub.save()
+        file_sub = factories.NotificationSubscriptionFactory(
+            _id=self.shared_node._id + '_xyz42_file_updated',
+            node=self.shared_node,
+            event_name='xyz42_file_updated'
+        )
+        file_sub.save()
+        file_sub.email_digest.add(self.user_1)
+        file_sub.save()
+        subs = emails.compile_subscriptions(self.shared_node, 'file_updated', 'xyz42_file_updated')
+        assert_equal(subs, {'email_transactional': [], 'email_digest': [self.user_1._id], 'none': []})
+
+    def test_disabled_user_not_listed(self):
+        self.base_sub.email_transactional.add(self.user_2)
+        self.base_sub.save()
+        self.user_2.date_disabled = timezone.now()
+        self.user_2.save()
+        result = emails.compile_subscriptions(self.shared_node, 'file_updated')
+        assert_equal({'email_transactional': [], 'none': [], 'email_digest': []}, result)
+
+    def test_query_count_independent_of_depth(self):
+        self.base_sub.email_transactional.add(self.user_1, self.user_2, self.user_3)
+        self.base_sub.save()
+        shallow = self.shared_node
+        deep = shallow
+        for _ in range(4):
+            deep = factories.NodeFactory(parent=deep, creator=self.user_1)
+        with override_switch(features.NODE_ANCESTOR_CLOSURE, active=True):
+            with CaptureQueriesContext(connection) as shallow_ctx:
+                emails.compile_subscriptions(shallow, 'file_updated')
+            with CaptureQueriesContext(connection) as deep_ctx:
+                subs = emails.compile_subscriptions(deep, 'file_updated')
+        assert_equal(len(shallow_ctx.captured_queries), len(deep_ctx.captured_queries))
+        assert_equal(sorted(subs['email_transactional']), sorted([self.user_1._id, self.user_2._id]))
+
+    def test_resolver_reused_across_events(self):
+        self.base_sub.email_transactional.add(self.user_1)
+        self.base_sub.save()
+        self.shared_sub.email_transactional.add(self.user_1)
+        self.shared_sub.save()
+        resolver = emails.SubscriptionResolver(self.shared_node)
+        emails.compile_subscriptions(self.shared_node, 'file_updated', resolver=resolver)
+        with mock.patch('osf.models.node.NodeGroupObjectPermission.objects') as mock_perms:
+            subs = emails.compile_subscriptions(self.shared_node, 'comments', 'file_updated', resolver=resolver)
+        assert_false(mock_perms.filter.called)
+        assert_equal(subs, {'email_transactional': [self.user_1._id], 'email_digest': [], 'none': []})
+
+
 class TestMoveSubscription(NotificationTestCase):
     def setUp(self):
         super(TestMoveSubscription, self).setUp()
@@ -1640,6 +1694,32 @@ class TestSendEmails(NotificationTestCase):
         assert_true(mock_notify.called)
         assert_equal(mock_notify.call_count, 1)
 
+    def test_store_emails_bulk(self):
+        sender = factories.UserFactory()
+        recipients = [factories.UserFactory(timezone='Etc/UTC', locale='en') for _ in range(3)]
+        disabled = factories.UserFactory()
+        disabled.date_disabled = timezone.now()
+        disabled.save()
+        recipient_ids = [recipient._id for recipient in recipients] + [disabled._id, sender._id]
+        with mock.patch('website.notifications.emails.mails.render_message', return_value='message') as mock_render:
+            emails.store_emails(recipient_ids, 'email_transactional', 'comments', sender, self.node, timezone.now())
+        # Recipients share a timezone and locale, and the template doesn't use the recipient
+        assert_equal(mock_render.call_count, 1)
+        digests = NotificationDigest.objects.filter(event='comments')
+        assert_equal(set(digests.values_list('user_id', flat=True)), {recipient.id for recipient in recipients})
+        assert_true(all(digest.node_lineage == [self.project._id, self.node._id] for digest in digests))
+
+    def test_store_emails_renders_per_recipient_when_template_uses_recipient(self):
+        sender = factories.UserFactory()
+        recipients = [factories.UserFactory(timezone='Etc/UTC', locale='en') for _ in range(2)]
+        with mock.patch('website.notifications.emails.mails.render_message', return_value='message') as mock_render:
+            emails.store_emails(
+                [recipient._id for recipient in recipients], 'email_transactional', 'reviews_submission_status',
+                sender, self.node, timezone.now(), template='reviews_submission_status'
+            )
+        assert_equal(mock_render.call_count, 2)
+        assert_equal({call[1]['recipient'] for call in mock_render.call_args_list}, set(recipients))
+
     def test_get_settings_url_for_node(self):
         url = emails.get_settings_url(self.project._id, self.user)
         assert_equal(url, self.project.absolute_url + 'settings/')
@@ -76,6 +76,19 @@ def render_message(tpl_name, **context):
     return tpl.render(**context)
 
 
+def template_uses(tpl_name, name):
+    """Whether rendering ``tpl_name`` can depend on the context variable ``name``.
+
+    Conservatively true for templates that inherit from or include other templates.
+    """
+    code = _tpl_lookup.get_template(tpl_name).code
+    return (
+        'context.get({!r}'.format(name) in code or
+        '_inherit_from(' in code or
+        '_include_file(' in code
+    )
+
+
 def send_mail(
         to_addr, mail, mimetype='html', from_addr=None, mailer=None, celery=True,
         username=None, password=None, callback=None, attachment_name=None,
@@ -1,6 +1,7 @@
 from babel import dates, core, Locale
 
 from osf.models import AbstractNode, OSFUser, NotificationDigest, NotificationSubscription
+from osf.models.validators import validate_subscription_type
 from osf.utils.permissions import ADMIN, READ
 from website import mails
 from website.notifications import constants
@@ -98,56 +99,154 @@ def store_emails(recipient_ids, notification_type, event, user, node, timestamp,
     # user whose action triggered email sending
     context['user'] = user
     node_lineage_ids = get_node_lineage(node) if node else []
-
-    for recipient_id in recipient_ids:
-        if recipient_id == user._id:
-            continue
-        recipient = OSFUser.load(recipient_id)
-        if recipient.is_disabled:
-            continue
+    validate_subscription_type(notification_type)
+
+    recipients = OSFUser.objects.filter(
+        guids___id__in=set(recipient_ids).difference([user._id]),
+        date_disabled__isnull=True,
+    )
+    # Unless the template uses the recipient, messages only differ by the localized timestamp
+    render_per_recipient = mails.template_uses(template, 'recipient')
+    messages = {}
+    digests = []
+    for recipient in recipients:
         context['localized_timestamp'] = localize_timestamp(timestamp, recipient)
         context['recipient'] = recipient
-        message = mails.render_message(template, **context)
-        digest = NotificationDigest(
+        message_key = recipient.id if render_per_recipient else context['localized_timestamp']
+        if message_key not in messages:
+            messages[message_key] = mails.render_message(template, **context)
+        digests.append(NotificationDigest(
             timestamp=timestamp,
             send_type=notification_type,
             event=event,
             user=recipient,
-            message=message,
+            message=messages[message_key],
             node_lineage=node_lineage_ids,
             provider=abstract_provider
-        )
-        digest.save()
+        ))
+    NotificationDigest.objects.bulk_create(digests)
 
 
-def compile_subscriptions(node, event_type, event=None, level=0):
-    """Recurse through node and parents for subscriptions.
+class SubscriptionResolver(object):
+    """Compiles the subscriptions that apply to a node from its whole lineage in bulk.
+
+    The lineage and subscribers' permissions are kept between calls, so a resolver can be
+    reused for several events on the same node.
+    """
+
+    def __init__(self, node):
+        self.node = node
+        self._lineage = None
+        # user pk -> pks of the lineage nodes the user can read
+        self._readable = {}
+
+    @property
+    def lineage(self):
+        """The node and its ancestors, root first"""
+        if self._lineage is None:
+            if isinstance(self.node, AbstractNode):
+                self._lineage = list(reversed(self.node.parents)) + [self.node]
+            else:
+                self._lineage = [self.node]
+        return self._lineage
+
+    def get_subscribers(self, keys):
+        """Return {subscription key: {notification type: {user pk: user guid}}}, skipping disabled users"""
+        subscribers = {key: {nt: {} for nt in constants.NOTIFICATION_TYPES} for key in keys}
+        for notification_type in constants.NOTIFICATION_TYPES:
+            through = getattr(NotificationSubscription, notification_type).through
+            rows = through.objects.filter(
+                notificationsubscription___id__in=keys,
+                osfuser__date_disabled__isnull=True,
+            ).values_list('notificationsubscription___id', 'osfuser_id', 'osfuser__guids___id')
+            for key, user_id, user_guid in rows:
+                subscribers[key][notification_type][user_id] = user_guid
+        return subscribers
+
+    def load_permissions(self, user_ids):
+        """Work out which lineage nodes each of ``user_ids`` has READ on, as ``node.has_permission`` would"""
+        from osf.models.node import NodeGroupObjectPermission
+
+        user_ids = set(user_ids).difference(self._readable)
+        if not user_ids:
+            return
+        for user_id in user_ids:
+            self._readable[user_id] = set()
+
+        if not isinstance(self.node, AbstractNode):
+            for user in OSFUser.objects.filter(id__in=user_ids):
+                if self.node.has_permission(user, READ):
+                    self._readable[user.id].add(self.node.id)
+            return
+
+        perms = {}
+        rows = NodeGroupObjectPermission.objects.filter(
+            content_object_id__in=[node.id for node in self.lineage],
+            group__user__id__in=user_ids,
+        ).values_list('group__user__id', 'content_object_id', 'permission__codename')
+        for user_id, node_id, codename in rows:
+            perms.setdefault((user_id, node_id), set()).add(codename)
+
+        read_perm, admin_perm = '{}_node'.format(READ), '{}_node'.format(ADMIN)
+        for user_id in user_ids:
+            # Admins on a node can implicitly read all of its descendants
+            is_admin_parent = False
+            for node in self.lineage:
+                node_perms = perms.get((user_id, node.id), set())
+                is_admin_parent = is_admin_parent or admin_perm in node_perms
+                if is_admin_parent or read_perm in node_perms:
+                    self._readable[user_id].add(node.id)
+
+    def compile(self, event_type, event=None):
+        """Return a dict of notification types with lists of user guids.
+
+        Subscriptions closer to the node override those of its ancestors, and a node's
+        subscription to ``event`` overrides its subscription to ``event_type``. Users only
+        count at levels they can read, and must be able to read the node itself.
+        """
+        levels = [(node, event_type) for node in self.lineage]
+        if event:
+            levels.append((self.node, event))
+        keys = [utils.to_subscription_key(node._id, level_event) for node, level_event in levels]
+        subscribers = self.get_subscribers(keys)
+        self.load_permissions(
+            user_id for key in keys for users in subscribers[key].values() for user_id in users
+        )
+
+        compiled = {nt: {} for nt in constants.NOTIFICATION_TYPES}
+        for (node, _), key in zip(levels, keys):
+            level = {
+                nt: {user_id: guid for user_id, guid in users.items() if node.id in self._readable[user_id]}
+                for nt, users in subscribers[key].items()
+            }
+            for notification_type in constants.NOTIFICATION_TYPES:
+                overridden = set()
+                for nt in constants.NOTIFICATION_TYPES:
+                    if nt != notification_type:
+                        overridden.update(level[nt])
+                users = dict(compiled[notification_type])
+                users.update(level[notification_type])
+                compiled[notification_type] = {
+                    user_id: guid for user_id, guid in users.items() if user_id not in overridden
+                }
+
+        return {
+            notification_type: [guid for user_id, guid in users.items() if self.node.id in self._readable[user_id]]
+            for notification_type, users in compiled.items()
+        }
+
+
+def compile_subscriptions(node, event_type, event=None, resolver=None):
+    """Compile the subscriptions of node and its parents.
 
     :param node: current node
     :param event_type: Generally node_subscriptions_available
     :param event: Particular event such a file_updated that has specific file subs
-    :param level: How deep the recursion is
+    :param resolver: SubscriptionResolver for ``node`` to reuse across events
     :return: a dict of notification types with lists of users.
     """
-    subscriptions = check_node(node, event_type)
-    if event:
-        subscriptions = check_node(node, event)  # Gets particular event subscriptions
-        parent_subscriptions = compile_subscriptions(node, event_type, level=level + 1)  # get node and parent subs
-    elif getattr(node, 'parent_id', False):
-        parent_subscriptions = \
-            compile_subscriptions(AbstractNode.load(node.parent_id), event_type, level=level + 1)
-    else:
-        parent_subscriptions = check_node(None, event_type)
-    for notification_type in parent_subscriptions:
-        p_sub_n = parent_subscriptions[notification_type]
-        p_sub_n.extend(subscriptions[notification_type])
-        for nt in subscriptions:
-            if notification_type != nt:
-                p_sub_n = list(set(p_sub_n).difference(set(subscriptions[nt])))
-        if level == 0:
-            p_sub_n, removed = utils.separate_users(node, p_sub_n)
-        parent_subscriptions[notification_type] = p_sub_n
-    return parent_subscriptions
+    resolver = resolver or SubscriptionResolver(node)
+    return resolver.compile(event_type, event)
 
 
 def check_node(node, event):
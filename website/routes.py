@@ -1649,6 +1649,13 @@ def make_url_map(app):
             json_renderer,
         ),
 
+        Rule(
+            '/files/auth/batch/',
+            'post',
+            addon_views.get_auth_batch,
+            json_renderer,
+        ),
+
         Rule(
             [
                 '/project/<pid>/waterbutler/logs/',
@@ -3,7 +3,6 @@
 
 from __future__ import division
 
-import copy
 import functools
 import logging
 import math
@@ -142,8 +141,7 @@ def requires_search(func):
     return wrapped
 
 
-@requires_search
-def get_aggregations(query, doc_type):
+def _add_aggregations_query(query):
     query['aggregations'] = {
         'licenses': {
             'terms': {
@@ -151,8 +149,10 @@ def get_aggregations(query, doc_type):
             }
         }
     }
+    return query
 
-    res = client().search(index=INDEX, doc_type=doc_type, search_type='count', body=query)
+
+def _parse_aggregations(res):
     ret = {
         doc_type: {
             item['key']: item['doc_count']
@@ -164,8 +164,7 @@ def get_aggregations(query, doc_type):
     return ret
 
 
-@requires_search
-def get_counts(count_query, clean=True):
+def _add_counts_query(count_query):
     count_query['aggregations'] = {
         'counts': {
             'terms': {
@@ -173,32 +172,74 @@ def get_counts(count_query, clean=True):
             }
         }
     }
+    return count_query
+
 
-    res = client().search(index=INDEX, doc_type=None, search_type='count', body=count_query)
+def _parse_counts(res):
     counts = {x['key']: x['doc_count'] for x in res['aggregations']['counts']['buckets'] if x['key'] in ALIASES.keys()}
 
     counts['total'] = sum([val for val in counts.values()])
     return counts
 
 
-@requires_search
-def get_tags(query, index):
+def _add_tags_query(query):
     query['aggregations'] = {
         'tag_cloud': {
             'terms': {'field': 'tags'}
         }
     }
+    return query
 
-    results = client().search(index=index, doc_type=None, body=query)
-    tags = results['aggregations']['tag_cloud']['buckets']
 
-    return tags
+def _parse_tags(results):
+    return results['aggregations']['tag_cloud']['buckets']
+
+
+def _msearch_header(index, doc_type=None, search_type=None):
+    header = {'index': index}
+    if doc_type and doc_type != '_all':
+        header['type'] = doc_type
+    if search_type:
+        header['search_type'] = search_type
+    return header
+
+
+def _raise_msearch_error(response):
+    """Raise the exception ``requires_search`` would for a failed request within an ``_msearch``."""
+    error = response['error']
+    error_type = error.get('type') if isinstance(error, dict) else error
+    if response.get('status') == 404:
+        raise exceptions.IndexNotFoundError(error_type)
+    if error_type == 'search_phase_execution_exception':
+        raise exceptions.MalformedQueryError('Failed to parse query')
+    raise exceptions.SearchException(error_type)
+
+
+@requires_search
+def get_aggregations(query, doc_type):
+    res = client().search(index=INDEX, doc_type=doc_type, search_type='count', body=_add_aggregations_query(query))
+    return _parse_aggregations(res)
+
+
+@requires_search
+def get_counts(count_query, clean=True):
+    res = client().search(index=INDEX, doc_type=None, search_type='count', body=_add_counts_query(count_query))
+    return _parse_counts(res)
+
+
+@requires_search
+def get_tags(query, index):
+    results = client().search(index=index, doc_type=None, body=_add_tags_query(query))
+    return _parse_tags(results)
 
 
 @requires_search
 def search(query, index=None, doc_type='_all', raw=False):
     """Search for a query
 
+    The results, tag cloud, license aggregations and type counts are fetched with a single
+    ``_msearch`` request.
+
     :param query: The substring of the username/project name/tag to search for
     :param index:
     :param doc_type:
@@ -210,36 +251,36 @@ def search(query, index=None, doc_type='_all', raw=False):
         typeAliases: the doc_types that exist in the search database
     """
     index = index or INDEX
-    tag_query = copy.deepcopy(query)
-    aggs_query = copy.deepcopy(query)
-    count_query = copy.deepcopy(query)
+    # Aggregation queries don't need hits; they share one copy as none of them mutate it further
+    agg_base = {key: value for key, value in query.items() if key not in ('from', 'size', 'sort', 'aggregations')}
+    tag_query = _add_tags_query(dict(agg_base))
+
+    unfiltered = dict(agg_base)
+    if isinstance(unfiltered.get('query'), dict) and isinstance(unfiltered['query'].get('filtered'), dict):
+        unfiltered['query'] = dict(unfiltered['query'], filtered={
+            key: value for key, value in unfiltered['query']['filtered'].items() if key != 'filter'
+        })
+    aggs_query = _add_aggregations_query(dict(unfiltered))
+    count_query = _add_counts_query(dict(unfiltered))
+
+    responses = client().msearch(body=[
+        _msearch_header(index), tag_query,
+        _msearch_header(INDEX, doc_type=doc_type, search_type='count'), aggs_query,
+        _msearch_header(INDEX, search_type='count'), count_query,
+        _msearch_header(index, doc_type=doc_type), query,
+    ])['responses']
+    for response in responses:
+        if 'error' in response:
+            _raise_msearch_error(response)
+    tag_res, aggs_res, count_res, raw_results = responses
 
-    for key in ['from', 'size', 'sort']:
-        try:
-            del tag_query[key]
-            del aggs_query[key]
-            del count_query[key]
-        except KeyError:
-            pass
-
-    tags = get_tags(tag_query, index)
-    try:
-        del aggs_query['query']['filtered']['filter']
-        del count_query['query']['filtered']['filter']
-    except KeyError:
-        pass
-    aggregations = get_aggregations(aggs_query, doc_type=doc_type)
-    counts = get_counts(count_query, index)
-
-    # Run the real query and get the results
-    raw_results = client().search(index=index, doc_type=doc_type, body=query)
     results = [hit['_source'] for hit in raw_results['hits']['hits']]
 
     return_value = {
         'results': raw_results['hits']['hits'] if raw else format_results(results),
-        'counts': counts,
-        'aggs': aggregations,
-        'tags': tags,
+        'counts': _parse_counts(count_res),
+        'aggs': _parse_aggregations(aggs_res),
+        'tags': _parse_tags(tag_res),
         'typeAliases': ALIASES
     }
     return return_value
@@ -43,6 +43,10 @@ EXPIRATION_TIME_DICT = {
 }
 
 CITATION_STYLES_PATH = os.path.join(BASE_PATH, 'static', 'vendor', 'bower_components', 'styles')
+# Number of parsed CSL styles kept in memory per process
+CITATION_STYLE_CACHE_SIZE = 256
+# Styles parsed when an API process starts
+CITATION_STYLES_TO_PRELOAD = ['apa', 'chicago-author-date', 'modern-language-association']
 
 # Minimum seconds between forgot password email attempts
 SEND_EMAIL_THROTTLE = 30
@@ -121,6 +125,9 @@ COOKIE_NAME = 'osf'
 OSF_COOKIE_DOMAIN = None
 # server-side verification timeout
 OSF_SESSION_TIMEOUT = 30 * 24 * 60 * 60  # 30 days in seconds
+# Seconds a loaded or saved Session is kept in the session cache; 0 disables the cache. Sessions
+# deleted outside of remove_session, e.g. by clear_sessions, can be served from it for this long
+SESSION_CACHE_TIMEOUT = 0
 # TODO: Override SECRET_KEY in local.py in production
 SECRET_KEY = 'CHANGEME'
 SESSION_COOKIE_SECURE = SECURE_MODE
@@ -358,6 +365,8 @@ SHARE_URL = 'https://share.osf.io/'
 SHARE_API_TOKEN = None  # Required to send project updates to SHARE
 
 CAS_SERVER_URL = 'http://localhost:8080'
+# Seconds a successful CAS profile lookup for a bearer token is cached; 0 disables the cache
+CAS_TOKEN_CACHE_TIMEOUT = 60
 MFR_SERVER_URL = 'http://localhost:7778'
 
 ###### ARCHIVER ###########
@@ -472,6 +481,8 @@ class CeleryConfig:
 
     # Modules to import when celery launches
     imports = (
+        'addons.osfstorage.tasks',
+        'framework.analytics',
         'framework.celery_tasks',
         'framework.email.tasks',
         'osf.external.tasks',
@@ -525,6 +536,10 @@ class CeleryConfig:
                 'schedule': crontab(minute='*/5'),
                 'args': ('email_transactional',),
             },
+            'flush_page_counters': {
+                'task': 'framework.analytics.flush_page_counters',
+                'schedule': crontab(minute='*'),  # Every minute
+            },
             'daily-emails': {
                 'task': 'website.notifications.tasks.send_users_email',
                 'schedule': crontab(minute=0, hour=5),  # Daily at 12 a.m. EST
@@ -571,8 +586,8 @@ class CeleryConfig:
             },
             'clear_sessions': {
                 'task': 'scripts.clear_sessions',
-                'schedule': crontab(minute=0, hour=5),  # Daily 12 a.m
-                'kwargs': {'dry_run': False},
+                'schedule': crontab(minute=0),  # Hourly, in chunks, instead of one nightly delete
+                'kwargs': {'dry_run': False, 'max_seconds': 15 * 60},
             },
             'send_queued_mails': {
                 'task': 'scripts.send_queued_mails',
@@ -665,6 +680,8 @@ WATERBUTLER_JWE_SECRET = 'CirclesAre4Squares'
 WATERBUTLER_JWT_SECRET = 'ILiekTrianglesALot'
 WATERBUTLER_JWT_ALGORITHM = 'HS256'
 WATERBUTLER_JWT_EXPIRATION = 15
+# Most operations WaterButler may authorize with one request to the batch auth endpoint
+WATERBUTLER_AUTH_BATCH_SIZE = 100
 
 SENSITIVE_DATA_SALT = 'yusaltydough'
 SENSITIVE_DATA_SECRET = 'TrainglesAre5Squares'
@@ -1873,6 +1890,8 @@ RECAPTCHA_VERIFY_URL = 'https://recaptcha.net/recaptcha/api/siteverify'
 
 # akismet spam check
 AKISMET_APIKEY = None
+# Classify content locally with osf.utils.akismet.FakeAkismetClient instead of calling Akismet
+AKISMET_FAKE_CLIENT = False
 SPAM_CHECK_ENABLED = False
 SPAM_CHECK_PUBLIC_ONLY = True
 SPAM_ACCOUNT_SUSPENSION_ENABLED = False